@@ -1,8 +1,12 @@
 from celery import Celery
+from kombu import Queue
 from app.config import get_settings
 
 settings = get_settings()
 
+MAX_PRIORITY = 9
+DEFAULT_PRIORITY = 5
+
 celery_app = Celery(
     "product_importer",
     broker=settings.celery_broker_url,
@@ -18,4 +22,34 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes hard limit
     task_soft_time_limit=25 * 60,  # 25 minutes soft limit
+    # Small and large imports are consumed from separate queues, so a huge
+    # upload only ever holds the bulk workers; webhook deliveries have their
+    # own. A worker started without -Q consumes all of them.
+    task_queues=(
+        Queue("celery"),
+        Queue(settings.import_queue, queue_arguments={"x-max-priority": MAX_PRIORITY}),
+        Queue(settings.import_bulk_queue, queue_arguments={"x-max-priority": MAX_PRIORITY}),
+        Queue(settings.webhook_queue),
+    ),
+    task_default_queue="celery",
+    task_routes={"app.tasks.deliver_webhook": {"queue": settings.webhook_queue}},
+    worker_prefetch_multiplier=1,  # imports are long; don't reserve messages another worker could run
+    broker_transport_options={
+        "priority_steps": list(range(MAX_PRIORITY + 1)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
+
+
+def import_task_options(size: int, priority: int = DEFAULT_PRIORITY) -> dict:
+    """Queue and broker priority for an import of `size` bytes.
+
+    `priority` is a Job priority, 0-9 with higher imported first. AMQP
+    brokers order messages the same way; Redis takes lower numbers first, so
+    the value is inverted there.
+    """
+    queue = settings.import_bulk_queue if size > settings.import_bulk_threshold else settings.import_queue
+    if celery_app.conf.broker_url.startswith(("redis://", "rediss://")):
+        priority = MAX_PRIORITY - priority
+    return {"queue": queue, "priority": priority}
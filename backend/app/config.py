@@ -16,6 +16,16 @@ class Settings(BaseSettings):
     celery_broker_url: str = "redis://localhost:6379"
     celery_result_backend: str = "redis://localhost:6379"
     
+    # Webhooks
+    webhook_cache_ttl: int = 60  # seconds before cached webhook subscriptions are reloaded; 0 disables caching
+    webhook_queue: str = "webhooks"  # Celery queue for webhook deliveries
+    webhook_concurrency: int = 4  # worker processes for `manage.py worker webhooks`
+
+    # Product listings
+    product_count_cache_ttl: int = 30  # seconds a filtered GET /products total is cached; 0 disables caching
+    product_cache_size: int = 10000  # products kept in each API process's LRU; 0 disables the product cache
+    product_cache_ttl: int = 300  # seconds a GET /products/{id} response is cached, in the LRU and in Redis
+
     # App settings
     debug: bool = True
     secret_key: str = "dev-secret-key-change-in-production"
@@ -24,6 +34,19 @@ class Settings(BaseSettings):
     # Upload settings
     max_upload_size: int = 500000000  # 500MB
     csv_chunk_size: int = 10000  # rows per COPY operation
+    import_shard_size: int = 100000000  # split uploads larger than this (bytes) into parallel shards; 0 disables
+    import_max_shards: int = 8  # upper bound on parallel shard tasks per import
+    import_task_time_budget: int = 20 * 60  # seconds before an import task hands off to a continuation; 0 disables
+    import_dedup: bool = True  # pre-scan uploads so repeated SKUs are written once, with their last values; the scan holds ~100 bytes per distinct SKU
+    progress_interval_ms: int = 500  # minimum time between import progress publishes to Redis
+    progress_db_interval_ms: int = 5000  # minimum time between rolling shard counters up onto the Job during a sharded import
+    import_engine: str = "auto"  # "auto" (COPY on Postgres, bulk upsert elsewhere), "copy" or "upsert"
+    import_parser: str = "auto"  # "auto" (pyarrow if installed, csv.reader otherwise), "arrow" or "csv"
+    import_queue: str = "imports"  # Celery queue for small, interactive imports
+    import_bulk_queue: str = "imports_bulk"  # Celery queue for large imports and their shards
+    import_bulk_threshold: int = 20000000  # uploads larger than this (bytes) go to the bulk queue
+    import_concurrency: int = 4  # worker processes for `manage.py worker interactive`
+    import_bulk_concurrency: int = 1  # worker processes for `manage.py worker bulk`
 
 
 @lru_cache()
@@ -1,10 +1,25 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.pool import NullPool
 from app.config import get_settings
 
 settings = get_settings()
 
+# asyncio driver used by the API for each database backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str):
+    """`url` with its driver swapped for the asyncio driver of the same database."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return url
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
 # Create engine with connection pooling
 engine = create_engine(
     settings.database_url,
@@ -14,6 +29,36 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},  # SQLite thread check
 )
 
+# Engine for the API's async sessions (Celery tasks and scripts use `engine`)
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    echo=settings.debug,
+    pool_pre_ping=True,
+    poolclass=NullPool if "sqlite" in settings.database_url else None,
+)
+
+
+def _disable_driver_transactions(sync_engine):
+    """Let SQLAlchemy emit BEGIN on SQLite, as its SQLite docs recommend.
+
+    pysqlite and aiosqlite do not BEGIN before a SAVEPOINT, so releasing one
+    (as the importer's begin_nested() blocks do) would commit the whole
+    transaction.
+    """
+    @event.listens_for(sync_engine, "connect")
+    def _disable_sqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sync_engine, "begin")
+    def _begin_sqlite_transaction(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+if engine.dialect.name == "sqlite":
+    _disable_driver_transactions(engine)
+    _disable_driver_transactions(async_engine.sync_engine)
+
+
 # Session factory
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -22,11 +67,22 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+# Async session factory for API handlers; lazy loads are not possible in
+# async sessions, so load everything a response needs in the query itself.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
 # Import models after Base is defined (for lazy loading)
-from app.models import Product, Webhook, Job, JobStatus
+from app.models import Product, Webhook, Job, JobStatus, JobShard, JobError, RowCount, RowCountDelta
+from app.search import install_search_ddl
+
+install_search_ddl(Product.__table__)
 
 
 def get_db():
@@ -36,3 +92,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session, for `async def` handlers."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,96 @@
+"""Streaming product import pipeline used by the import Celery tasks."""
+from app.importer.reader import LineReader, CsvReader, CsvFormatError, REQUIRED_COLUMNS, number_records
+from app.importer.compression import (
+    CompressionError,
+    DECOMPRESSION_ERRORS,
+    check_upload,
+    detect_compression,
+    open_decompressed,
+)
+from app.importer.pipeline import (
+    ProductRow,
+    ImportCounters,
+    ERROR_SAMPLE_SIZE,
+    ParsedChunk,
+    RowValidationError,
+    validate_row,
+    validate_chunk,
+    FieldDecoder,
+    dedupe_chunk,
+    iter_chunks,
+)
+from app.importer.dedup import SupersededRows, find_superseded_rows, load_dedup_index, dedup_index_path
+from app.importer.sharding import Shard, plan_shards, find_record_boundaries, last_record_boundary
+from app.importer.parsers import CsvParser, ArrowParser, get_csv_parser, validate_table
+from app.importer.ndjson import NdjsonReader, NdjsonParser
+from app.importer.parquet import ParquetReader, ParquetParser
+from app.importer.formats import (
+    ImportFormat,
+    FORMATS,
+    register_format,
+    accepted_suffixes,
+    detect_format,
+    open_reader,
+    get_parser,
+)
+from app.importer.writer import BulkUpsertWriter, CopyWriter, DryRunWriter, UpsertResult, get_writer
+from app.importer.errors import store_errors, iter_job_errors
+from app.importer.progress import ProgressReporter, publish_progress, read_progress
+from app.importer.metrics import ImportMetrics
+
+__all__ = [
+    "LineReader",
+    "CsvReader",
+    "CsvFormatError",
+    "REQUIRED_COLUMNS",
+    "number_records",
+    "CompressionError",
+    "DECOMPRESSION_ERRORS",
+    "check_upload",
+    "detect_compression",
+    "open_decompressed",
+    "ProductRow",
+    "ImportCounters",
+    "ERROR_SAMPLE_SIZE",
+    "ParsedChunk",
+    "RowValidationError",
+    "validate_row",
+    "validate_chunk",
+    "FieldDecoder",
+    "dedupe_chunk",
+    "iter_chunks",
+    "SupersededRows",
+    "find_superseded_rows",
+    "load_dedup_index",
+    "dedup_index_path",
+    "Shard",
+    "plan_shards",
+    "find_record_boundaries",
+    "last_record_boundary",
+    "CsvParser",
+    "ArrowParser",
+    "get_csv_parser",
+    "validate_table",
+    "NdjsonReader",
+    "NdjsonParser",
+    "ParquetReader",
+    "ParquetParser",
+    "ImportFormat",
+    "FORMATS",
+    "register_format",
+    "accepted_suffixes",
+    "detect_format",
+    "open_reader",
+    "get_parser",
+    "BulkUpsertWriter",
+    "CopyWriter",
+    "DryRunWriter",
+    "UpsertResult",
+    "get_writer",
+    "store_errors",
+    "iter_job_errors",
+    "ProgressReporter",
+    "publish_progress",
+    "read_progress",
+    "ImportMetrics",
+]
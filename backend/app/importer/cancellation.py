@@ -0,0 +1,42 @@
+"""Cooperative cancellation of running imports.
+
+`POST /jobs/{job_id}/cancel` sets `job:{job_id}:cancel` in Redis and the
+import tasks check it once per chunk, so a cancel costs one GET per chunk
+and takes effect at the next chunk boundary. The flag holds what to do with
+the chunk being written when it is seen: `commit` keeps it, `rollback`
+discards it. It expires on its own; the job's CANCELLED status is what keeps
+redelivered tasks from starting again.
+"""
+from typing import Optional
+
+from app.redis_client import redis_client
+
+CANCEL_TTL = 24 * 60 * 60  # seconds a cancel request is kept
+
+COMMIT = "commit"
+ROLLBACK = "rollback"
+
+
+def cancel_key(job_id: str) -> str:
+    return f"job:{job_id}:cancel"
+
+
+def request_cancel(job_id: str, rollback: bool = False) -> bool:
+    """Ask a job's import tasks to stop; False if Redis could not be reached."""
+    if not redis_client:
+        return False
+    try:
+        redis_client.set(cancel_key(job_id), ROLLBACK if rollback else COMMIT, ex=CANCEL_TTL)
+    except Exception:
+        return False
+    return True
+
+
+def cancel_requested(job_id: str) -> Optional[str]:
+    """`commit` or `rollback` if the job has been cancelled, None otherwise."""
+    if not redis_client:
+        return None
+    try:
+        return redis_client.get(cancel_key(job_id))
+    except Exception:
+        return None
@@ -0,0 +1,136 @@
+"""Streaming decompression of compressed CSV uploads.
+
+Uploads may be stored gzip, zstd or single-member zip compressed and are
+decompressed on the fly while they are parsed; the plain CSV is never
+written to disk. The format is detected from the file's magic bytes.
+Offsets in checkpoints are positions in the decompressed stream, so seeking
+to one decompresses up to it.
+"""
+import gzip
+import io
+import zipfile
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZIP_MAGIC = b"PK\x03\x04"
+
+_SKIP_SIZE = 1024 * 1024
+
+
+class CompressionError(ValueError):
+    """Raised when a compressed upload cannot be opened."""
+
+
+# Raised while reading a corrupt or truncated compressed stream
+DECOMPRESSION_ERRORS = (CompressionError, EOFError, zlib.error, zipfile.BadZipFile, gzip.BadGzipFile)
+if zstandard is not None:
+    DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+
+def detect_compression(path):
+    """Return "gzip", "zstd", "zip" or None for a plain file."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return "gzip"
+    if magic == ZSTD_MAGIC:
+        return "zstd"
+    if magic == ZIP_MAGIC:
+        return "zip"
+    return None
+
+
+class _ZstdReader(io.RawIOBase):
+    """Seekable view of a zstd stream.
+
+    zstandard's stream reader only reads forward; seeking ahead decompresses
+    and discards, seeking back starts over from the beginning of the file.
+    """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._restart()
+
+    def _restart(self):
+        self._fileobj.seek(0)
+        self._reader = zstandard.ZstdDecompressor().stream_reader(
+            self._fileobj, read_across_frames=True, closefd=False
+        )
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self._reader.readinto(buffer)
+        self._pos += count
+        return count
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("zstd streams can only seek from the start")
+        if offset < self._pos:
+            self._restart()
+        while self._pos < offset:
+            if not self._reader.read(min(_SKIP_SIZE, offset - self._pos)):
+                break
+            self._pos = self._reader.tell()
+        return self._pos
+
+    def close(self):
+        self._reader.close()
+        super().close()
+
+
+def open_decompressed(fileobj, compression):
+    """Wrap an open binary file in a seekable stream of its decompressed bytes.
+
+    Returns `(stream, size)`, where `size` is the decompressed length when
+    the format records it (zip) and None otherwise.
+    """
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb"), None
+    if compression == "zstd":
+        if zstandard is None:
+            raise CompressionError("zstd uploads require the zstandard package")
+        return io.BufferedReader(_ZstdReader(fileobj), buffer_size=_SKIP_SIZE), None
+    if compression == "zip":
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile as e:
+            raise CompressionError(f"Invalid zip file: {e}")
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if len(members) != 1:
+            raise CompressionError("Zip uploads must contain exactly one file")
+        return archive.open(members[0]), members[0].file_size
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def check_upload(path):
+    """Raise `CompressionError` if a stored upload cannot be decompressed."""
+    compression = detect_compression(path)
+    if compression is None:
+        return
+    with open(path, "rb") as raw:
+        try:
+            stream, _ = open_decompressed(raw, compression)
+            with stream:
+                stream.read(1)
+        except CompressionError:
+            raise
+        except DECOMPRESSION_ERRORS as e:
+            raise CompressionError(f"Invalid {compression} file: {e}")
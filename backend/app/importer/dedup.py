@@ -0,0 +1,108 @@
+"""Whole-file duplicate SKU detection for imports.
+
+A pre-pass over the upload records the last valid row for every `sku_norm`.
+Every earlier row with the same SKU is superseded and skipped by the
+writer, so each product is written once per import with its final values
+no matter how far apart the duplicates are in the file.
+"""
+import hashlib
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from app.config import get_settings
+from app.importer.formats import get_parser, open_reader
+from app.importer.writer import column_length_error
+
+settings = get_settings()
+
+
+class SupersededRows:
+    """Sorted, compact set of row numbers whose SKU appears again later."""
+
+    def __init__(self, row_nums=()):
+        self._rows = array("q", sorted(row_nums))
+
+    def __contains__(self, row_num: int) -> bool:
+        index = bisect_left(self._rows, row_num)
+        return index < len(self._rows) and self._rows[index] == row_num
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def save(self, path):
+        """Write the rows to `path` atomically, so a killed worker never leaves a partial index."""
+        path = Path(path)
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False) as f:
+            try:
+                self._rows.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path) -> "SupersededRows":
+        superseded = cls()
+        superseded._rows.frombytes(Path(path).read_bytes())
+        return superseded
+
+
+def find_superseded_rows(path, engine: str = "auto") -> SupersededRows:
+    """Scan an upload and return the rows overridden by a later row with the same SKU.
+
+    Rows go through the same parser as the import itself (pass the
+    configured `import_parser` as `engine`). Only rows that pass validation
+    and fit their columns take part, so a final occurrence that is sure to
+    be rejected does not hide an earlier valid one. Rows that fail at write
+    time for any other reason (e.g. a database error in the row-by-row
+    retry) cannot be predicted here: if that row was the last for its SKU,
+    the SKU is not imported and the failure is listed in the job's errors.
+
+    SKUs are tracked by a 64-bit digest rather than by the string itself,
+    so the scan holds roughly 100 bytes per distinct SKU (about 100 MB per
+    million) whatever their length. Two SKUs would need to collide for a
+    row to be wrongly skipped; across a million SKUs the odds are around
+    one in 40 million.
+    """
+    last_row = {}
+    superseded = array("q")
+    with open_reader(path) as reader:
+        for chunk in get_parser(reader, engine).chunks():
+            for row in chunk.rows:
+                if column_length_error(row):
+                    continue
+                key = _sku_key(row.sku_norm)
+                previous = last_row.get(key)
+                if previous is not None:
+                    superseded.append(previous)
+                last_row[key] = row.row_num
+    return SupersededRows(superseded)
+
+
+def _sku_key(sku_norm: str) -> int:
+    return int.from_bytes(hashlib.blake2b(sku_norm.encode(), digest_size=8).digest(), "little")
+
+
+def dedup_index_path(filepath) -> Path:
+    """Sidecar file holding the superseded rows of an upload."""
+    filepath = Path(filepath)
+    return filepath.with_name(filepath.name + ".dedup")
+
+
+def load_dedup_index(filepath) -> SupersededRows:
+    """Load the upload's dedup index, building and saving it on first use.
+
+    The sidecar lets resumed tasks and parallel shards reuse one pre-pass.
+    """
+    index_path = dedup_index_path(filepath)
+    if index_path.exists():
+        return SupersededRows.load(index_path)
+    superseded = find_superseded_rows(filepath, settings.import_parser)
+    superseded.save(index_path)
+    return superseded
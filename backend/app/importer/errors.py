@@ -0,0 +1,51 @@
+"""Persist and read back the failed rows of an import job."""
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import JobError
+
+
+def _insert(db):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(JobError).on_conflict_do_nothing(index_elements=["job_id", "row_num"])
+    if dialect == "sqlite":
+        return sqlite.insert(JobError).on_conflict_do_nothing(index_elements=["job_id", "row_num"])
+    return insert(JobError)
+
+
+def store_errors(db, job_id: str, counters) -> int:
+    """Write `counters.pending_errors` to `job_errors` in the current transaction.
+
+    Rows already stored for the job (a chunk replayed after a resume) are
+    skipped. Returns the number of errors handed to the database.
+    """
+    pending = counters.pending_errors
+    if not pending:
+        return 0
+
+    db.execute(_insert(db), [
+        {
+            "job_id": job_id,
+            "row_num": error["row"],
+            "sku": error.get("sku"),
+            "error": error["error"],
+            "data": error.get("data"),
+        }
+        for error in pending
+    ])
+    counters.pending_errors = []
+    return len(pending)
+
+
+def iter_job_errors(db, job_id: str, after: int = None, batch_size: int = 1000):
+    """Yield a job's `JobError` rows in row order, one keyset page at a time."""
+    while True:
+        query = db.query(JobError).filter(JobError.job_id == job_id)
+        if after is not None:
+            query = query.filter(JobError.row_num > after)
+        page = query.order_by(JobError.row_num).limit(batch_size).all()
+        yield from page
+        if len(page) < batch_size:
+            return
+        after = page[-1].row_num
@@ -0,0 +1,113 @@
+"""Registry of upload formats the importer understands.
+
+Each format pairs a reader (opened as a context manager on the upload path)
+with a parser factory. Whatever the format, parsers yield the same
+`ParsedChunk`s, so the import tasks never branch on it. New formats are
+added with `register_format`.
+"""
+from typing import Callable, NamedTuple, Optional
+
+from app.importer.compression import detect_compression, open_decompressed
+from app.importer.ndjson import NdjsonReader, get_ndjson_parser
+from app.importer.parquet import PARQUET_MAGIC, ParquetReader, get_parquet_parser
+from app.importer.parsers import get_csv_parser
+from app.importer.reader import CsvReader
+
+SNIFF_SIZE = 4096  # leading bytes handed to `sniff` functions
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+class ImportFormat(NamedTuple):
+    """An upload format: how to recognise it, open it and parse it."""
+    name: str
+    reader: Callable  # path -> reader
+    parser: Callable  # (reader, engine) -> parser
+    suffixes: tuple  # file name endings, without a compression suffix
+    sniff: Optional[Callable] = None  # leading decompressed bytes -> bool
+    compressible: bool = True  # may be uploaded gzip/zstd/zip compressed
+    shardable: bool = False  # may be split into byte-range shards (see `plan_shards`)
+
+
+FORMATS = {}
+
+
+def register_format(import_format: ImportFormat):
+    FORMATS[import_format.name] = import_format
+
+
+register_format(ImportFormat(
+    "parquet",
+    ParquetReader,
+    get_parquet_parser,
+    suffixes=(".parquet",),
+    sniff=lambda head: head.startswith(PARQUET_MAGIC),
+    compressible=False,
+))
+register_format(ImportFormat(
+    "ndjson",
+    NdjsonReader,
+    get_ndjson_parser,
+    suffixes=(".ndjson", ".jsonl"),
+    sniff=lambda head: head.lstrip().startswith(b"{"),
+))
+register_format(ImportFormat("csv", CsvReader, get_csv_parser, suffixes=(".csv",), shardable=True))
+
+DEFAULT_FORMAT = "csv"
+
+
+def accepted_suffixes() -> tuple:
+    """File name endings the upload endpoint accepts."""
+    suffixes = [".zip"]
+    for import_format in FORMATS.values():
+        for suffix in import_format.suffixes:
+            suffixes.append(suffix)
+            if import_format.compressible:
+                suffixes.extend(suffix + compressed for compressed in COMPRESSED_SUFFIXES)
+    return tuple(suffixes)
+
+
+def _head(path) -> bytes:
+    with open(path, "rb") as raw:
+        compression = detect_compression(path)
+        if compression is None:
+            return raw.read(SNIFF_SIZE)
+        stream, _ = open_decompressed(raw, compression)
+        with stream:
+            return stream.read(SNIFF_SIZE)
+
+
+def detect_format(path) -> str:
+    """Name of the registered format of an upload.
+
+    The file name decides when it has a known suffix (ignoring a `.gz` or
+    `.zst` ending); otherwise the leading bytes are sniffed, falling back to
+    CSV.
+    """
+    name = str(path).lower()
+    for compressed in COMPRESSED_SUFFIXES:
+        if name.endswith(compressed):
+            name = name[:-len(compressed)]
+            break
+    for import_format in FORMATS.values():
+        if name.endswith(import_format.suffixes):
+            return import_format.name
+
+    head = _head(path)
+    for import_format in FORMATS.values():
+        if import_format.sniff is not None and import_format.sniff(head):
+            return import_format.name
+    return DEFAULT_FORMAT
+
+
+def open_reader(path, format_name: str = None):
+    """Reader for an upload in its detected format; use it as a context manager."""
+    return FORMATS[format_name or detect_format(path)].reader(path)
+
+
+def get_parser(reader, engine: str = "auto"):
+    """Parser for a reader returned by `open_reader`.
+
+    `engine` picks between the CSV parsers (see `get_csv_parser`); other
+    formats have a single parser.
+    """
+    return FORMATS[reader.format].parser(reader, engine)
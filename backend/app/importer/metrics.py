@@ -0,0 +1,135 @@
+"""Per-stage timings of an import, stored on the Job as `metrics`.
+
+An import is a loop of stages (parse a chunk, write it, store its errors,
+commit, invalidate cached products, schedule webhooks, publish progress);
+`ImportMetrics.stage()` adds the wall-clock and CPU time of each to a
+running total. Statements are counted as SQLAlchemy sends them to the
+driver while `collect()` is active on the importing thread, so a worker
+running several imports keeps their counts apart. `CopyWriter`'s
+raw-cursor COPY statements bypass SQLAlchemy and are not counted.
+
+CPU time is the whole process's, so it includes pyarrow's parser threads.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+CHUNK_SAMPLE_SIZE = 20  # most recent chunks kept in `chunks`
+
+_current = ContextVar("import_metrics", default=None)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.statements += 1
+
+
+def _rate(rows: int, seconds: float) -> float:
+    return round(rows / seconds, 1) if seconds > 0 else 0.0
+
+
+class ImportMetrics:
+    """Running stage timings, statement count and chunk throughput of one import.
+
+    `data` restores the totals saved by `as_dict()`, so a resumed or
+    continued task keeps adding to them.
+    """
+
+    def __init__(self, data: dict = None):
+        data = data or {}
+        self.stages = {name: dict(stage) for name, stage in data.get("stages", {}).items()}
+        self.statements = data.get("statements", 0)
+        self.rows = data.get("rows", 0)
+        self.chunk_count = data.get("chunk_count", 0)
+        self.chunks = list(data.get("chunks", []))
+        self._chunk_started = None
+        self._chunk_statements = 0
+
+    @contextmanager
+    def collect(self, engine):
+        """Count statements on `engine` issued by this thread into `statements`."""
+        if not event.contains(engine, "before_cursor_execute", _count_statement):
+            event.listen(engine, "before_cursor_execute", _count_statement)
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the wall and CPU time of the block to stage `name`."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            stage["wall_s"] += time.perf_counter() - wall
+            stage["cpu_s"] += time.process_time() - cpu
+            stage["calls"] += 1
+
+    def timed_chunks(self, chunks):
+        """Yield from a parser's chunks, timing each as the `parse` stage.
+
+        Also starts the clock for the chunk's throughput, which `end_chunk()`
+        stops once the chunk has been written and committed.
+        """
+        chunks = iter(chunks)
+        while True:
+            self._chunk_started = time.perf_counter()
+            self._chunk_statements = self.statements
+            with self.stage("parse"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def end_chunk(self, rows: int):
+        """Record the rows and time of the chunk started by `timed_chunks()`."""
+        seconds = time.perf_counter() - self._chunk_started
+        self.rows += rows
+        self.chunk_count += 1
+        self.chunks.append({
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "rows_per_second": _rate(rows, seconds),
+            "statements": self.statements - self._chunk_statements,
+        })
+        del self.chunks[:-CHUNK_SAMPLE_SIZE]
+
+    def merge(self, other: "ImportMetrics"):
+        """Add another task's totals (e.g. a shard's) to these."""
+        for name, stage in other.stages.items():
+            total = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            for key in total:
+                total[key] += stage.get(key, 0)
+        self.statements += other.statements
+        self.rows += other.rows
+        self.chunk_count += other.chunk_count
+
+    def as_dict(self, chunks: bool = True) -> dict:
+        """JSON-safe summary; `chunks=False` leaves out the per-chunk samples."""
+        wall = sum(stage["wall_s"] for stage in self.stages.values())
+        data = {
+            "rows": self.rows,
+            "chunk_count": self.chunk_count,
+            "statements": self.statements,
+            "wall_s": round(wall, 4),
+            "rows_per_second": _rate(self.rows, wall),
+            "stages": {
+                name: {
+                    "wall_s": round(stage["wall_s"], 4),
+                    "cpu_s": round(stage["cpu_s"], 4),
+                    "calls": stage["calls"],
+                }
+                for name, stage in self.stages.items()
+            },
+        }
+        if chunks:
+            data["chunks"] = list(self.chunks)
+        elif self.chunks:
+            data["last_chunk"] = self.chunks[-1]
+        return data
@@ -0,0 +1,84 @@
+"""Newline-delimited JSON uploads: one product object per line."""
+import json
+from itertools import islice
+
+from app.importer.parsers import gc_paused
+from app.importer.pipeline import ParsedChunk, RowValidationError, validate_row
+from app.importer.reader import LineReader
+
+PRODUCT_FIELDS = ("sku", "name", "description")
+
+
+class NdjsonReader(LineReader):
+    """Iterate the lines of an NDJSON upload; records are numbered from 1."""
+
+    format = "ndjson"
+
+    def records(self, start: int = None, end: int = None, first_row_num: int = 1):
+        """Yield `(row_num, line)` for every non-blank line of the byte range."""
+        self.start = 0 if start is None else start
+        self.end = self.size if end is None else end
+        self._file.seek(self.start)
+
+        row_num = first_row_num
+        for line in self._lines(self.end):
+            if not line.strip():
+                continue
+            yield row_num, line
+            row_num += 1
+
+
+def _text(value):
+    """Field value as the CSV reader would see it."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+
+class NdjsonParser:
+    """Decode NDJSON lines and validate them like CSV rows.
+
+    Lines that are not JSON objects are reported as row errors. Every chunk
+    ends on a line boundary, so every chunk is a checkpoint.
+    """
+
+    name = "ndjson"
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def _decode(self, chunk, offset):
+        rows = []
+        errors = []
+        for row_num, line in chunk:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                errors.append((row_num, f"Invalid JSON: {e}", {"line": line.rstrip("\r\n")}))
+                continue
+            if not isinstance(record, dict):
+                errors.append((row_num, "Expected a JSON object", {"line": line.rstrip("\r\n")}))
+                continue
+            try:
+                rows.append(validate_row(row_num, {field: _text(record.get(field)) for field in PRODUCT_FIELDS}))
+            except RowValidationError as e:
+                errors.append((row_num, str(e), record))
+        return ParsedChunk(rows, errors, len(chunk), offset)
+
+    def chunks(self, start: int = None, end: int = None, first_row_num: int = None, chunk_size: int = 10000):
+        """Yield a `ParsedChunk` per `chunk_size` lines of the byte range."""
+        if first_row_num is None:
+            first_row_num = self.reader.first_row_num
+        records = self.reader.records(start, end, first_row_num)
+        while True:
+            with gc_paused():
+                chunk = list(islice(records, chunk_size))
+                parsed = self._decode(chunk, self.reader.bytes_read) if chunk else None
+            if parsed is None:
+                return
+            yield parsed
+
+
+def get_ndjson_parser(reader, engine: str = "auto"):
+    """NDJSON has a single parser; `engine` only selects between CSV parsers."""
+    return NdjsonParser(reader)
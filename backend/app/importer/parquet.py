@@ -0,0 +1,104 @@
+"""Parquet uploads, read one row group at a time.
+
+Requires the optional pyarrow dependency. Checkpoint offsets are row group
+indexes instead of byte offsets: a row group is the smallest unit a
+Parquet file can be resumed from.
+"""
+from app.importer.parsers import gc_paused, validate_table
+from app.importer.pipeline import ParsedChunk
+from app.importer.reader import REQUIRED_COLUMNS, CsvFormatError
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pq = None
+
+PARQUET_MAGIC = b"PAR1"
+
+
+class ParquetReader:
+    """Open a Parquet upload and track how many row groups were read."""
+
+    format = "parquet"
+    first_row_num = 1
+    compression = None  # compressed internally, per column chunk
+
+    def __init__(self, path):
+        if pq is None:
+            raise CsvFormatError("Parquet uploads require the pyarrow package")
+        self.path = path
+        self.file = None
+        self.fieldnames = None
+        self.row_groups_read = 0
+
+    def __enter__(self):
+        self.file = pq.ParquetFile(self.path)
+        self.fieldnames = self.file.schema_arrow.names
+        if not REQUIRED_COLUMNS.issubset(self.fieldnames):
+            self.close()
+            raise CsvFormatError(f"Parquet file must have columns: {REQUIRED_COLUMNS}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    @property
+    def num_row_groups(self) -> int:
+        return self.file.num_row_groups
+
+    @property
+    def percentage(self) -> int:
+        if not self.num_row_groups:
+            return 100
+        return min(100, int(self.row_groups_read * 100 / self.num_row_groups))
+
+    def column_index(self, name: str):
+        return self.fieldnames.index(name) if name in self.fieldnames else None
+
+
+class ParquetParser:
+    """Validate Parquet record batches with pyarrow compute kernels.
+
+    Row groups are streamed as batches of `chunk_size` rows, so memory stays
+    bounded by a batch. Only the last chunk of a row group carries a
+    checkpoint offset (the index of the next row group).
+    """
+
+    name = "parquet"
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def chunks(self, start: int = None, end: int = None, first_row_num: int = None, chunk_size: int = 10000):
+        """Yield a `ParsedChunk` per batch of row groups `start` to `end`."""
+        reader = self.reader
+        parquet_file = reader.file
+        start = 0 if start is None else start
+        end = reader.num_row_groups if end is None else end
+        row_num = reader.first_row_num if first_row_num is None else first_row_num
+        reader.row_groups_read = start
+
+        for group in range(start, end):
+            remaining = parquet_file.metadata.row_group(group).num_rows
+            if not remaining:
+                reader.row_groups_read = group + 1
+                continue
+            for batch in parquet_file.iter_batches(batch_size=chunk_size, row_groups=[group], use_threads=True):
+                remaining -= batch.num_rows
+                with gc_paused():
+                    rows, errors = validate_table(batch, reader.fieldnames, row_num, reader.column_index)
+                if not remaining:
+                    reader.row_groups_read = group + 1
+                yield ParsedChunk(rows, errors, batch.num_rows, group + 1 if not remaining else None)
+                row_num += batch.num_rows
+
+
+def get_parquet_parser(reader, engine: str = "auto"):
+    """Parquet has a single parser; `engine` only selects between CSV parsers."""
+    return ParquetParser(reader)
@@ -0,0 +1,272 @@
+"""Parser engines turning a byte range of a CSV upload into validated chunks.
+
+Every parser yields `ParsedChunk`s, so the import tasks do not care how the
+rows were decoded. `CsvParser` is the zero-dependency default built on
+`csv.reader` with positional columns; `ArrowParser` uses pyarrow's multithreaded CSV reader and
+validates whole columns at once when pyarrow is installed.
+"""
+import gc
+import io
+from contextlib import contextmanager
+from itertools import islice
+
+from app.importer.pipeline import MISSING_SKU_OR_NAME, FieldDecoder, ParsedChunk, ProductRow
+from app.importer.reader import number_records
+from app.importer.sharding import last_record_boundary
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional dependency
+    pa = None
+
+ARROW_BLOCK_SIZE = 4 * 1024 * 1024  # bytes parsed per pyarrow call; bounds the Python rows built at once
+
+
+@contextmanager
+def gc_paused():
+    """Suspend the cyclic garbage collector while a chunk is decoded.
+
+    Decoding allocates a few container objects per row and none of them form
+    cycles, yet the allocations alone trigger collections that rescan the
+    rows already built and cost about as much as the decoding itself.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def validate_table(table, fieldnames, first_row_num: int, column_index):
+    """Validate a pyarrow table of products with compute kernels.
+
+    Mirrors `validate_row` column-wise: trims sku, name and description,
+    lowercases sku into sku_norm and rejects rows without a sku or name.
+    `fieldnames` names the table's columns in order and `column_index(name)`
+    returns the position of the column to use for a name, or None.
+
+    Returns `(rows, errors)` as in `ParsedChunk`.
+    """
+    if table.num_rows == 0:
+        return [], []
+
+    def column(name):
+        index = column_index(name)
+        if index is None:
+            return pa.nulls(table.num_rows, pa.string())
+        values = table.column(index)
+        if not pa.types.is_string(values.type):
+            values = pc.cast(values, pa.string())
+        return pc.utf8_trim_whitespace(values)
+
+    sku = column("sku")
+    name = column("name")
+    description = column("description")
+    if pc.all(pc.string_is_ascii(sku)).as_py() is not False:
+        sku_norm = pc.ascii_lower(sku).to_pylist()
+    else:
+        # utf8_lower maps one code point to one code point; str.lower() does not
+        sku_norm = [value.lower() if value is not None else None for value in sku.to_pylist()]
+    description = pc.if_else(pc.equal(description, ""), None, description)
+
+    valid = pc.and_(pc.greater(pc.utf8_length(sku), 0), pc.greater(pc.utf8_length(name), 0))
+    valid = pc.fill_null(valid, False)
+
+    make_row = tuple.__new__
+    rows = [
+        make_row(ProductRow, (first_row_num + index, *values))
+        for index, is_valid, *values in zip(
+            range(table.num_rows),
+            valid.to_pylist(),
+            sku.to_pylist(),
+            sku_norm,
+            name.to_pylist(),
+            description.to_pylist(),
+        )
+        if is_valid
+    ]
+
+    errors = []
+    invalid = pc.indices_nonzero(pc.invert(valid)).to_pylist()
+    if invalid:
+        invalid_rows = table.take(invalid)
+        raw = zip(*(invalid_rows.column(i).to_pylist() for i in range(invalid_rows.num_columns)))
+        for index, values in zip(invalid, raw):
+            data = {}
+            for fieldname, value in zip(fieldnames, values):
+                data[fieldname] = _json_value(value)  # later duplicates win, as in DictReader
+            errors.append((first_row_num + index, MISSING_SKU_OR_NAME, data))
+    return rows, errors
+
+
+class CsvParser:
+    """Parse records with `csv.reader` and validate them by column position.
+
+    Every chunk ends on a record the reader has fully consumed, so every
+    chunk is a checkpoint.
+    """
+
+    name = "csv"
+
+    def __init__(self, reader):
+        self.reader = reader
+        self._decoder = None
+
+    @property
+    def decoder(self) -> FieldDecoder:
+        if self._decoder is None:
+            reader = self.reader
+            if reader.fieldnames is None:
+                reader.read_header()
+            self._decoder = FieldDecoder(
+                reader.fieldnames,
+                reader.column_index("sku"),
+                reader.column_index("name"),
+                reader.column_index("description"),
+            )
+        return self._decoder
+
+    def chunks(self, start: int = None, end: int = None, first_row_num: int = None, chunk_size: int = 10000):
+        """Yield a `ParsedChunk` per `chunk_size` rows of the byte range."""
+        decode = self.decoder.decode
+        if first_row_num is None:
+            first_row_num = self.reader.first_row_num
+        records = self.reader.records(start, end, first_row_num)
+        while True:
+            # never yield with the collector paused; the caller writes to the database
+            with gc_paused():
+                chunk = list(islice(records, chunk_size))
+                parsed = decode(chunk, offset=self.reader.bytes_read) if chunk else None
+            if parsed is None:
+                return
+            yield parsed
+
+
+class ArrowParser(CsvParser):
+    """Parse blocks of the file with pyarrow and validate them as columns.
+
+    The byte range is read sequentially in blocks of about `block_size`
+    bytes, cut at the last record boundary (see `last_record_boundary`) with
+    the remainder carried into the next block, so compressed streams are
+    never read twice. Each block is read
+    by pyarrow on several threads into string columns, and trimming,
+    lowercasing and the empty sku/name check run as compute kernels. Only
+    the last chunk of a block carries a checkpoint offset.
+
+    A block pyarrow refuses (ragged rows, invalid UTF-8, ...) is re-parsed
+    with `csv.reader`, so row numbering, validation messages and
+    parse errors stay the same as with `CsvParser`.
+    """
+
+    name = "arrow"
+
+    def __init__(self, reader, block_size: int = ARROW_BLOCK_SIZE):
+        if pa is None:
+            raise NotImplementedError("The arrow parser requires pyarrow")
+        super().__init__(reader)
+        self.block_size = block_size
+
+    def chunks(self, start: int = None, end: int = None, first_row_num: int = None, chunk_size: int = 10000):
+        reader = self.reader
+        if reader.fieldnames is None:
+            reader.read_header()
+        start = reader.header_end if start is None else start
+        end = reader.size if end is None else end
+        reader.start, reader.end = start, end
+        reader._file.seek(start)
+
+        pos = start
+        row_num = reader.first_row_num if first_row_num is None else first_row_num
+        pending = b""
+        eof = False
+        while True:
+            data = pending
+            if not eof:
+                want = self.block_size if end is None else min(self.block_size, end - pos - len(pending))
+                more = reader._file.read(want) if want > 0 else b""
+                eof = not more
+                data += more
+            if not data:
+                return
+
+            cut = len(data) if eof else last_record_boundary(data)
+            if not cut:
+                # a single record longer than the block; read on
+                pending = data
+                continue
+            block, pending = data[:cut], data[cut:]
+
+            with gc_paused():
+                try:
+                    rows, errors, processed = self._parse_block(block, row_num)
+                except pa.ArrowInvalid:
+                    lines = io.TextIOWrapper(io.BytesIO(block), encoding="utf-8", newline="\n")
+                    parsed = self.decoder.decode(list(number_records(lines, row_num)))
+                    rows, errors, processed = parsed.rows, parsed.errors, parsed.processed
+
+            pos += cut
+            yield from self._split(rows, errors, row_num, processed, chunk_size, pos)
+            row_num += processed
+
+    def _split(self, rows, errors, first_row_num: int, processed: int, chunk_size: int, offset: int):
+        """Cut a parsed block into `chunk_size`-row chunks; only the last one gets `offset`."""
+        last_row_num = first_row_num + processed
+        row_index = error_index = 0
+        for chunk_start in range(first_row_num, last_row_num, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, last_row_num)
+            row_stop = row_index
+            while row_stop < len(rows) and rows[row_stop].row_num < chunk_end:
+                row_stop += 1
+            error_stop = error_index
+            while error_stop < len(errors) and errors[error_stop][0] < chunk_end:
+                error_stop += 1
+            yield ParsedChunk(
+                rows[row_index:row_stop],
+                errors[error_index:error_stop],
+                chunk_end - chunk_start,
+                offset if chunk_end == last_row_num else None,
+            )
+            row_index, error_index = row_stop, error_stop
+
+    def _parse_block(self, data: bytes, first_row_num: int):
+        """Parse and validate one block, returning `(rows, errors, processed)`."""
+        fieldnames = self.reader.fieldnames
+        columns = [f"c{i}" for i in range(len(fieldnames))]
+        table = pa_csv.read_csv(
+            pa.BufferReader(data),
+            read_options=pa_csv.ReadOptions(column_names=columns, use_threads=True),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={column: pa.string() for column in columns},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        rows, errors = validate_table(table, fieldnames, first_row_num, column_index=self.reader.column_index)
+        return rows, errors, table.num_rows
+
+
+def get_csv_parser(reader, engine: str = "auto"):
+    """Pick the CSV parser for an import.
+
+    `auto` uses pyarrow when it is installed and `csv.reader` otherwise.
+    """
+    if engine == "arrow":
+        return ArrowParser(reader)
+    if engine == "csv":
+        return CsvParser(reader)
+    if engine != "auto":
+        raise ValueError(f"Unknown import parser: {engine}")
+    if pa is not None:
+        return ArrowParser(reader)
+    return CsvParser(reader)
@@ -0,0 +1,179 @@
+"""Validation and chunking stages of the product import pipeline."""
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import NamedTuple, Optional
+
+ERROR_SAMPLE_SIZE = 100  # row errors kept on the Job row; the rest only go to job_errors
+MISSING_SKU_OR_NAME = "Missing sku or name"
+
+
+class ProductRow(NamedTuple):
+    """A validated CSV row ready to be written."""
+    row_num: int
+    sku: str
+    sku_norm: str
+    name: str
+    description: Optional[str]
+
+
+@dataclass
+class ImportCounters:
+    """Running totals for an import job.
+
+    `errors` is a sample of the first `ERROR_SAMPLE_SIZE` row errors, small
+    enough to keep on the Job row. Every error is also queued on
+    `pending_errors` until `store_errors` writes it to `job_errors`.
+    """
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    duplicates: int = 0  # rows skipped because a later row has the same SKU
+    unchanged: int = 0  # existing products whose content hash did not change
+    errors: list = field(default_factory=list)
+    pending_errors: list = field(default_factory=list, repr=False)
+
+    def snapshot(self) -> dict:
+        """Counter values for a checkpoint (errors are stored separately)."""
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "unchanged": self.unchanged,
+        }
+
+    @classmethod
+    def restore(cls, snapshot: dict, errors: Optional[list] = None) -> "ImportCounters":
+        """Rebuild counters from `snapshot()` output."""
+        return cls(
+            processed=snapshot.get("processed", 0),
+            created=snapshot.get("created", 0),
+            updated=snapshot.get("updated", 0),
+            failed=snapshot.get("failed", 0),
+            duplicates=snapshot.get("duplicates", 0),
+            unchanged=snapshot.get("unchanged", 0),
+            errors=list(errors or []),
+        )
+
+    def add_error(self, row_num: int, message: str, sku: Optional[str] = None, data: Optional[dict] = None):
+        """Count a failed row; `data` holds its values for the failed-rows download."""
+        self.failed += 1
+        error = {"row": row_num, "error": message}
+        if sku is not None:
+            error["sku"] = sku
+        if len(self.errors) < ERROR_SAMPLE_SIZE:
+            self.errors.append(error)
+        self.pending_errors.append({**error, "data": data})
+
+
+class ParsedChunk(NamedTuple):
+    """A chunk of rows after parsing and validation, as yielded by a parser.
+
+    `offset` is the byte offset a resumed import may restart from after this
+    chunk, or None when the chunk ends in the middle of a parser block and
+    is not a safe checkpoint.
+    """
+    rows: list  # ProductRow for every valid row
+    errors: list  # (row_num, message, data) for every invalid row
+    processed: int
+    offset: Optional[int]
+
+
+class RowValidationError(ValueError):
+    """Raised when a CSV row cannot be imported."""
+
+
+def validate_row(row_num: int, row: dict) -> ProductRow:
+    """Normalize a raw CSV row, raising `RowValidationError` if it is invalid."""
+    sku = (row.get("sku") or "").strip()
+    name = (row.get("name") or "").strip()
+    description = (row.get("description") or "").strip() or None
+
+    if not sku or not name:
+        raise RowValidationError(MISSING_SKU_OR_NAME)
+
+    return ProductRow(row_num, sku, sku.lower(), name, description)
+
+
+def validate_chunk(chunk, offset: Optional[int] = None) -> ParsedChunk:
+    """Validate a list of `(row_num, row_dict)` tuples one row at a time."""
+    rows = []
+    errors = []
+    for row_num, row in chunk:
+        try:
+            rows.append(validate_row(row_num, row))
+        except RowValidationError as e:
+            errors.append((row_num, str(e), {key: value for key, value in row.items() if key is not None}))
+    return ParsedChunk(rows, errors, len(chunk), offset)
+
+
+class FieldDecoder:
+    """Validate raw CSV records by column position.
+
+    The sku, name and description positions are resolved once from the
+    header, so each record is read straight from the list `csv.reader`
+    returns without building a dict. A row dict is only assembled for
+    invalid rows, which need one for the error store. Results are the same
+    as `validate_chunk` over `csv.DictReader` rows.
+    """
+
+    __slots__ = ("fieldnames", "sku_index", "name_index", "description_index")
+
+    def __init__(self, fieldnames, sku_index: int, name_index: int, description_index: Optional[int] = None):
+        self.fieldnames = fieldnames
+        self.sku_index = sku_index
+        self.name_index = name_index
+        self.description_index = description_index
+
+    def row_dict(self, fields: list) -> dict:
+        """The record as `csv.DictReader` would return it, minus extra fields."""
+        row = dict.fromkeys(self.fieldnames)
+        row.update(zip(self.fieldnames, fields))
+        return row
+
+    def decode(self, chunk, offset: Optional[int] = None) -> ParsedChunk:
+        """Validate a list of `(row_num, fields)` tuples."""
+        sku_index = self.sku_index
+        name_index = self.name_index
+        description_index = self.description_index
+        make_row = tuple.__new__  # skips ProductRow's Python-level __new__
+        rows = []
+        errors = []
+        for row_num, fields in chunk:
+            width = len(fields)
+            sku = fields[sku_index].strip() if sku_index < width else ""
+            name = fields[name_index].strip() if name_index < width else ""
+            if not sku or not name:
+                errors.append((row_num, MISSING_SKU_OR_NAME, self.row_dict(fields)))
+                continue
+            description = None
+            if description_index is not None and description_index < width:
+                description = fields[description_index].strip() or None
+            rows.append(make_row(ProductRow, (row_num, sku, sku.lower(), name, description)))
+        return ParsedChunk(rows, errors, len(chunk), offset)
+
+
+def dedupe_chunk(rows):
+    """Keep only the last row for each `sku_norm`, preserving file order.
+
+    Returns `(unique_rows, collapsed)` where `collapsed` is the number of
+    earlier duplicates that were dropped.
+    """
+    latest = {}
+    for row in rows:
+        latest.pop(row.sku_norm, None)
+        latest[row.sku_norm] = row
+    unique_rows = list(latest.values())
+    return unique_rows, len(rows) - len(unique_rows)
+
+
+def iter_chunks(iterable, size: int):
+    """Yield lists of at most `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,140 @@
+"""Progress reporting for import jobs.
+
+Each progress point costs one pipelined Redis round trip: a PUBLISH on
+`job:{job_id}:progress` for live listeners and an HSET of the same snapshot
+into the `job:{job_id}:status` hash for readers that poll (see
+`read_progress`). `ProgressReporter` rate-limits those publishes, and the
+Job row writes that carry counters and checkpoints, by wall-clock time
+rather than by chunk count.
+"""
+import json
+import time
+
+from app.config import get_settings
+from app.redis_client import redis_client
+
+settings = get_settings()
+
+STATUS_TTL = 24 * 60 * 60  # seconds a finished job's status hash is kept
+
+_INT_FIELDS = (
+    "processed_rows",
+    "created_rows",
+    "updated_rows",
+    "failed_rows",
+    "duplicate_rows",
+    "unchanged_rows",
+    "total_rows",
+    "progress_percentage",
+)
+
+
+def progress_channel(job_id: str) -> str:
+    return f"job:{job_id}:progress"
+
+
+def status_key(job_id: str) -> str:
+    return f"job:{job_id}:status"
+
+
+def publish_progress(job_id: str, step: str, processed: int, created: int, updated: int, failed: int, total: int, percentage: int, errors: list = None, duplicates: int = 0, unchanged: int = 0, metrics: dict = None):
+    """Publish a progress event and store it as the job's latest status.
+
+    `metrics` is the import's stage timings (`ImportMetrics.as_dict()`), if any.
+    """
+    if not redis_client:
+        return
+
+    message = {
+        "job_id": job_id,
+        "current_step": step,
+        "processed_rows": processed,
+        "created_rows": created,
+        "updated_rows": updated,
+        "failed_rows": failed,
+        "duplicate_rows": duplicates,
+        "unchanged_rows": unchanged,
+        "total_rows": total,
+        "progress_percentage": percentage,
+        "errors": errors or [],
+    }
+    status = {**message, "errors": json.dumps(message["errors"])}
+    if metrics is not None:
+        message["metrics"] = metrics
+        status["metrics"] = json.dumps(metrics)
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.publish(progress_channel(job_id), json.dumps(message))
+        pipe.hset(status_key(job_id), mapping=status)
+        pipe.expire(status_key(job_id), STATUS_TTL)
+        pipe.execute()
+    except Exception:
+        pass
+
+
+def read_progress(job_id: str):
+    """Latest published progress for a job, or None if Redis has none."""
+    if not redis_client:
+        return None
+    try:
+        status = redis_client.hgetall(status_key(job_id))
+    except Exception:
+        return None
+    if not status:
+        return None
+
+    for field in _INT_FIELDS:
+        if field in status:
+            status[field] = int(status[field])
+    status["errors"] = json.loads(status.get("errors") or "[]")
+    if "metrics" in status:
+        status["metrics"] = json.loads(status["metrics"])
+    return status
+
+
+class ProgressReporter:
+    """Coalesce an import's progress updates by time.
+
+    `report()` publishes at most once every `progress_interval_ms`, and
+    `db_due()` says whether a sharded import should roll its shards'
+    counters up onto the Job (at most every `progress_db_interval_ms`).
+    An interval of 0 reports on every call.
+    """
+
+    def __init__(self, job_id: str, clock=time.monotonic):
+        self.job_id = job_id
+        self._clock = clock
+        self._last_publish = None
+        self._last_db = clock()
+
+    def _due(self, last, interval_ms: int) -> bool:
+        return last is None or interval_ms <= 0 or (self._clock() - last) * 1000 >= interval_ms
+
+    def db_due(self) -> bool:
+        """Whether it is time to write counters to the database; resets the timer if so."""
+        if not self._due(self._last_db, settings.progress_db_interval_ms):
+            return False
+        self._last_db = self._clock()
+        return True
+
+    def report(self, step: str, counters, percentage: int, total: int = 0, errors: list = None, force: bool = False, metrics=None) -> bool:
+        """Publish `counters` (and `metrics`' totals) if the publish interval has elapsed (or `force`)."""
+        if not force and not self._due(self._last_publish, settings.progress_interval_ms):
+            return False
+        self._last_publish = self._clock()
+        publish_progress(
+            self.job_id,
+            step,
+            counters.processed,
+            counters.created,
+            counters.updated,
+            counters.failed,
+            total,
+            percentage,
+            counters.errors[-10:] if errors is None else errors,
+            duplicates=counters.duplicates,
+            unchanged=counters.unchanged,
+            metrics=metrics.as_dict(chunks=False) if metrics is not None else None,
+        )
+        return True
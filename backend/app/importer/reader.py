@@ -0,0 +1,191 @@
+"""Streaming readers for line-based uploads (CSV, NDJSON).
+
+Rows are yielded one at a time straight from disk, so memory use stays flat
+regardless of the upload size.
+"""
+import csv
+import os
+from pathlib import Path
+
+from app.importer.compression import detect_compression, open_decompressed
+
+REQUIRED_COLUMNS = {"sku", "name"}
+
+
+class CsvFormatError(ValueError):
+    """Raised when the CSV header is missing or lacks required columns."""
+
+
+def number_records(lines, first_row_num: int = 2):
+    """Parse CSV `lines` into `(row_num, fields)` tuples, skipping blank lines."""
+    row_num = first_row_num
+    for fields in csv.reader(lines):
+        if not fields:
+            continue
+        yield row_num, fields
+        row_num += 1
+
+
+class LineReader:
+    """Read a text upload line by line while tracking bytes consumed.
+
+    The file is opened in binary mode and decoded line by line, which keeps
+    `tell()` usable during iteration so progress can be reported against the
+    file size without counting rows up front.
+
+    Compressed uploads are decompressed as they are read (see
+    `app.importer.compression`). Offsets then refer to the decompressed
+    stream. gzip and zstd do not record its length, so there `size` is None
+    and progress is measured against the compressed file instead.
+    """
+
+    first_row_num = 1  # number reported for the first record
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.compression = detect_compression(self.path)
+        self.raw_size = os.path.getsize(self.path)
+        self.size = self.raw_size if self.compression is None else None
+        self.start = 0
+        self.end = self.size
+        self._raw = None
+        self._file = None
+
+    def __enter__(self):
+        self._raw = open(self.path, "rb")
+        if self.compression is None:
+            self._file = self._raw
+            return self
+        try:
+            self._file, self.size = open_decompressed(self._raw, self.compression)
+        except Exception:
+            self._raw.close()
+            raise
+        self.end = self.size
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+    @property
+    def bytes_read(self) -> int:
+        """Absolute byte offset reached in the file."""
+        return self._file.tell() if self._file is not None else 0
+
+    @property
+    def percentage(self) -> int:
+        """Progress through the current byte range as an integer 0-100."""
+        if self.end is None:
+            if self._raw is None or not self.raw_size:
+                return 0
+            return max(0, min(100, int(self._raw.tell() * 100 / self.raw_size)))
+        span = self.end - self.start
+        if span <= 0:
+            return 100
+        return max(0, min(100, int((self.bytes_read - self.start) * 100 / span)))
+
+    def _lines(self, end=None):
+        # Track the position from line lengths; tell() on every line is costly
+        readline = self._file.readline
+        pos = self._file.tell()
+        while end is None or pos < end:
+            raw = readline()
+            if not raw:
+                return
+            pos += len(raw)
+            yield raw.decode("utf-8")
+
+
+class CsvReader(LineReader):
+    """Iterate the rows of a CSV file while tracking bytes consumed.
+
+    `rows()` can be limited to a byte range that starts and ends on record
+    boundaries (see `app.importer.sharding`).
+
+    Usage:
+        with CsvReader(path) as reader:
+            for row_num, row in reader.rows():
+                ...
+    """
+
+    format = "csv"
+    first_row_num = 2  # the header is row 1
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.fieldnames = None
+        self.header_end = None
+
+    def read_header(self) -> list:
+        """Parse and validate the header row, recording where the data starts."""
+        self._file.seek(0)
+        header_reader = csv.reader(self._lines(self.size))
+        fieldnames = []
+        for fieldnames in header_reader:
+            if fieldnames:
+                break
+        if not fieldnames:
+            raise CsvFormatError("CSV has no header")
+
+        # Expect: sku, name, description (at minimum)
+        if not REQUIRED_COLUMNS.issubset(set(fieldnames)):
+            raise CsvFormatError(f"CSV must have columns: {REQUIRED_COLUMNS}")
+
+        self.fieldnames = fieldnames
+        self.header_end = self._file.tell()
+        return fieldnames
+
+    def column_index(self, name: str):
+        """Position of a header column, or None if absent.
+
+        Uses the last occurrence to match `csv.DictReader`, where a repeated
+        column name overwrites the earlier one.
+        """
+        if self.fieldnames is None:
+            self.read_header()
+        for index in range(len(self.fieldnames) - 1, -1, -1):
+            if self.fieldnames[index] == name:
+                return index
+        return None
+
+    def records(self, start: int = None, end: int = None, first_row_num: int = 2):
+        """Yield `(row_num, fields)` tuples with the raw field list of each record.
+
+        Numbering matches `rows()`: blank lines are skipped without
+        consuming a row number.
+        """
+        if self.fieldnames is None:
+            self.read_header()
+
+        self.start = self.header_end if start is None else start
+        self.end = self.size if end is None else end
+        self._file.seek(self.start)
+        yield from number_records(self._lines(self.end), first_row_num)
+
+    def rows(self, start: int = None, end: int = None, first_row_num: int = 2):
+        """Yield `(row_num, row_dict)` tuples.
+
+        Args:
+            start: Byte offset of the first record (defaults to just after the header)
+            end: Byte offset to stop at (defaults to end of file)
+            first_row_num: Row number reported for the first record
+        """
+        if self.fieldnames is None:
+            self.read_header()
+
+        self.start = self.header_end if start is None else start
+        self.end = self.size if end is None else end
+        self._file.seek(self.start)
+
+        reader = csv.DictReader(self._lines(self.end), fieldnames=self.fieldnames)
+        for row_num, row in enumerate(reader, start=first_row_num):
+            yield row_num, row
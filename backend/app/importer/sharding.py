@@ -0,0 +1,139 @@
+"""Split a CSV file into byte-range shards that start on record boundaries.
+
+Boundaries are found with a single sequential scan that tracks whether the
+current byte is inside a quoted field, so a newline embedded in a quoted
+value is never mistaken for the end of a record. Doubled quotes (`""`)
+toggle the state twice and therefore cancel out.
+
+Blank lines are not counted as records, because `number_records` and
+pyarrow skip them without using up a row number; shards must number their
+rows exactly as a serial import would, or error rows and the dedup index
+(keyed by row number) would point at the wrong rows.
+"""
+import re
+from typing import NamedTuple
+
+from app.importer.reader import CsvReader
+
+SCAN_BLOCK_SIZE = 1024 * 1024  # 1MB
+
+# A newline ending an empty line (optionally `\r\n`) right after another one
+_BLANK_LINE = re.compile(rb"(?<=\n)\r?\n")
+
+
+class Shard(NamedTuple):
+    """A byte range of a CSV file processed by one worker."""
+    index: int
+    start: int
+    end: int
+    first_row_num: int
+
+
+def _count_records(data: bytes, starts_blank: bool) -> int:
+    """Newlines in unquoted `data` that end a non-blank record.
+
+    `starts_blank` tells whether the record `data` begins in has had no
+    content (other than `\r`) so far.
+    """
+    records = data.count(b"\n") - len(_BLANK_LINE.findall(data))
+    first = data.find(b"\n")
+    if first != -1 and starts_blank and data[:first] in (b"", b"\r"):
+        records -= 1
+    return records
+
+
+def _ends_blank(data: bytes, starts_blank: bool) -> bool:
+    """Whether the record still open at the end of unquoted `data` is empty so far."""
+    last = data.rfind(b"\n")
+    if last == -1:
+        return starts_blank and data in (b"", b"\r")
+    return data[last + 1:] in (b"", b"\r")
+
+
+def find_record_boundaries(path, start: int, targets, block_size: int = SCAN_BLOCK_SIZE) -> list:
+    """Find the first record boundary at or after each target offset.
+
+    Scanning begins at `start`, which must itself be a record boundary.
+
+    Returns:
+        A list of `(offset, records_before)` tuples, one per target that lies
+        before the end of the file, where `records_before` is the number of
+        non-blank records between `start` and `offset`.
+    """
+    targets = iter(sorted(targets))
+    target = next(targets, None)
+    results = []
+    in_quotes = False
+    blank = True  # the current record has no content yet
+    records = 0
+    pos = start
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        while target is not None:
+            block = f.read(block_size)
+            if not block:
+                break
+
+            seg_start = pos
+            for i, segment in enumerate(block.split(b'"')):
+                if i:
+                    in_quotes = not in_quotes
+                    blank = False
+                if not in_quotes:
+                    while target is not None:
+                        # a boundary is the byte after an unquoted newline
+                        idx = segment.find(b"\n", max(0, target - 1 - seg_start))
+                        if idx == -1:
+                            break
+                        results.append((seg_start + idx + 1, records + _count_records(segment[:idx + 1], blank)))
+                        target = next(targets, None)
+                    records += _count_records(segment, blank)
+                    blank = _ends_blank(segment, blank)
+                seg_start += len(segment) + 1  # +1 for the quote that ended the segment
+            pos += len(block)
+
+    return results
+
+
+def last_record_boundary(block: bytes) -> int:
+    """Offset just past the last complete record in `block`, or 0 if there is none.
+
+    `block` must start on a record boundary.
+    """
+    in_quotes = False
+    boundary = 0
+    seg_start = 0
+    for i, segment in enumerate(block.split(b'"')):
+        if i:
+            in_quotes = not in_quotes
+        if not in_quotes:
+            idx = segment.rfind(b"\n")
+            if idx != -1:
+                boundary = seg_start + idx + 1
+        seg_start += len(segment) + 1
+    return boundary
+
+
+def plan_shards(path, shard_count: int) -> list:
+    """Split the data section of a CSV file into at most `shard_count` shards."""
+    with CsvReader(path) as reader:
+        reader.read_header()
+        data_start = reader.header_end
+        size = reader.size
+
+    span = size - data_start
+    targets = []
+    if shard_count > 1 and span > 0:
+        targets = [data_start + span * k // shard_count for k in range(1, shard_count)]
+
+    boundaries = [(data_start, 0)]
+    for offset, records in find_record_boundaries(path, data_start, targets):
+        if offset > boundaries[-1][0] and offset < size:
+            boundaries.append((offset, records))
+    boundaries.append((size, None))
+
+    return [
+        Shard(index, start, end, first_row_num=records + 2)  # +2 for the header and 1-based rows
+        for index, ((start, records), (end, _)) in enumerate(zip(boundaries, boundaries[1:]))
+    ]
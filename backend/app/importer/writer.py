@@ -0,0 +1,257 @@
+"""Set-based writers that persist validated product chunks."""
+import csv
+import io
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import literal_column, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import Product
+from app.models.product import product_content_hash
+from app.product_totals import adjust_product_count
+
+
+def column_length_error(row) -> Optional[str]:
+    """Why Postgres would reject `row` for a value longer than its column, or None.
+
+    SQLite does not enforce `String` lengths, so the dry run and the dedup
+    pre-pass check them here.
+    """
+    for column in ("sku", "name"):
+        limit = getattr(Product, column).type.length
+        if len(getattr(row, column)) > limit:
+            return f"{column} is longer than {limit} characters"
+    return None
+
+
+class UpsertResult(NamedTuple):
+    """A product row as stored after an upsert."""
+    id: Optional[int]  # None for products a dry run would create
+    sku: str
+    sku_norm: str
+    name: str
+    description: Optional[str]
+    created: bool
+
+
+class BulkUpsertWriter:
+    """Write a chunk with a single `INSERT ... ON CONFLICT (sku_norm) DO UPDATE`.
+
+    Existing products keep their original `sku` and `created_at`; only
+    `name`, `description`, `content_hash` and `updated_at` are overwritten,
+    and only when the content hash changed. Unchanged products are left
+    untouched and are not returned, so callers can count them as
+    `len(rows) - len(results)`. `RETURNING`
+    tells inserted rows apart from updated ones: Postgres exposes this via
+    `xmax = 0`, elsewhere the stored `created_at` is compared against the
+    timestamp stamped on this write.
+
+    Created rows are added to the maintained product count (see
+    `app.product_totals`) in the same transaction.
+
+    Rows must be unique by `sku_norm` within a call; Postgres refuses to
+    update the same row twice in one statement. Rows are written in
+    `sku_norm` order so concurrent shard imports lock conflicting products
+    in the same order and cannot deadlock.
+    """
+
+    name = "upsert"
+
+    def __init__(self, db):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def _insert(self):
+        if self.dialect == "postgresql":
+            return postgresql.insert(Product)
+        if self.dialect == "sqlite":
+            return sqlite.insert(Product)
+        raise NotImplementedError(f"Bulk upsert is not supported on {self.dialect}")
+
+    def write(self, rows) -> list:
+        """Upsert `rows` (ProductRow) and return an `UpsertResult` per created or changed row."""
+        if not rows:
+            return []
+
+        now = datetime.utcnow()
+        stmt = self._insert()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.sku_norm],
+            set_={
+                "name": stmt.excluded.name,
+                "description": stmt.excluded.description,
+                "content_hash": stmt.excluded.content_hash,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=Product.content_hash.is_distinct_from(stmt.excluded.content_hash),
+        )
+        if self.dialect == "postgresql":
+            created = literal_column("xmax = 0")
+        else:
+            created = Product.created_at
+        stmt = stmt.returning(
+            Product.id,
+            Product.sku,
+            Product.sku_norm,
+            Product.name,
+            Product.description,
+            created,
+        )
+
+        params = [
+            {
+                "sku": row.sku,
+                "sku_norm": row.sku_norm,
+                "name": row.name,
+                "description": row.description,
+                "content_hash": product_content_hash(row.name, row.description),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for row in sorted(rows, key=lambda row: row.sku_norm)
+        ]
+        results = []
+        for returned in self.db.execute(stmt, params).all():
+            was_created = returned[5] if self.dialect == "postgresql" else returned[5] == now
+            results.append(UpsertResult(*returned[:5], created=bool(was_created)))
+        adjust_product_count(self.db, sum(result.created for result in results))
+        return results
+
+
+class CopyWriter(BulkUpsertWriter):
+    """Postgres writer that loads each chunk with `COPY FROM STDIN`.
+
+    Rows are streamed into a session-local temp table through psycopg2's
+    `copy_expert` and merged into `products` with one
+    `INSERT ... SELECT ... ON CONFLICT`. The staging table is emptied on
+    every commit, and explicitly before each load so a retried chunk in the
+    same transaction starts clean.
+    """
+
+    name = "copy"
+    staging_table = "products_import_staging"
+
+    def __init__(self, db):
+        super().__init__(db)
+        if self.dialect != "postgresql":
+            raise NotImplementedError("COPY import requires PostgreSQL")
+
+    def _copy_rows(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # None is written unquoted, which COPY's CSV format reads as NULL
+            writer.writerow((
+                row.sku,
+                row.sku_norm,
+                row.name,
+                row.description,
+                product_content_hash(row.name, row.description),
+            ))
+        buffer.seek(0)
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} ("
+                "sku text, sku_norm text, name text, description text, content_hash text"
+                ") ON COMMIT DELETE ROWS"
+            )
+            cursor.execute(f"TRUNCATE {self.staging_table}")
+            cursor.copy_expert(
+                f"COPY {self.staging_table} (sku, sku_norm, name, description, content_hash) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+    def write(self, rows) -> list:
+        if not rows:
+            return []
+
+        self._copy_rows(rows)
+        now = datetime.utcnow()
+        merged = self.db.execute(
+            text(
+                f"INSERT INTO products (sku, sku_norm, name, description, content_hash, created_at, updated_at) "
+                f"SELECT sku, sku_norm, name, description, content_hash, :now, :now FROM {self.staging_table} "
+                "ORDER BY sku_norm "
+                "ON CONFLICT (sku_norm) DO UPDATE SET "
+                "name = EXCLUDED.name, "
+                "description = EXCLUDED.description, "
+                "content_hash = EXCLUDED.content_hash, "
+                "updated_at = EXCLUDED.updated_at "
+                "WHERE products.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+                "RETURNING id, sku, sku_norm, name, description, (xmax = 0)"
+            ),
+            {"now": now},
+        )
+        results = [UpsertResult(*returned[:5], created=bool(returned[5])) for returned in merged]
+        adjust_product_count(self.db, sum(result.created for result in results))
+        return results
+
+
+class DryRunWriter:
+    """Classify a chunk as creates, updates and unchanged rows without writing.
+
+    Existing products are looked up by `sku_norm` with read-only
+    `SELECT ... WHERE sku_norm IN (...)` batches and their content hash is
+    compared the way the upsert's `WHERE` clause would, so the results match
+    what `BulkUpsertWriter` would return for the same rows. Values longer
+    than their column raise, as they would on Postgres, so the caller's
+    row-by-row retry reports them as failed rows.
+    """
+
+    name = "dry_run"
+    lookup_batch_size = 5000  # stays well below SQLite's bound parameter limit
+
+    def __init__(self, db):
+        self.db = db
+
+    def write(self, rows) -> list:
+        """Return an `UpsertResult` per row that would be created or changed."""
+        for row in rows:
+            error = column_length_error(row)
+            if error:
+                raise ValueError(error)
+
+        keys = [row.sku_norm for row in rows]
+        existing = {}
+        for start in range(0, len(keys), self.lookup_batch_size):
+            found = self.db.execute(
+                select(Product.sku_norm, Product.id, Product.content_hash)
+                .where(Product.sku_norm.in_(keys[start:start + self.lookup_batch_size]))
+            )
+            for sku_norm, product_id, content_hash in found:
+                existing[sku_norm] = (product_id, content_hash)
+
+        results = []
+        for row in sorted(rows, key=lambda row: row.sku_norm):
+            match = existing.get(row.sku_norm)
+            if match is None:
+                results.append(UpsertResult(None, row.sku, row.sku_norm, row.name, row.description, created=True))
+            elif match[1] != product_content_hash(row.name, row.description):
+                results.append(UpsertResult(match[0], row.sku, row.sku_norm, row.name, row.description, created=False))
+        return results
+
+
+def get_writer(db, engine: str = "auto"):
+    """Pick the import writer for the session's database.
+
+    `auto` uses COPY on Postgres with psycopg2 and the bulk upsert
+    everywhere else (e.g. SQLite). `dry_run` writes nothing.
+    """
+    bind = db.get_bind()
+    if engine == "dry_run":
+        return DryRunWriter(db)
+    if engine == "copy":
+        return CopyWriter(db)
+    if engine == "upsert":
+        return BulkUpsertWriter(db)
+    if engine != "auto":
+        raise ValueError(f"Unknown import engine: {engine}")
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        return CopyWriter(db)
+    return BulkUpsertWriter(db)
@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import get_settings
-from app.database import Base, engine
+from app.database import Base, async_engine, engine
 from app.routers import health, products, uploads, webhooks, jobs
 from app.routers import webhooks
 
@@ -16,8 +16,8 @@ async def lifespan(app: FastAPI):
     # Startup: create tables
     Base.metadata.create_all(bind=engine)
     yield
-    # Shutdown: cleanup
-    pass
+    # Shutdown: close the async engine's pooled connections
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -2,5 +2,8 @@
 from app.models.product import Product
 from app.models.webhook import Webhook
 from app.models.job import Job, JobStatus
+from app.models.job_shard import JobShard
+from app.models.job_error import JobError
+from app.models.row_count import RowCount, RowCountDelta
 
-__all__ = ["Product", "Webhook", "Job", "JobStatus"]
+__all__ = ["Product", "Webhook", "Job", "JobStatus", "JobShard", "JobError", "RowCount", "RowCountDelta"]
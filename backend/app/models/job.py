@@ -1,5 +1,5 @@
 """Job model for tracking CSV import jobs."""
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, func, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Boolean, func, Enum
 from datetime import datetime
 from enum import Enum as PyEnum
 from app.database import Base
@@ -23,15 +23,21 @@ class Job(Base):
     job_id = Column(String(36), unique=True, index=True)  # UUID for external reference
     status = Column(String(20), default=JobStatus.PENDING, nullable=False, index=True)
     filename = Column(String(500), nullable=False)
+    priority = Column(Integer, default=5, nullable=False)  # 0-9; higher is imported first within its queue
+    dry_run = Column(Boolean, default=False, nullable=False)  # Validate and classify rows only; counters are what an import would do
     total_rows = Column(Integer, default=0)
     processed_rows = Column(Integer, default=0)
     created_rows = Column(Integer, default=0)
     updated_rows = Column(Integer, default=0)
     failed_rows = Column(Integer, default=0)
+    duplicate_rows = Column(Integer, default=0)  # Rows collapsed into a later row with the same SKU
+    unchanged_rows = Column(Integer, default=0)  # Existing products left as-is because their content hash matched
     current_step = Column(String(100), nullable=True)  # Current processing step: "parsing", "validating", "importing"
     progress_percentage = Column(Integer, default=0)  # 0-100
     error_message = Column(Text, nullable=True)
-    errors = Column(JSON, default=list, nullable=True)  # List of row errors
+    errors = Column(JSON, default=list, nullable=True)  # Sample of the first row errors; all of them are in job_errors
+    checkpoint = Column(JSON, nullable=True)  # Resume point: {"offset", "row_num", counters} after the last committed chunk
+    metrics = Column(JSON, nullable=True)  # Per-stage wall/CPU time, statement count and chunk throughput (see app.importer.metrics)
     celery_task_id = Column(String(100), nullable=True, index=True)  # Celery task ID for tracking
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
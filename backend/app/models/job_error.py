@@ -0,0 +1,25 @@
+"""JobError model holding every failed row of an import job."""
+from sqlalchemy import Column, Integer, String, Text, JSON, BigInteger, ForeignKey, UniqueConstraint
+from app.database import Base
+
+
+class JobError(Base):
+    """A CSV row that could not be imported.
+
+    Rows are keyed by `(job_id, row_num)`, which is also the keyset used to
+    page through them; a chunk replayed after a resume re-inserts the same
+    keys and is ignored. Only a capped sample is kept on `Job.errors`.
+    """
+
+    __tablename__ = "job_errors"
+    __table_args__ = (UniqueConstraint("job_id", "row_num", name="uq_job_errors_job_id_row_num"),)
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    job_id = Column(String(36), ForeignKey("jobs.job_id", ondelete="CASCADE"), nullable=False)
+    row_num = Column(Integer, nullable=False)
+    sku = Column(String(255), nullable=True)
+    error = Column(Text, nullable=False)
+    data = Column(JSON, nullable=True)  # The failed row's values, keyed by CSV column
+
+    def __repr__(self):
+        return f"<JobError(job_id={self.job_id}, row={self.row_num}, error={self.error})>"
@@ -0,0 +1,36 @@
+"""JobShard model for tracking the byte-range shards of a parallel import."""
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, BigInteger, ForeignKey, UniqueConstraint
+from app.database import Base
+from app.models.job import JobStatus
+
+
+class JobShard(Base):
+    """One byte range of a large CSV, imported by its own Celery task."""
+
+    __tablename__ = "job_shards"
+    __table_args__ = (UniqueConstraint("job_id", "shard_index", name="uq_job_shards_job_id_shard_index"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(36), ForeignKey("jobs.job_id", ondelete="CASCADE"), nullable=False, index=True)
+    shard_index = Column(Integer, nullable=False)
+    status = Column(String(20), default=JobStatus.PENDING, nullable=False)
+    start_offset = Column(BigInteger, nullable=False)  # First byte of the shard (a record boundary)
+    end_offset = Column(BigInteger, nullable=False)  # Byte offset the shard stops at
+    current_offset = Column(BigInteger, nullable=False, default=0)  # Bytes consumed so far, for progress
+    first_row_num = Column(Integer, nullable=False)  # CSV row number of the first record
+    processed_rows = Column(Integer, default=0)
+    created_rows = Column(Integer, default=0)
+    updated_rows = Column(Integer, default=0)
+    failed_rows = Column(Integer, default=0)
+    duplicate_rows = Column(Integer, default=0)  # Rows collapsed into a later row with the same SKU
+    unchanged_rows = Column(Integer, default=0)  # Existing products left as-is because their content hash matched
+    errors = Column(JSON, default=list, nullable=True)
+    checkpoint = Column(JSON, nullable=True)  # Resume point: {"offset", "row_num", counters} after the last committed chunk
+    metrics = Column(JSON, nullable=True)  # Stage timings of this shard; finalize_import sums them onto the Job
+    error_message = Column(Text, nullable=True)
+    celery_task_id = Column(String(100), nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<JobShard(job_id={self.job_id}, shard={self.shard_index}, status={self.status}, bytes={self.start_offset}-{self.end_offset})>"
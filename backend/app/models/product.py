@@ -2,11 +2,19 @@
 
 Now constrained to exactly the required fields: sku, name, description.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+import hashlib
+import json
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, event
 from datetime import datetime
 from app.database import Base
 
 
+def product_content_hash(name, description) -> str:
+    """Hash of the mutable product fields, used to skip no-op updates."""
+    payload = json.dumps([name, description], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
 class Product(Base):
     """Product model for storing product information.
 
@@ -16,16 +24,23 @@ class Product(Base):
     - sku_norm: lowercase normalized SKU for uniqueness checks
     - name: product name
     - description: product description
+    - content_hash: hash of name + description (see `product_content_hash`)
     - created_at/updated_at timestamps
     """
 
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination of GET /products seeks on (sort column, id)
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sku = Column(String(255), nullable=False)
     sku_norm = Column(String(255), nullable=False, unique=True, index=True)
     name = Column(String(500), nullable=False, index=True)
     description = Column(Text, nullable=True)
+    content_hash = Column(String(32), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -33,3 +48,10 @@ class Product(Base):
 
     def __repr__(self):
         return f"<Product(id={self.id}, sku={self.sku}, name={self.name})>"
+
+
+@event.listens_for(Product, "before_insert")
+@event.listens_for(Product, "before_update")
+def _set_content_hash(mapper, connection, target):
+    """Keep content_hash in sync for ORM writes (bulk imports set it themselves)."""
+    target.content_hash = product_content_hash(target.name, target.description)
@@ -0,0 +1,39 @@
+"""RowCount and RowCountDelta models holding maintained row counts of large tables."""
+from sqlalchemy import Column, String, BigInteger, Integer
+from app.database import Base
+
+
+class RowCount(Base):
+    """Exact row count of a table, kept up to date by the code that writes it.
+
+    Writers record their inserts and deletes as `RowCountDelta` rows in the
+    same transaction, and these are folded into `row_count` from time to
+    time (see `app.product_totals`). Reading the count is then a primary
+    key lookup plus a sum over the few pending deltas, instead of a
+    `COUNT(*)` over the table.
+    """
+
+    __tablename__ = "row_counts"
+
+    table_name = Column(String(64), primary_key=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RowCount(table_name={self.table_name}, row_count={self.row_count})>"
+
+
+class RowCountDelta(Base):
+    """A pending change to a `RowCount`, appended by the transaction that made it.
+
+    Appending instead of updating the `row_counts` row means concurrent
+    writers never queue on that row's lock.
+    """
+
+    __tablename__ = "row_count_deltas"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(64), nullable=False, index=True)
+    delta = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<RowCountDelta(table_name={self.table_name}, delta={self.delta})>"
@@ -13,6 +13,7 @@ class Webhook(Base):
     url = Column(String(500), nullable=False)  # Webhook URL
     event_types = Column(JSON, default=list, nullable=False)  # List of event types: ['product.created', 'product.updated', 'product.deleted']
     enabled = Column(Boolean, default=True, index=True)
+    batch_size = Column(Integer, default=0, nullable=False)  # Max items per products.batch_upserted delivery from imports; 0 = one event per product
     last_triggered_at = Column(DateTime, nullable=True)
     last_response_status = Column(Integer, nullable=True)  # HTTP status code from last delivery
     last_response_time_ms = Column(Integer, nullable=True)  # Response time in milliseconds
@@ -0,0 +1,187 @@
+"""Two-tier read-through cache of `GET /products/{product_id}` responses.
+
+- Each process keeps an LRU of up to `product_cache_size` payloads.
+- Behind it, Redis holds `product:{id}` keys shared by every API process,
+  so a product missing from one process's LRU is usually still served
+  without a query.
+
+Both tiers hold the `ProductResponse` JSON for `product_cache_ttl` seconds.
+`invalidate()` is called once a product update or delete has committed, and
+by the import tasks once a chunk that updated products has committed. It
+deletes the Redis keys and publishes the ids on `products:changed`; every
+process listening drops them from its LRU. While Redis is unreachable,
+lookups fall through to the database and the TTL bounds how long other
+processes may serve a changed product.
+
+A database read that raced an invalidation in the same process is not
+cached. One that raced a write in another process can still leave a stale
+Redis entry until it expires.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import get_settings
+from app.redis_client import redis_client
+
+settings = get_settings()
+
+INVALIDATION_CHANNEL = "products:changed"
+
+
+def product_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+class ProductCache:
+    """Per-process LRU of product payloads in front of the shared Redis cache."""
+
+    def __init__(self, redis=redis_client):
+        self._redis = redis
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # product id -> (payload, cached_at)
+        self._generation = 0
+        self._listener_pid = None
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.product_cache_size > 0 and settings.product_cache_ttl > 0
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every invalidation; read it before querying and pass it to `put()`."""
+        return self._generation
+
+    def get_local(self, product_id: int) -> Optional[dict]:
+        """The payload from this process's LRU, or None."""
+        if not self.enabled():
+            return None
+        self._ensure_listener()
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is not None and time.monotonic() - entry[1] <= settings.product_cache_ttl:
+                self._entries.move_to_end(product_id)
+                self.local_hits += 1
+                return entry[0]
+        return None
+
+    def get_shared(self, product_id: int) -> Optional[dict]:
+        """The payload from Redis, also kept in the LRU; None counts as a miss."""
+        generation = self._generation
+        payload = None
+        if self._redis and self.enabled():
+            try:
+                raw = self._redis.get(product_key(product_id))
+            except Exception:
+                raw = None
+            if raw:
+                payload = json.loads(raw)
+
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+        self._store_local(product_id, payload, generation)
+        return payload
+
+    def put(self, payload: dict, generation: int):
+        """Cache a payload read from the database, unless invalidated since `generation`."""
+        if not self.enabled() or generation != self._generation:
+            return
+        if self._redis:
+            try:
+                self._redis.set(product_key(payload["id"]), json.dumps(payload), ex=settings.product_cache_ttl)
+            except Exception:
+                pass
+        self._store_local(payload["id"], payload, generation)
+
+    def _store_local(self, product_id: int, payload: dict, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[product_id] = (payload, time.monotonic())
+            self._entries.move_to_end(product_id)
+            while len(self._entries) > settings.product_cache_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, product_ids):
+        """Drop products from both tiers and tell the other processes to drop them."""
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        self._drop(product_ids)
+        if not self._redis:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.delete(*(product_key(product_id) for product_id in product_ids))
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(product_ids))
+            pipe.execute()
+        except Exception:
+            pass
+
+    def _drop(self, product_ids):
+        with self._lock:
+            self._generation += 1
+            for product_id in product_ids:
+                self._entries.pop(product_id, None)
+
+    def clear(self):
+        """Empty this process's LRU and reset its counters."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.local_hits = self.shared_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit and miss counts of this process since it started."""
+        with self._lock:
+            lookups = self.local_hits + self.shared_hits + self.misses
+            return {
+                "pid": os.getpid(),
+                "entries": len(self._entries),
+                "local_hits": self.local_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else None,
+            }
+
+    def _ensure_listener(self):
+        # Threads don't survive a fork, so track the pid (see SubscriptionCache)
+        if not self._redis or self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            thread = threading.Thread(target=self._listen, name="product-cache-listener", daemon=True)
+            thread.start()
+
+    def _listen(self):
+        """Drop invalidated products from the LRU, reconnecting with backoff."""
+        backoff = 1
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Invalidations may have been missed while disconnected
+                with self._lock:
+                    self._generation += 1
+                    self._entries.clear()
+                backoff = 1
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._drop(json.loads(message["data"]))
+            except Exception:
+                time.sleep(backoff)
+                backoff = min(60, backoff * 2)
+
+
+product_cache = ProductCache()
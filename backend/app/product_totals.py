@@ -0,0 +1,171 @@
+"""Totals for product listings without a `COUNT(*)` per request.
+
+- The unfiltered total is the `products` row in `row_counts` plus its
+  pending `row_count_deltas`. Everything that inserts or deletes products
+  calls `adjust_product_count()` in the same transaction, which appends a
+  delta row: import chunks (including parallel shards) and API writes
+  never wait on a shared row lock. `compact_product_count()` folds the
+  deltas into `row_counts`; it runs when an import completes and when a
+  count read finds more than `COMPACT_THRESHOLD` pending deltas.
+- Filtered totals are exact counts cached per process by normalized filter
+  for `product_count_cache_ttl` seconds, so they may trail writes by that
+  long.
+- `estimate_count()` asks the Postgres planner for its row estimate of a
+  query, which costs no table scan at all.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.models import Product, RowCount, RowCountDelta
+
+settings = get_settings()
+
+PRODUCTS = "products"
+COMPACT_THRESHOLD = 1000  # pending deltas that make a count read compact them
+
+
+def adjust_product_count(db, delta: int):
+    """Record `delta` for the product count in the current transaction."""
+    if delta:
+        db.execute(insert(RowCountDelta).values(table_name=PRODUCTS, delta=delta))
+
+
+def product_count(db) -> int:
+    """Exact number of products, from the maintained counter and its pending deltas.
+
+    The counter row is created by migration; if it is missing (e.g. tables
+    made with `create_all`) it is seeded from a one-off `COUNT(*)`.
+    """
+    pending = RowCountDelta.table_name == PRODUCTS
+    # One statement, so a concurrent compaction is seen entirely or not at all
+    base, deltas, pending_count = db.execute(select(
+        select(RowCount.row_count).where(RowCount.table_name == PRODUCTS).scalar_subquery(),
+        select(func.coalesce(func.sum(RowCountDelta.delta), 0)).where(pending).scalar_subquery(),
+        select(func.count(RowCountDelta.id)).where(pending).scalar_subquery(),
+    )).one()
+    if base is not None:
+        if pending_count > COMPACT_THRESHOLD:
+            compact_product_count(db)
+        return base + deltas
+
+    count, deltas = db.execute(select(
+        select(func.count(Product.id)).scalar_subquery(),
+        select(func.coalesce(func.sum(RowCountDelta.delta), 0)).where(pending).scalar_subquery(),
+    )).one()
+    try:
+        with db.begin_nested():
+            # Committed deltas are already reflected in COUNT(*)
+            db.add(RowCount(table_name=PRODUCTS, row_count=count - deltas))
+        db.commit()
+    except IntegrityError:
+        # Seeded concurrently by another request
+        db.rollback()
+    return count
+
+
+def compact_product_count(db):
+    """Fold the pending product count deltas into `row_counts` and commit.
+
+    Ends the session's transaction, so call it with no other changes
+    pending. The deltas are deleted with `RETURNING`, so exactly the rows
+    removed are added, even while other transactions keep appending.
+    """
+    deltas = db.execute(
+        delete(RowCountDelta).where(RowCountDelta.table_name == PRODUCTS).returning(RowCountDelta.delta)
+    ).scalars().all()
+    if not deltas:
+        db.commit()
+        return
+    result = db.execute(
+        update(RowCount)
+        .where(RowCount.table_name == PRODUCTS)
+        .values(row_count=RowCount.row_count + sum(deltas))
+    )
+    if result.rowcount:
+        db.commit()
+    else:
+        # Not seeded yet; keep the deltas for `product_count()` to account for
+        db.rollback()
+
+
+def estimate_count(db, statement) -> Optional[int]:
+    """The Postgres planner's row estimate for a select, or None on other databases.
+
+    `statement` may also be a `Query`. Async sessions call this through
+    `run_sync()`.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    sql, params = explain_statement(bind.dialect, getattr(statement, "statement", statement))
+    plan = db.connection().exec_driver_sql(sql, params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def explain_statement(dialect, statement):
+    """`EXPLAIN (FORMAT JSON)` SQL for a select and its parameters, in the driver's paramstyle.
+
+    psycopg2 takes named `%(name)s` parameters as a dict; asyncpg takes
+    `$1, $2, ...` as a sequence, in `positiontup` order.
+    """
+    compiled = statement.compile(dialect=dialect)
+    params = compiled.params
+    if dialect.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    return f"EXPLAIN (FORMAT JSON) {compiled}", params
+
+
+class FilteredCountCache:
+    """Exact counts of filtered listings, cached per process for a short TTL."""
+
+    max_entries = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = OrderedDict()
+
+    @staticmethod
+    def key(**filters) -> tuple:
+        """Normalize filters the way `ilike` compares them; unset filters are dropped."""
+        return tuple(sorted((name, value.lower()) for name, value in filters.items() if value))
+
+    def lookup(self, key: tuple) -> Optional[int]:
+        """Cached count for `key`, or None when missing or expired."""
+        ttl = settings.product_count_cache_ttl
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None and ttl > 0 and time.monotonic() - cached[1] <= ttl:
+                self._counts.move_to_end(key)
+                return cached[0]
+        return None
+
+    def store(self, key: tuple, count: int, counted_at: float):
+        """Cache `count` for `key`, as of `counted_at` (`time.monotonic()` before counting)."""
+        if settings.product_count_cache_ttl > 0:
+            with self._lock:
+                self._counts[key] = (count, counted_at)
+                self._counts.move_to_end(key)
+                while len(self._counts) > self.max_entries:
+                    self._counts.popitem(last=False)
+
+    def get(self, key: tuple, compute) -> int:
+        """Cached count for `key`, calling `compute()` when missing or expired."""
+        count = self.lookup(key)
+        if count is None:
+            counted_at = time.monotonic()
+            count = compute()
+            self.store(key, count, counted_at)
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+filtered_count_cache = FilteredCountCache()
@@ -0,0 +1,10 @@
+"""Shared Redis connection used for pub/sub and caching."""
+import redis
+from app.config import get_settings
+
+settings = get_settings()
+
+try:
+    redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+except Exception:
+    redis_client = None
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from sqlalchemy import text
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal
 from app.config import get_settings
 
 router = APIRouter()
@@ -11,9 +11,8 @@ settings = get_settings()
 async def health_check():
     """Check application and database health."""
     try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
@@ -1,23 +1,167 @@
 """Job endpoints to list and inspect import jobs."""
+import csv
+import io
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Job
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.celery_app import celery_app
+from app.database import get_async_db, SessionLocal
+from app.models import Job, JobStatus, JobError
+from app.importer.cancellation import request_cancel
+from app.importer.errors import iter_job_errors
+from app.importer.progress import read_progress
+from app.schemas import JobErrorListResponse, JobMetricsResponse
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
 @router.get("")
-async def list_jobs(limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0), db: Session = Depends(get_db)):
-    query = db.query(Job).order_by(Job.created_at.desc())
-    total = query.count()
-    items = query.offset(offset).limit(limit).all()
+async def list_jobs(limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0), db: AsyncSession = Depends(get_async_db)):
+    total = await db.scalar(select(func.count(Job.id)))
+    items = (await db.scalars(select(Job).order_by(Job.created_at.desc()).offset(offset).limit(limit))).all()
     return {"total": total, "limit": limit, "offset": offset, "items": items}
 
 
 @router.get("/{job_id}")
-async def get_job(job_id: str, db: Session = Depends(get_db)):
-    job = db.query(Job).filter(Job.job_id == job_id).first()
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    job = await _get_job_or_404(db, job_id)
+
+    # Counters on the row are only written every few seconds during an import;
+    # the latest published progress in Redis is fresher while it runs.
+    live = await run_in_threadpool(read_progress, job_id) if job.status == JobStatus.PROCESSING else None
+    if not live or live.get("processed_rows", 0) < (job.processed_rows or 0):
+        return job
+    data = jsonable_encoder(job)
+    for field in (
+        "processed_rows",
+        "created_rows",
+        "updated_rows",
+        "failed_rows",
+        "duplicate_rows",
+        "unchanged_rows",
+        "progress_percentage",
+        "current_step",
+    ):
+        if field in live:
+            data[field] = live[field]
+    return data
+
+
+async def _get_job_or_404(db: AsyncSession, job_id: str) -> Job:
+    job = await db.scalar(select(Job).filter(Job.job_id == job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
+
+
+@router.post("/{job_id}/cancel", status_code=202)
+async def cancel_job(
+    job_id: str,
+    rollback: bool = Query(False, description="Discard the chunk being written when the cancel is seen instead of committing it"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Cancel a pending or running import.
+
+    A queued job is revoked and marked cancelled right away. A running
+    import stops at its next chunk boundary and marks itself cancelled;
+    chunks committed before then stay imported.
+    """
+    job = await _get_job_or_404(db, job_id)
+    if job.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+
+    # Set even for queued jobs, in case a worker picks the task up meanwhile
+    flagged = await run_in_threadpool(request_cancel, job_id, rollback=rollback)
+    if job.status == JobStatus.PENDING:
+        if job.celery_task_id:
+            try:
+                await run_in_threadpool(celery_app.control.revoke, job.celery_task_id)
+            except Exception:
+                pass
+        job.status = JobStatus.CANCELLED
+        job.current_step = "cancelled"
+        job.completed_at = datetime.utcnow()
+        await db.commit()
+    elif not flagged:
+        raise HTTPException(status_code=503, detail="Cannot reach Redis to cancel the running import")
+    return {"job_id": job.job_id, "status": job.status, "cancel_requested": True}
+
+
+@router.get("/{job_id}/metrics", response_model=JobMetricsResponse)
+async def get_job_metrics(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Per-stage wall and CPU time, statement count and throughput of a job's import.
+
+    While the job runs, the totals from the latest progress event are
+    returned when they are fresher than the last checkpoint's.
+    """
+    job = await _get_job_or_404(db, job_id)
+    metrics = job.metrics
+    live = await run_in_threadpool(read_progress, job_id) if job.status == JobStatus.PROCESSING else None
+    if live and live.get("metrics") and live["metrics"]["rows"] >= ((metrics or {}).get("rows") or 0):
+        metrics = live["metrics"]
+    return {"job_id": job.job_id, "status": job.status, "metrics": metrics}
+
+
+@router.get("/{job_id}/errors", response_model=JobErrorListResponse)
+async def list_job_errors(
+    job_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[int] = Query(None, description="Return errors for rows after this row number"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List a job's failed rows in row order, paginated by row number."""
+    await _get_job_or_404(db, job_id)
+    query = select(JobError).filter(JobError.job_id == job_id)
+    if after is not None:
+        query = query.filter(JobError.row_num > after)
+    items = (await db.scalars(query.order_by(JobError.row_num).limit(limit + 1))).all()
+    next_after = items[limit - 1].row_num if len(items) > limit else None
+    return {"limit": limit, "after": after, "next_after": next_after, "items": items[:limit]}
+
+
+def _failed_rows_csv(job_id: str):
+    """Yield the failed rows of a job as CSV text, one keyset page at a time.
+
+    Validation failures carry every CSV column but write failures only
+    sku/name/description, so a first pass collects the union of columns
+    for the header.
+    """
+    db = SessionLocal()
+    try:
+        columns = {"row": None, "error": None}
+        for error in iter_job_errors(db, job_id):
+            columns.update(dict.fromkeys(error.data or {}))
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(columns), restval="")
+        writer.writeheader()
+        for error in iter_job_errors(db, job_id):
+            writer.writerow({**(error.data or {}), "row": error.row_num, "error": error.error})
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/{job_id}/errors/download")
+async def download_job_errors(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Stream every failed row of a job as a CSV file.
+
+    The rows are read by a sync session, which Starlette iterates in its
+    threadpool.
+    """
+    await _get_job_or_404(db, job_id)
+    return StreamingResponse(
+        _failed_rows_csv(job_id),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}-errors.csv"'},
+    )
@@ -1,12 +1,21 @@
 """Product CRUD endpoints."""
+import base64
+import binascii
+import json
+import time
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, select, tuple_
+from typing import Literal, Optional
 from decimal import Decimal
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import Product
+from app.product_cache import product_cache
+from app.product_totals import adjust_product_count, estimate_count, filtered_count_cache, product_count
+from app.search import apply_search, search_terms
 from app.schemas import (
     ProductCreate,
     ProductUpdate,
@@ -17,15 +26,60 @@ from app.tasks import schedule_webhook_event
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Sortable columns; each is paired with `id` so the order is total and every
+# page is a range seek on an (column, id) index.
+SORT_COLUMNS = {
+    "id": Product.id,
+    "sku": Product.sku_norm,
+    "name": Product.name,
+    "updated_at": Product.updated_at,
+}
+SortKey = Literal["id", "-id", "sku", "-sku", "name", "-name", "updated_at", "-updated_at", "relevance"]
+
+
+def _encode_cursor(sort: str, product: Product) -> str:
+    column = SORT_COLUMNS[sort.lstrip("-")]
+    value = getattr(product, column.key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, product.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str):
+    """Return the `(value, id)` a cursor points after; 400 if it is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, last_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail=f"Cursor was issued for sort={cursor_sort}")
+
+    # A value of the wrong type would reach the seek comparison as-is
+    python_type = SORT_COLUMNS[sort.lstrip("-")].type.python_type
+    if python_type is datetime and type(value) is str:
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if type(value) is not python_type or type(last_id) is not int:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, last_id
+
 
 @router.get("", response_model=ProductListResponse)
 async def list_products(
     limit: int = Query(10, ge=1, le=100, description="Number of items per page"),
     offset: int = Query(0, ge=0, description="Number of items to skip"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page; pages by index seek instead of offset"),
+    q: Optional[str] = Query(None, description="Search sku, name and description; every word must match as a prefix"),
+    sort: Optional[SortKey] = Query(None, description="Sort key; prefix with - for descending. Defaults to relevance with q, id otherwise"),
+    include_total: Literal["true", "false", "estimate"] = Query("true", description="`false` skips the total; `estimate` uses the database's row estimate where it has one"),
     sku: Optional[str] = Query(None, description="Filter by SKU (partial match)"),
     name: Optional[str] = Query(None, description="Filter by name (partial match)"),
     description: Optional[str] = Query(None, description="Filter by description (partial match)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     List products with pagination and filtering.
@@ -33,12 +87,25 @@ async def list_products(
     **Query Parameters:**
     - `limit`: Number of items per page (default: 10, max: 100)
     - `offset`: Number of items to skip (default: 0)
+    - `cursor`: `next_cursor` of the previous page. Cursor pages cost the same
+      however deep they are, while offset pages scan every skipped row; use
+      cursors to walk the whole catalog. Cannot be combined with `offset`.
+    - `q`: Indexed search over sku, name and description (see `app.search`);
+      every word must match the start of a word in one of them
+    - `sort`: `id`, `sku`, `name` or `updated_at`, `-` prefixed for
+      descending, or `relevance` (best matches first, offset paging only).
+      Defaults to `relevance` with `q` and `id` otherwise.
+    - `include_total`: `true` (default) returns the exact total. It comes from
+      a maintained counter when there are no filters, and for filters it is
+      cached for `product_count_cache_ttl` seconds. `estimate` returns the
+      Postgres planner's estimate for filtered listings, flagged by
+      `total_estimated`. `false` leaves `total` null.
     - `sku`: Filter by SKU (partial match, case-insensitive)
     - `name`: Filter by name (partial match, case-insensitive)
     - `description`: Filter by description (partial match, case-insensitive)
     """
     # Build filter query
-    query = db.query(Product)
+    query = select(Product)
     
     filters = []
     if sku:
@@ -51,25 +118,72 @@ async def list_products(
     
     if filters:
         query = query.filter(and_(*filters))
-    
-    # Get total count
-    total = query.count()
-    
+
+    terms = search_terms(q)
+    if terms:
+        query, relevance = apply_search(query, db.get_bind().dialect.name, terms)
+    sort = sort or ("relevance" if terms else "id")
+    if sort == "relevance" and not terms:
+        raise HTTPException(status_code=400, detail="sort=relevance requires q")
+
+    total, total_estimated = None, False
+    if include_total != "false":
+        key = filtered_count_cache.key(sku=sku, name=name, description=description, q=" ".join(terms))
+        if not key:
+            total = await db.run_sync(product_count)
+        elif include_total == "estimate":
+            total = await db.run_sync(estimate_count, query)
+            total_estimated = total is not None
+        if total is None:
+            total = filtered_count_cache.lookup(key)
+        if total is None:
+            counted_at = time.monotonic()
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
+            filtered_count_cache.store(key, total, counted_at)
+
     # Apply pagination
-    products = query.offset(offset).limit(limit).all()
-    
+    if sort == "relevance":
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursors need a sort key; relevance pages use offset")
+        products = (await db.scalars(query.order_by(*relevance).offset(offset).limit(limit))).all()
+        return {
+            "total": total,
+            "total_estimated": total_estimated,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": None,
+            "items": products,
+        }
+
+    column = SORT_COLUMNS[sort.lstrip("-")]
+    descending = sort.startswith("-")
+    if cursor:
+        if offset:
+            raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+        value, last_id = _decode_cursor(cursor, sort)
+        if column.unique or column.primary_key:
+            key, after = column, value
+        else:
+            key, after = tuple_(column, Product.id), tuple_(value, last_id)
+        query = query.filter(key < after if descending else key > after)
+    order = (column.desc(), Product.id.desc()) if descending else (column, Product.id)
+    products = (await db.scalars(query.order_by(*order).offset(offset).limit(limit + 1))).all()
+
+    next_cursor = _encode_cursor(sort, products[limit - 1]) if len(products) > limit else None
     return {
         "total": total,
+        "total_estimated": total_estimated,
         "limit": limit,
         "offset": offset,
-        "items": products,
+        "next_cursor": next_cursor,
+        "items": products[:limit],
     }
 
 
 @router.post("", response_model=ProductResponse, status_code=201)
 async def create_product(
     product: ProductCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new product.
 
@@ -78,7 +192,7 @@ async def create_product(
     """
     # Check if SKU already exists (case-insensitive)
     sku_norm = product.sku.lower().strip()
-    existing = db.query(Product).filter(Product.sku_norm == sku_norm).first()
+    existing = await db.scalar(select(Product).filter(Product.sku_norm == sku_norm))
     
     if existing:
         raise HTTPException(
@@ -95,11 +209,12 @@ async def create_product(
     )
     
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    # Schedule webhook event for creation
+    await db.run_sync(adjust_product_count, 1)
+    await db.commit()
+    await db.refresh(db_product)
+    # Schedule webhook event for creation (enqueueing blocks on the broker)
     try:
-        schedule_webhook_event("product.created", {
+        await run_in_threadpool(schedule_webhook_event, "product.created", {
             "id": db_product.id,
             "sku": db_product.sku,
             "name": db_product.name,
@@ -111,18 +226,35 @@ async def create_product(
     return db_product
 
 
+@router.get("/cache/stats")
+async def product_cache_stats():
+    """Hit and miss counts of this API process's product cache (see `app.product_cache`)."""
+    return product_cache.stats()
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get a product by ID.
     
+    Served from the process's LRU, then the shared Redis cache, then the
+    database; cached for `product_cache_ttl` seconds and invalidated when
+    the product is updated, deleted or re-imported.
+
     **Path Parameters:**
     - `product_id`: ID of the product to retrieve
     """
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    payload = product_cache.get_local(product_id)
+    if payload is None:
+        payload = await run_in_threadpool(product_cache.get_shared, product_id)
+    if payload is not None:
+        return payload
+
+    generation = product_cache.generation
+    db_product = await db.get(Product, product_id)
     
     if not db_product:
         raise HTTPException(
@@ -130,14 +262,16 @@ async def get_product(
             detail=f"Product with ID {product_id} not found"
         )
     
-    return db_product
+    payload = ProductResponse.model_validate(db_product).model_dump(mode="json")
+    await run_in_threadpool(product_cache.put, payload, generation)
+    return payload
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: int,
     product: ProductUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update a product by ID.
@@ -149,7 +283,7 @@ async def update_product(
     - `name`: Product name
     - `description`: Product description
     """
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = await db.get(Product, product_id)
     
     if not db_product:
         raise HTTPException(
@@ -164,11 +298,12 @@ async def update_product(
         db_product.description = product.description.strip() if product.description else None
     # price/active removed from model
     
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await db.refresh(db_product)
+    await run_in_threadpool(product_cache.invalidate, [product_id])
     # Schedule webhook event for update
     try:
-        schedule_webhook_event("product.updated", {
+        await run_in_threadpool(schedule_webhook_event, "product.updated", {
             "id": db_product.id,
             "sku": db_product.sku,
             "name": db_product.name,
@@ -183,7 +318,7 @@ async def update_product(
 @router.delete("/{product_id}", status_code=204)
 async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Delete a product by ID.
@@ -191,7 +326,7 @@ async def delete_product(
     **Path Parameters:**
     - `product_id`: ID of the product to delete
     """
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+    db_product = await db.get(Product, product_id)
     
     if not db_product:
         raise HTTPException(
@@ -206,11 +341,13 @@ async def delete_product(
         "name": db_product.name,
         "description": db_product.description,
     }
-    db.delete(db_product)
-    db.commit()
+    await db.delete(db_product)
+    await db.run_sync(adjust_product_count, -1)
+    await db.commit()
+    await run_in_threadpool(product_cache.invalidate, [product_id])
     # Schedule webhook for deletion
     try:
-        schedule_webhook_event("product.deleted", product_payload)
+        await run_in_threadpool(schedule_webhook_event, "product.deleted", product_payload)
     except Exception:
         pass
     
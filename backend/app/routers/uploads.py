@@ -1,15 +1,19 @@
 """File upload endpoints for CSV imports."""
 import os
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from typing import Literal
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
 from fastapi import status
+from fastapi.concurrency import run_in_threadpool
 from uuid import uuid4
 from app.config import get_settings
-from app.database import get_db
-from sqlalchemy.orm import Session
+from app.database import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Job, JobStatus
 from datetime import datetime
 from pathlib import Path
-from app.celery_app import celery_app
+from app.celery_app import DEFAULT_PRIORITY, MAX_PRIORITY, celery_app, import_task_options
+from app.importer.compression import CompressionError, check_upload
+from app.importer.formats import accepted_suffixes
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
@@ -20,16 +24,25 @@ UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
 @router.post("", status_code=201)
-async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_csv(
+    file: UploadFile = File(...),
+    mode: Literal["import", "dry_run"] = Query("import", description="`dry_run` validates the file and reports what an import would do without changing products"),
+    priority: int = Query(DEFAULT_PRIORITY, ge=0, le=MAX_PRIORITY, description="Higher priorities are imported first within their queue"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """Upload a CSV file and create an import job.
 
+    - Accepts CSV, NDJSON (`.ndjson`/`.jsonl`) and Parquet uploads; CSV and NDJSON may be `.gz`, `.zst` or single-file `.zip` compressed. Compressed files are stored as uploaded and decompressed while importing.
     - Saves the uploaded file under `backend/uploads/` directory.
     - Creates a Job row with status PENDING and returns job_id.
+    - Uploads up to `import_bulk_threshold` bytes are queued on the interactive import queue, larger ones on the bulk queue, so small uploads never wait behind a huge one; `priority` orders jobs within a queue.
+    - With `mode=dry_run` the job parses and validates every row and counts the products it would create, update or leave unchanged, without writing products or sending webhooks; failed rows are listed under `/jobs/{job_id}/errors` as usual.
     - If Celery is available and a worker is running, it will attempt to enqueue a background task. If not, the job will remain pending.
     """
     # Basic validation
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Only .csv files are accepted")
+    suffixes = accepted_suffixes()
+    if not file.filename.lower().endswith(suffixes):
+        raise HTTPException(status_code=400, detail=f"Only {', '.join(suffixes)} files are accepted")
 
     # Save file in streaming mode and enforce max size
     file_id = uuid4().hex
@@ -52,12 +65,20 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
     finally:
         await file.close()
 
+    try:
+        await run_in_threadpool(check_upload, dest_path)
+    except CompressionError as e:
+        dest_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=str(e))
+
     # Create Job record
     job_uuid = str(uuid4())
     db_job = Job(
         job_id=job_uuid,
         status=JobStatus.PENDING,
         filename=str(dest_path),
+        dry_run=mode == "dry_run",
+        priority=priority,
         total_rows=0,
         processed_rows=0,
         created_rows=0,
@@ -70,20 +91,26 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
     )
 
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
 
     # Try to enqueue Celery task (best-effort)
     celery_task_id = None
     try:
         # Use a best-effort send_task; actual task implementation will be added in Task 6
-        async_result = celery_app.send_task("app.tasks.import_csv", args=[db_job.job_id, str(dest_path)])
+        # Publishing blocks on the broker, so keep it off the event loop
+        async_result = await run_in_threadpool(
+            celery_app.send_task,
+            "app.tasks.import_csv",
+            args=[db_job.job_id, str(dest_path)],
+            **import_task_options(total_bytes, db_job.priority),
+        )
         celery_task_id = getattr(async_result, "id", None)
         if celery_task_id:
             db_job.celery_task_id = celery_task_id
-            db.commit()
+            await db.commit()
     except Exception:
         # If Celery broker not available, leave job pending and return success
         pass
 
-    return {"job_id": db_job.job_id, "status": db_job.status, "celery_task_id": db_job.celery_task_id}
+    return {"job_id": db_job.job_id, "status": db_job.status, "dry_run": db_job.dry_run, "celery_task_id": db_job.celery_task_id}
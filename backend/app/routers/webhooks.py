@@ -1,10 +1,13 @@
 """Webhook CRUD endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.webhook import Webhook
+from app.webhook_subscriptions import subscription_cache
 from app.schemas import (
     WebhookCreate,
     WebhookUpdate,
@@ -19,38 +22,39 @@ router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 async def list_webhooks(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Webhook).order_by(Webhook.id)
-    total = query.count()
-    items = query.offset(offset).limit(limit).all()
+    total = await db.scalar(select(func.count(Webhook.id)))
+    items = (await db.scalars(select(Webhook).order_by(Webhook.id).offset(offset).limit(limit))).all()
     return {"total": total, "limit": limit, "offset": offset, "items": items}
 
 
 @router.post("", response_model=WebhookResponse, status_code=201)
-async def create_webhook(payload: WebhookCreate, db: Session = Depends(get_db)):
+async def create_webhook(payload: WebhookCreate, db: AsyncSession = Depends(get_async_db)):
     db_wh = Webhook(
         url=payload.url.strip(),
         event_types=payload.event_types,
         enabled=payload.enabled,
+        batch_size=payload.batch_size,
     )
     db.add(db_wh)
-    db.commit()
-    db.refresh(db_wh)
+    await db.commit()
+    await db.refresh(db_wh)
+    await run_in_threadpool(subscription_cache.notify_changed)
     return db_wh
 
 
 @router.get("/{webhook_id}", response_model=WebhookResponse)
-async def get_webhook(webhook_id: int, db: Session = Depends(get_db)):
-    wh = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+async def get_webhook(webhook_id: int, db: AsyncSession = Depends(get_async_db)):
+    wh = await db.get(Webhook, webhook_id)
     if not wh:
         raise HTTPException(status_code=404, detail="Webhook not found")
     return wh
 
 
 @router.put("/{webhook_id}", response_model=WebhookResponse)
-async def update_webhook(webhook_id: int, payload: WebhookUpdate, db: Session = Depends(get_db)):
-    wh = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+async def update_webhook(webhook_id: int, payload: WebhookUpdate, db: AsyncSession = Depends(get_async_db)):
+    wh = await db.get(Webhook, webhook_id)
     if not wh:
         raise HTTPException(status_code=404, detail="Webhook not found")
     if payload.url is not None:
@@ -59,16 +63,20 @@ async def update_webhook(webhook_id: int, payload: WebhookUpdate, db: Session =
         wh.event_types = payload.event_types
     if payload.enabled is not None:
         wh.enabled = payload.enabled
-    db.commit()
-    db.refresh(wh)
+    if payload.batch_size is not None:
+        wh.batch_size = payload.batch_size
+    await db.commit()
+    await db.refresh(wh)
+    await run_in_threadpool(subscription_cache.notify_changed)
     return wh
 
 
 @router.delete("/{webhook_id}", status_code=204)
-async def delete_webhook(webhook_id: int, db: Session = Depends(get_db)):
-    wh = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+async def delete_webhook(webhook_id: int, db: AsyncSession = Depends(get_async_db)):
+    wh = await db.get(Webhook, webhook_id)
     if not wh:
         raise HTTPException(status_code=404, detail="Webhook not found")
-    db.delete(wh)
-    db.commit()
+    await db.delete(wh)
+    await db.commit()
+    await run_in_threadpool(subscription_cache.notify_changed)
     return None
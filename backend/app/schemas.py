@@ -72,17 +72,21 @@ class FilterParams(BaseModel):
 
 class ProductListResponse(BaseModel):
     """Schema for product list response."""
-    total: int = Field(..., description="Total number of products matching filters")
+    total: Optional[int] = Field(..., description="Total number of products matching filters; null with include_total=false")
+    total_estimated: bool = Field(False, description="Whether `total` is the database's row estimate rather than an exact count")
     limit: int = Field(..., description="Limit used in query")
     offset: int = Field(..., description="Offset used in query")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to get the next page; null on the last page")
     items: List[ProductResponse] = Field(..., description="List of products")
 
     class Config:
         json_schema_extra = {
             "example": {
                 "total": 100,
+                "total_estimated": False,
                 "limit": 10,
                 "offset": 0,
+                "next_cursor": "WyJpZCIsMSwxXQ",
                 "items": [
                     {
                         "id": 1,
@@ -101,12 +105,14 @@ class WebhookCreate(BaseModel):
     url: str
     event_types: list[str]
     enabled: bool = True
+    batch_size: int = Field(0, ge=0, le=1000, description="Opt in to batched import deliveries: max items per products.batch_upserted delivery. 0 (default) sends one event per product")
 
 
 class WebhookUpdate(BaseModel):
     url: Optional[str]
     event_types: Optional[list[str]]
     enabled: Optional[bool]
+    batch_size: Optional[int] = Field(None, ge=0, le=1000)
 
 
 class WebhookResponse(BaseModel):
@@ -114,6 +120,7 @@ class WebhookResponse(BaseModel):
     url: str
     event_types: list[str]
     enabled: bool
+    batch_size: int
     last_triggered_at: Optional[datetime]
     last_response_status: Optional[int]
     last_response_time_ms: Optional[int]
@@ -130,3 +137,26 @@ class WebhookListResponse(BaseModel):
     limit: int
     offset: int
     items: list[WebhookResponse]
+
+
+class JobMetricsResponse(BaseModel):
+    job_id: str
+    status: str
+    metrics: Optional[dict] = Field(None, description="Stage timings, statement count and rows/s; null until the first checkpoint")
+
+
+class JobErrorResponse(BaseModel):
+    row_num: int
+    sku: Optional[str]
+    error: str
+    data: Optional[dict]
+
+    class Config:
+        from_attributes = True
+
+
+class JobErrorListResponse(BaseModel):
+    limit: int
+    after: Optional[int] = Field(None, description="Row number the page starts after")
+    next_after: Optional[int] = Field(None, description="Pass as `after` to get the next page; null on the last page")
+    items: list[JobErrorResponse]
@@ -0,0 +1,96 @@
+"""Indexed product search behind `GET /products?q=`.
+
+The search indexes are maintained by the database itself, so product
+creates, updates, deletes and bulk imports (which bypass the ORM) all keep
+them in sync without application code:
+
+- Postgres: a generated `search_vector` tsvector column over sku (weight A),
+  name (B) and description (C) with a GIN index, ranked with `ts_rank`;
+  `pg_trgm` GIN indexes also serve the `ilike '%x%'` filters on sku, name
+  and description.
+- SQLite: an FTS5 external-content table `products_fts` kept up to date by
+  triggers on `products`, ranked with `bm25` using the same field order.
+
+Every word of `q` must match, as a prefix, in any of the three fields.
+Migration 013 creates these objects; `install_search_ddl` creates them
+for tables made with `create_all` (e.g. in tests).
+"""
+import re
+
+from sqlalchemy import DDL, and_, column, event, func, literal_column, or_, table
+
+from app.models import Product
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(sku, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_products_sku_trgm ON products USING gin (sku gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_trgm ON products USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_products_description_trgm ON products USING gin (description gin_trgm_ops)",
+)
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "sku, name, description, content='products', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts (rowid, sku, name, description) VALUES (new.id, new.sku, new.name, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, sku, name, description) "
+    "VALUES ('delete', old.id, old.sku, old.name, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF sku, name, description ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, sku, name, description) "
+    "VALUES ('delete', old.id, old.sku, old.name, old.description); "
+    "INSERT INTO products_fts (rowid, sku, name, description) VALUES (new.id, new.sku, new.name, new.description); "
+    "END",
+)
+
+products_fts = table("products_fts", column("rowid"))
+
+
+def install_search_ddl(products_table):
+    """Create the search indexes whenever `products_table` is created."""
+    for statement in POSTGRES_DDL:
+        event.listen(products_table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_DDL:
+        event.listen(products_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    # The FTS table outlives a dropped products table and would keep its old rowids
+    event.listen(products_table, "before_drop", DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite"))
+
+
+def search_terms(q: str) -> list:
+    """The words of a search, lowercased; punctuation only separates them."""
+    return re.findall(r"\w+", q.lower()) if q else []
+
+
+def apply_search(query, dialect: str, terms: list):
+    """Restrict a `Product` query to products matching every term.
+
+    Returns `(query, order)`, where `order` lists the ORDER BY clauses for
+    best matches first.
+    """
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column("products.search_vector")
+        query = query.filter(vector.op("@@")(tsquery))
+        return query, [func.ts_rank(vector, tsquery).desc(), Product.id]
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        query = query.join(products_fts, products_fts.c.rowid == Product.id)
+        query = query.filter(literal_column("products_fts").op("MATCH")(match))
+        # Column weights mirror the tsvector's A/B/C: sku, then name, then description
+        return query, [func.bm25(literal_column("products_fts"), 10.0, 5.0, 1.0), Product.id]
+
+    # No search index on this database: substring matches, unranked
+    fields = (Product.sku, Product.name, Product.description)
+    query = query.filter(and_(*(or_(*(field.ilike(f"%{term}%") for field in fields)) for term in terms)))
+    return query, [Product.id]
@@ -1,47 +1,43 @@
 """CSV import Celery task for bulk product processing."""
 import csv
+import math
 from pathlib import Path
-from app.celery_app import celery_app
+from celery import chord
+from celery.exceptions import Ignore, SoftTimeLimitExceeded
+from sqlalchemy import func
+from app.celery_app import celery_app, import_task_options
 from app.database import SessionLocal
-from app.models import Product, Job, JobStatus, Webhook
+from app.models import Job, JobStatus, JobShard, Webhook
 import time
 import httpx
 from datetime import datetime
-import json
-import redis
 from app.config import get_settings
+from app.webhook_subscriptions import subscription_cache
+from app.product_cache import product_cache
+from app.product_totals import compact_product_count
+from app.importer import (
+    CsvFormatError,
+    ImportCounters,
+    get_writer,
+    dedupe_chunk,
+    plan_shards,
+    SupersededRows,
+    load_dedup_index,
+    dedup_index_path,
+    store_errors,
+    ERROR_SAMPLE_SIZE,
+)
+from app.importer.compression import DECOMPRESSION_ERRORS, detect_compression
+from app.importer.formats import FORMATS, detect_format, get_parser, open_reader
+from app.importer.cancellation import ROLLBACK, cancel_requested
+from app.importer.metrics import ImportMetrics
+from app.importer.progress import ProgressReporter, publish_progress
 
 settings = get_settings()
 
-# Redis connection for progress pub/sub
-try:
-    redis_client = redis.from_url(settings.redis_url, decode_responses=True)
-except Exception:
-    redis_client = None
-
-
-def publish_progress(job_id: str, step: str, processed: int, created: int, updated: int, failed: int, total: int, percentage: int, errors: list = None):
-    """Publish progress event to Redis pub/sub channel."""
-    if not redis_client:
-        return
-    
-    channel = f"job:{job_id}:progress"
-    message = {
-        "job_id": job_id,
-        "current_step": step,
-        "processed_rows": processed,
-        "created_rows": created,
-        "updated_rows": updated,
-        "failed_rows": failed,
-        "total_rows": total,
-        "progress_percentage": percentage,
-        "errors": errors or [],
-    }
-    
-    try:
-        redis_client.publish(channel, json.dumps(message))
-    except Exception:
-        pass
+# Event type of the per-chunk batches that imports send to webhooks
+BATCH_EVENT_TYPE = "products.batch_upserted"
+DEFAULT_BATCH_SIZE = 100  # items per batch for webhooks subscribed to BATCH_EVENT_TYPE without a batch_size
 
 
 @celery_app.task(bind=True, name="app.tasks.deliver_webhook", max_retries=5)
@@ -92,244 +88,742 @@ def deliver_webhook(self, webhook_id: int, event_type: str, payload: dict):
 
 
 def schedule_webhook_event(event_type: str, payload: dict):
-    """Find enabled webhooks interested in this event and enqueue delivery tasks."""
-    db = SessionLocal()
+    """Enqueue delivery tasks for the cached webhooks subscribed to this event."""
+    for subscription in subscription_cache.subscribers(event_type):
+        try:
+            celery_app.send_task("app.tasks.deliver_webhook", args=[subscription.id, event_type, payload])
+        except Exception:
+            # best-effort, don't block processing on webhook enqueue failure
+            pass
+
+
+def _send_deliveries(deliveries):
+    """Enqueue `(webhook_id, event_type, payload)` deliveries over one producer connection."""
+    if not deliveries:
+        return
     try:
-        webhooks = db.query(Webhook).filter(Webhook.enabled == True).all()
-        for wh in webhooks:
-            events = wh.event_types or []
-            if event_type in events:
-                try:
-                    celery_app.send_task("app.tasks.deliver_webhook", args=[wh.id, event_type, payload])
-                except Exception:
-                    # best-effort, don't block processing on webhook enqueue failure
-                    pass
-    finally:
-        db.close()
+        with celery_app.producer_or_acquire() as producer:
+            for webhook_id, event_type, payload in deliveries:
+                deliver_webhook.apply_async(args=[webhook_id, event_type, payload], producer=producer)
+    except Exception:
+        # best-effort, don't block processing on webhook enqueue failure
+        pass
+
+
+def schedule_webhook_batch(job_id: str, events: list):
+    """Fan out one import chunk's product events to subscribed webhooks.
+
+    `events` is a list of `(event_type, payload)` tuples. Subscribers come
+    from the in-process subscription cache. Batching is opt-in: a webhook
+    with `batch_size` set receives `products.batch_upserted` deliveries of up
+    to that many items (each item is the product payload plus its `event`);
+    with `batch_size` 0, the default, it gets the individual `product.*`
+    events. A webhook subscribed to `products.batch_upserted` itself receives
+    every import item in batches, of `DEFAULT_BATCH_SIZE` unless it sets
+    `batch_size`.
+    """
+    if not events:
+        return
+
+    deliveries = []
+    for wh in subscription_cache.all():
+        subscribed = wh.event_types
+        wants_all = BATCH_EVENT_TYPE in subscribed
+        matching = [(event_type, payload) for event_type, payload in events if wants_all or event_type in subscribed]
+        if not matching:
+            continue
+        batch_size = wh.batch_size or (DEFAULT_BATCH_SIZE if wants_all else 0)
+        if batch_size:
+            items = [{"event": event_type, **payload} for event_type, payload in matching]
+            for start in range(0, len(items), batch_size):
+                deliveries.append((wh.id, BATCH_EVENT_TYPE, {
+                    "job_id": job_id,
+                    "items": items[start:start + batch_size],
+                }))
+        else:
+            deliveries.extend((wh.id, event_type, payload) for event_type, payload in matching)
+
+    _send_deliveries(deliveries)
+
+
+def _invalidate_cached_products(events: list):
+    """Drop the products a committed chunk updated from the product cache."""
+    product_cache.invalidate(payload["id"] for event_type, payload in events if event_type == "product.updated")
+
+
+def _write_products(db, writer, rows, counters):
+    """Upsert validated rows, falling back to row-by-row writes on failure.
+
+    A bad row (e.g. a value too long for its column) fails the whole bulk
+    statement, so the chunk is retried one row at a time to isolate it.
+    Returns the `UpsertResult`s that were written; rows whose content did
+    not change are counted in `counters.unchanged`.
+    """
+    try:
+        with db.begin_nested():
+            results = writer.write(rows)
+        counters.unchanged += len(rows) - len(results)
+        return results
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception:
+        pass
+
+    results = []
+    for row in rows:
+        try:
+            with db.begin_nested():
+                written = writer.write([row])
+        except SoftTimeLimitExceeded:
+            raise
+        except Exception as e:
+            counters.add_error(row.row_num, str(e), sku=row.sku, data={
+                "sku": row.sku,
+                "name": row.name,
+                "description": row.description,
+            })
+            continue
+        if written:
+            results.extend(written)
+        else:
+            counters.unchanged += 1
+    return results
+
+
+def _import_chunk(db, writer, chunk, counters, superseded=()):
+    """Write one `ParsedChunk` and count its rows.
+
+    Rows listed in `superseded` are skipped as duplicates: a later row in
+    the file carries the final values for the same SKU.
+
+    Returns the chunk's `(event_type, payload)` webhook events; the caller
+    sends them with `schedule_webhook_batch` once the chunk is committed.
+    """
+    counters.processed += chunk.processed
+    for row_num, message, data in chunk.errors:
+        counters.add_error(row_num, message, data=data)
+
+    valid_rows = []
+    for product_row in chunk.rows:
+        if product_row.row_num in superseded:
+            counters.duplicates += 1
+            continue
+        valid_rows.append(product_row)
+
+    # Without a whole-file index, still collapse repeats inside the chunk
+    unique_rows, collapsed = dedupe_chunk(valid_rows)
+    counters.duplicates += collapsed
+
+    events = []
+    for result in _write_products(db, writer, unique_rows, counters):
+        if result.created:
+            counters.created += 1
+            event_type = "product.created"
+        else:
+            counters.updated += 1
+            event_type = "product.updated"
+        events.append((event_type, {
+            "id": result.id,
+            "sku": result.sku,
+            "name": result.name,
+            "description": result.description,
+        }))
+    return events
+
+
+def _save_job_counters(job, counters):
+    """Copy running counters onto a Job or JobShard row."""
+    job.processed_rows = counters.processed
+    job.created_rows = counters.created
+    job.updated_rows = counters.updated
+    job.failed_rows = counters.failed
+    job.duplicate_rows = counters.duplicates
+    job.unchanged_rows = counters.unchanged
+
+
+def _load_superseded(filepath):
+    """Whole-file duplicate index for an upload, or an empty one if disabled."""
+    if not settings.import_dedup:
+        return SupersededRows()
+    return load_dedup_index(filepath)
+
+
+def _save_checkpoint(target, counters, offset: int, next_row_num: int, metrics: ImportMetrics):
+    """Record where a Job or JobShard can resume from, with its metrics so far.
+
+    Must be committed in the same transaction as the chunk it follows, so
+    the checkpoint never points past what is in `products`. Every chunk
+    that can be resumed from is checkpointed (it is one row update), so a
+    resumed task starts right after the last committed chunk and its
+    counters match a run that never stopped. The pyarrow parser cuts a
+    block into several chunks and only the last carries an offset; a task
+    that dies mid-block replays the block's committed chunks, and their
+    rows are then counted as unchanged rather than created or updated.
+    """
+    _save_job_counters(target, counters)
+    target.errors = list(counters.errors)
+    target.checkpoint = {
+        "offset": offset,
+        "row_num": next_row_num,
+        **counters.snapshot(),
+    }
+    target.metrics = metrics.as_dict()
+
+
+def _restore_checkpoint(target):
+    """Return `(counters, offset, next_row_num)` from a saved checkpoint, or None."""
+    checkpoint = target.checkpoint
+    if not checkpoint:
+        return None
+    counters = ImportCounters.restore(checkpoint, target.errors)
+    return counters, checkpoint["offset"], checkpoint["row_num"]
+
+
+def _continuation_due(started: float) -> bool:
+    """Whether a task has used up `import_task_time_budget` and should hand off."""
+    budget = settings.import_task_time_budget
+    return budget > 0 and time.monotonic() - started > budget
+
+
+def _complete_job(db, job, counters, metrics: ImportMetrics):
+    """Mark the job completed, publish the final event and build the task result."""
+    job.status = JobStatus.COMPLETED
+    job.completed_at = datetime.utcnow()
+    job.total_rows = counters.processed
+    _save_job_counters(job, counters)
+    job.progress_percentage = 100
+    job.current_step = "completed"
+    job.errors = counters.errors
+    job.checkpoint = None
+    job.metrics = metrics.as_dict()
+    db.commit()
+    dedup_index_path(job.filename).unlink(missing_ok=True)
+    if not job.dry_run:
+        try:
+            compact_product_count(db)
+        except Exception:
+            # best-effort; the next count read compacts instead
+            db.rollback()
+
+    # Final progress update
+    publish_progress(
+        job.job_id,
+        "completed",
+        counters.processed,
+        counters.created,
+        counters.updated,
+        counters.failed,
+        counters.processed,
+        100,
+        counters.errors,
+        duplicates=counters.duplicates,
+        unchanged=counters.unchanged,
+        metrics=metrics.as_dict(chunks=False),
+    )
+
+    return {
+        "job_id": job.job_id,
+        "total": counters.processed,
+        "created": counters.created,
+        "updated": counters.updated,
+        "failed": counters.failed,
+        "duplicates": counters.duplicates,
+        "unchanged": counters.unchanged,
+    }
+
+
+def _resume_state(target):
+    """Counters and metrics of a Job or JobShard as of its last checkpoint."""
+    resumed = _restore_checkpoint(target)
+    if not resumed:
+        return ImportCounters(), ImportMetrics()
+    return resumed[0], ImportMetrics(target.metrics)
+
+
+def _cancel_job(db, job, counters, metrics: ImportMetrics):
+    """Mark the job cancelled with what it imported so far and publish the final event."""
+    job.status = JobStatus.CANCELLED
+    job.completed_at = datetime.utcnow()
+    job.total_rows = counters.processed
+    _save_job_counters(job, counters)
+    job.current_step = "cancelled"
+    job.errors = counters.errors
+    job.checkpoint = None
+    job.metrics = metrics.as_dict()
+    db.commit()
+    dedup_index_path(job.filename).unlink(missing_ok=True)
+
+    publish_progress(
+        job.job_id,
+        "cancelled",
+        counters.processed,
+        counters.created,
+        counters.updated,
+        counters.failed,
+        0,
+        job.progress_percentage or 0,
+        counters.errors,
+        duplicates=counters.duplicates,
+        unchanged=counters.unchanged,
+        metrics=metrics.as_dict(chunks=False),
+    )
+    return {"job_id": job.job_id, "status": job.status, "processed": counters.processed}
+
+
+def _cancel_shard(db, shard, counters, metrics: ImportMetrics):
+    """Stop a shard on a cancel; `finalize_import` marks the job cancelled."""
+    _save_job_counters(shard, counters)
+    shard.errors = counters.errors
+    shard.checkpoint = None
+    shard.metrics = metrics.as_dict()
+    shard.status = JobStatus.CANCELLED
+    shard.completed_at = datetime.utcnow()
+    db.commit()
+    return {"shard": shard.shard_index, "status": shard.status}
+
+
+def _rollback_chunk(db, counters, before: dict, sample_size: int):
+    """Discard the chunk being written and return the counters from before it."""
+    db.rollback()
+    return ImportCounters.restore(before, counters.errors[:sample_size])
+
+
+def _shard_count(filepath: Path) -> int:
+    """Number of parallel shards to split an upload into.
+
+    Only formats registered as shardable (CSV) are split, and never when
+    compressed: every shard would have to decompress everything before its
+    own byte range.
+    """
+    file_size = filepath.stat().st_size
+    if settings.import_shard_size <= 0 or file_size <= settings.import_shard_size:
+        return 1
+    if not FORMATS[detect_format(filepath)].shardable or detect_compression(filepath) is not None:
+        return 1
+    return min(settings.import_max_shards, math.ceil(file_size / settings.import_shard_size))
+
+
+def _task_options(filepath, priority: int) -> dict:
+    """Queue and priority for a job's tasks, as `upload_csv` first sent it."""
+    return import_task_options(Path(filepath).stat().st_size, priority)
+
+
+def _dispatch_shards(db, job, filepath: str, shards):
+    """Record one JobShard per byte range and fan them out as a Celery chord."""
+    for shard in shards:
+        db.add(JobShard(
+            job_id=job.job_id,
+            shard_index=shard.index,
+            status=JobStatus.PENDING,
+            start_offset=shard.start,
+            end_offset=shard.end,
+            current_offset=shard.start,
+            first_row_num=shard.first_row_num,
+        ))
+    job.current_step = "importing"
+    db.commit()
+
+    publish_progress(job.job_id, "importing", 0, 0, 0, 0, 0, 0)
+    options = _task_options(filepath, job.priority)
+    chord(
+        import_csv_shard.s(job.job_id, filepath, shard.index).set(**options) for shard in shards
+    )(finalize_import.s(job.job_id).set(**options))
+    return {"job_id": job.job_id, "shards": len(shards)}
+
+
+def _publish_shard_progress(db, job_id: str):
+    """Roll shard counters up onto the Job row and publish combined progress."""
+    totals = db.query(
+        func.coalesce(func.sum(JobShard.processed_rows), 0),
+        func.coalesce(func.sum(JobShard.created_rows), 0),
+        func.coalesce(func.sum(JobShard.updated_rows), 0),
+        func.coalesce(func.sum(JobShard.failed_rows), 0),
+        func.coalesce(func.sum(JobShard.duplicate_rows), 0),
+        func.coalesce(func.sum(JobShard.unchanged_rows), 0),
+        func.coalesce(func.sum(JobShard.current_offset - JobShard.start_offset), 0),
+        func.coalesce(func.sum(JobShard.end_offset - JobShard.start_offset), 0),
+    ).filter(JobShard.job_id == job_id).one()
+    processed, created, updated, failed, duplicates, unchanged, done_bytes, total_bytes = (int(v) for v in totals)
+    percentage = min(100, int(done_bytes * 100 / total_bytes)) if total_bytes else 0
+
+    # A single UPDATE from the aggregate, so concurrent shards never clobber each other's counts
+    db.query(Job).filter(Job.job_id == job_id).update({
+        Job.processed_rows: processed,
+        Job.created_rows: created,
+        Job.updated_rows: updated,
+        Job.failed_rows: failed,
+        Job.duplicate_rows: duplicates,
+        Job.unchanged_rows: unchanged,
+        Job.progress_percentage: percentage,
+    }, synchronize_session=False)
+    db.commit()
+
+    publish_progress(
+        job_id, "importing", processed, created, updated, failed, 0, percentage,
+        duplicates=duplicates, unchanged=unchanged,
+    )
 
 
-@celery_app.task(bind=True, name="app.tasks.import_csv")
+@celery_app.task(
+    bind=True,
+    name="app.tasks.import_csv",
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
 def import_csv(self, job_id: str, filepath: str):
     """
     Celery task to import CSV file and create/update products.
-    
+
+    The file is streamed chunk by chunk (`csv_chunk_size` rows), so memory use
+    does not grow with the file size. Progress is measured in bytes consumed.
+    Rows are parsed and validated by the `import_parser` engine: pyarrow when
+    it is installed, `csv.reader` otherwise.
+    Each chunk is written with one set-based upsert keyed on `sku_norm`:
+    COPY into a staging table on Postgres, INSERT ... ON CONFLICT elsewhere.
+    A dedup pre-pass (`import_dedup`) makes sure a SKU repeated anywhere in
+    the file is written once, with the values of its last row; the skipped
+    rows are counted in `duplicate_rows`. Products whose name and
+    description hash is unchanged are not rewritten (`unchanged_rows`) and
+    fire no webhook. Failed rows are written to `job_errors` with the chunk
+    they came from; `Job.errors` only keeps the first `ERROR_SAMPLE_SIZE`.
+
+    A `dry_run` job goes through the same parsing, validation and dedup but
+    only looks products up (`DryRunWriter`): its counters report what an
+    import would create, update or reject, and no webhooks are sent.
+
+    Chunks commit together with a checkpoint on the Job (byte offset, next
+    row number, counters; see `_save_checkpoint`), and progress is published to Redis at most every `progress_interval_ms`,
+    with the per-stage timings collected in `Job.metrics` (see
+    `app.importer.metrics`). `POST /jobs/{job_id}/cancel` stops the task at
+    the next chunk boundary (see `app.importer.cancellation`). A
+    redelivered or re-queued task resumes from the last checkpoint, and once
+    `import_task_time_budget` is used up (or the soft time limit hits) the
+    task replaces itself with a continuation.
+
+    Files larger than `import_shard_size` are split into byte-range shards
+    imported in parallel by `import_csv_shard` and combined by
+    `finalize_import`. gzip, zstd and zip uploads are decompressed as a
+    stream while parsing and always imported by a single task, as are
+    NDJSON and Parquet uploads (see `app.importer.formats`).
+
     Args:
         job_id: UUID of the Job record
         filepath: Full path to the CSV file
     """
     db = SessionLocal()
-    
+    job = None
+    started = time.monotonic()
+
     try:
         # Get job record
         job = db.query(Job).filter(Job.job_id == job_id).first()
         if not job:
             return {"error": f"Job {job_id} not found"}
-        
+        if job.status in (JobStatus.COMPLETED, JobStatus.CANCELLED):
+            return {"job_id": job_id, "status": job.status}
+
+        shard_total = db.query(JobShard).filter(JobShard.job_id == job_id).count()
+        if shard_total:
+            # Redelivered after the shards were dispatched; they resume on their own
+            return {"job_id": job_id, "shards": shard_total}
+
+        if cancel_requested(job_id):
+            return _cancel_job(db, job, *_resume_state(job))
+
         # Update job: started processing
         job.status = JobStatus.PROCESSING
-        job.started_at = datetime.utcnow()
+        job.started_at = job.started_at or datetime.utcnow()
         job.celery_task_id = self.request.id
         db.commit()
-        
-        # Read CSV file
+
         filepath_obj = Path(filepath)
         if not filepath_obj.exists():
             job.status = JobStatus.FAILED
             job.error_message = f"File not found: {filepath}"
             db.commit()
             return {"error": f"File not found: {filepath}"}
-        
-        # Parse CSV and collect rows
-        rows = []
-        publish_progress(job_id, "parsing", 0, 0, 0, 0, 0, 0)
-        
+
+        writer = get_writer(db, "dry_run" if job.dry_run else settings.import_engine)
+        reporter = ProgressReporter(job_id)
+        resumed = _restore_checkpoint(job)
+        metrics = ImportMetrics(job.metrics if resumed else None)
+        if resumed:
+            counters, offset, next_row_num = resumed
+        else:
+            counters, offset, next_row_num = ImportCounters(), None, None
+            reporter.report("parsing", counters, 0)
+
         try:
-            with open(filepath_obj, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                if not reader.fieldnames:
-                    raise ValueError("CSV has no header")
-                
-                # Expect: sku, name, description (at minimum)
-                required_fields = {"sku", "name"}
-                if not required_fields.issubset(set(reader.fieldnames or [])):
-                    raise ValueError(f"CSV must have columns: {required_fields}")
-                
-                for row_num, row in enumerate(reader, start=2):  # start=2 to skip header
-                    rows.append((row_num, row))
-        except Exception as e:
+            with metrics.stage("dedup"):
+                superseded = _load_superseded(filepath_obj)
+
+            shard_count = _shard_count(filepath_obj)
+            if not resumed and shard_count > 1:
+                shards = plan_shards(filepath_obj, shard_count)
+                if len(shards) > 1:
+                    return _dispatch_shards(db, job, filepath, shards)
+
+            with open_reader(filepath_obj) as reader, metrics.collect(db.get_bind()):
+                parser = get_parser(reader, settings.import_parser)
+                chunks = parser.chunks(offset, None, next_row_num, settings.csv_chunk_size)
+                for chunk in metrics.timed_chunks(chunks):
+                    before, sample_size = counters.snapshot(), len(counters.errors)
+                    with metrics.stage("write"):
+                        events = _import_chunk(db, writer, chunk, counters, superseded)
+                    with metrics.stage("store_errors"):
+                        store_errors(db, job_id, counters)
+
+                    cancel = cancel_requested(job_id)
+                    if cancel == ROLLBACK:
+                        counters = _rollback_chunk(db, counters, before, sample_size)
+                        return _cancel_job(db, job, counters, metrics)
+
+                    percentage = reader.percentage
+                    # Only chunks that end a parser block can be resumed from
+                    handoff = chunk.offset is not None and _continuation_due(started)
+                    if chunk.offset is not None:
+                        _save_checkpoint(job, counters, chunk.offset, reader.first_row_num + counters.processed, metrics)
+                        job.progress_percentage = percentage
+                        job.current_step = "importing"
+                    with metrics.stage("commit"):
+                        db.commit()
+                    if not job.dry_run:
+                        with metrics.stage("cache"):
+                            _invalidate_cached_products(events)
+                        with metrics.stage("webhooks"):
+                            schedule_webhook_batch(job_id, events)
+                    metrics.end_chunk(chunk.processed)
+                    with metrics.stage("progress"):
+                        reporter.report("importing", counters, percentage, metrics=metrics)
+
+                    if cancel:
+                        return _cancel_job(db, job, counters, metrics)
+                    if handoff:
+                        return self.replace(import_csv.si(job_id, filepath).set(**_task_options(filepath, job.priority)))
+        except (CsvFormatError, UnicodeDecodeError, csv.Error) + DECOMPRESSION_ERRORS as e:
+            db.rollback()
             job.status = JobStatus.FAILED
             job.error_message = f"CSV parsing error: {str(e)}"
             db.commit()
-            db.close()
+            dedup_index_path(filepath).unlink(missing_ok=True)
             return {"error": str(e)}
-        
-        total_rows = len(rows)
-        job.total_rows = total_rows
+
+        return _complete_job(db, job, counters, metrics)
+
+    except SoftTimeLimitExceeded:
+        # Drop the unfinished chunk; the continuation resumes from the last checkpoint
+        db.rollback()
+        priority = db.query(Job.priority).filter(Job.job_id == job_id).scalar()
+        return self.replace(import_csv.si(job_id, filepath).set(**_task_options(filepath, priority)))
+
+    except Ignore:
+        raise
+
+    except Exception as e:
+        db.rollback()
+        if job is not None:
+            job.status = JobStatus.FAILED
+            job.error_message = f"Unexpected error: {str(e)}"
+            job.completed_at = datetime.utcnow()
+            db.commit()
+            dedup_index_path(filepath).unlink(missing_ok=True)
+        return {"error": str(e)}
+
+    finally:
+        db.close()
+
+
+@celery_app.task(
+    bind=True,
+    name="app.tasks.import_csv_shard",
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def import_csv_shard(self, job_id: str, filepath: str, shard_index: int):
+    """
+    Celery task importing one byte-range shard of a large CSV.
+
+    Checkpoints on the JobShard row after every resumable chunk, rolls
+    progress up onto the Job at most every `progress_db_interval_ms`, and
+    resumes the same way `import_csv` does; continuations replace the task inside
+    the chord so `finalize_import` still waits for them. Other failures are
+    recorded on the JobShard row rather than raised, so the chord callback
+    always runs.
+
+    Args:
+        job_id: UUID of the Job record
+        filepath: Full path to the CSV file
+        shard_index: Index of the JobShard to process
+    """
+    db = SessionLocal()
+    shard = None
+    started = time.monotonic()
+
+    try:
+        shard = db.query(JobShard).filter(
+            JobShard.job_id == job_id,
+            JobShard.shard_index == shard_index,
+        ).first()
+        if not shard:
+            return {"error": f"Shard {shard_index} of job {job_id} not found"}
+        if shard.status in (JobStatus.COMPLETED, JobStatus.CANCELLED):
+            return {"shard": shard_index, "status": shard.status}
+        if cancel_requested(job_id):
+            return _cancel_shard(db, shard, *_resume_state(shard))
+
+        shard.status = JobStatus.PROCESSING
+        shard.started_at = shard.started_at or datetime.utcnow()
+        shard.celery_task_id = self.request.id
         db.commit()
-        
-        # Process rows in batches
-        created_count = 0
-        updated_count = 0
-        failed_count = 0
-        error_list = []
-        batch_size = settings.csv_chunk_size  # 10,000
-        session_skus = {}  # Track SKUs added in current session batch (for duplicate detection)
-        
-        publish_progress(job_id, "validating", 0, 0, 0, 0, total_rows, 0)
-        
-        for idx, (row_num, row) in enumerate(rows):
-            try:
-                sku = row.get("sku", "").strip()
-                name = row.get("name", "").strip()
-                description = row.get("description", "").strip() or None
-                
-                # Validation
-                if not sku or not name:
-                    failed_count += 1
-                    error_list.append({
-                        "row": row_num,
-                        "error": "Missing sku or name"
-                    })
-                    continue
-                
-                # Check if product exists (by sku_norm)
-                sku_norm = sku.lower()
-                
-                # Check session batch first, then database
-                if sku_norm in session_skus:
-                    # Update the product added in this batch
-                    product = session_skus[sku_norm]
-                    product.name = name
-                    product.description = description
-                    product.updated_at = datetime.utcnow()
-                    updated_count += 1
-                    # schedule webhook for update
-                    try:
-                        schedule_webhook_event("product.updated", {
-                            "sku": product.sku,
-                            "name": product.name,
-                            "description": product.description,
-                        })
-                    except Exception:
-                        pass
-                    continue
-                
-                existing = db.query(Product).filter(Product.sku_norm == sku_norm).first()
-                
-                
-                if existing:
-                    # Update
-                    existing.name = name
-                    existing.description = description
-                    existing.updated_at = datetime.utcnow()
-                    updated_count += 1
-                    # schedule webhook for update
-                    try:
-                        schedule_webhook_event("product.updated", {
-                            "id": existing.id,
-                            "sku": existing.sku,
-                            "name": existing.name,
-                            "description": existing.description,
-                        })
-                    except Exception:
-                        pass
-                else:
-                    # Create
-                    new_product = Product(
-                        sku=sku,
-                        sku_norm=sku_norm,
-                        name=name,
-                        description=description,
-                    )
-                    db.add(new_product)
-                    session_skus[sku_norm] = new_product  # Track for duplicate detection in batch
-                    created_count += 1
-                    # schedule webhook for creation
-                    try:
-                        schedule_webhook_event("product.created", {
-                            "sku": new_product.sku,
-                            "name": new_product.name,
-                            "description": new_product.description,
-                        })
-                    except Exception:
-                        pass
-                
-                # Batch commit every N rows
-                if (idx + 1) % batch_size == 0:
-                    db.commit()
-                    session_skus.clear()  # Reset session batch tracker
-                    processed = idx + 1
-                    percentage = int((processed / total_rows) * 100)
-                    job.processed_rows = processed
-                    job.created_rows = created_count
-                    job.updated_rows = updated_count
-                    job.failed_rows = failed_count
-                    job.progress_percentage = percentage
-                    job.current_step = "importing"
+
+        dry_run, priority = db.query(Job.dry_run, Job.priority).filter(Job.job_id == job_id).one()
+        writer = get_writer(db, "dry_run" if dry_run else settings.import_engine)
+        reporter = ProgressReporter(job_id)
+        resumed = _restore_checkpoint(shard)
+        metrics = ImportMetrics(shard.metrics if resumed else None)
+        if resumed:
+            counters, offset, next_row_num = resumed
+        else:
+            counters, offset, next_row_num = ImportCounters(), shard.start_offset, shard.first_row_num
+
+        with metrics.stage("dedup"):
+            superseded = _load_superseded(filepath)
+        with open_reader(filepath) as reader, metrics.collect(db.get_bind()):
+            parser = get_parser(reader, settings.import_parser)
+            chunks = parser.chunks(offset, shard.end_offset, next_row_num, settings.csv_chunk_size)
+            for chunk in metrics.timed_chunks(chunks):
+                before, sample_size = counters.snapshot(), len(counters.errors)
+                with metrics.stage("write"):
+                    events = _import_chunk(db, writer, chunk, counters, superseded)
+                with metrics.stage("store_errors"):
+                    store_errors(db, job_id, counters)
+
+                cancel = cancel_requested(job_id)
+                if cancel == ROLLBACK:
+                    counters = _rollback_chunk(db, counters, before, sample_size)
+                    return _cancel_shard(db, shard, counters, metrics)
+
+                handoff = chunk.offset is not None and _continuation_due(started)
+                checkpoint = chunk.offset is not None
+                if checkpoint:
+                    _save_checkpoint(shard, counters, chunk.offset, shard.first_row_num + counters.processed, metrics)
+                    shard.current_offset = chunk.offset
+                with metrics.stage("commit"):
                     db.commit()
-                    
-                    publish_progress(
-                        job_id,
-                        "importing",
-                        processed,
-                        created_count,
-                        updated_count,
-                        failed_count,
-                        total_rows,
-                        percentage,
-                        error_list[-10:] if len(error_list) > 10 else error_list
-                    )
-            
-            except Exception as e:
-                failed_count += 1
-                error_list.append({
-                    "row": row_num,
-                    "error": str(e),
-                    "sku": row.get("sku", "")
-                })
-        
-        # Final commit for remaining rows
-        db.commit()
-        
-        # Mark job as completed
-        job.status = JobStatus.COMPLETED
-        job.completed_at = datetime.utcnow()
-        job.processed_rows = total_rows
-        job.created_rows = created_count
-        job.updated_rows = updated_count
-        job.failed_rows = failed_count
-        job.progress_percentage = 100
-        job.current_step = "completed"
-        job.errors = error_list
+                if not dry_run:
+                    with metrics.stage("cache"):
+                        _invalidate_cached_products(events)
+                    with metrics.stage("webhooks"):
+                        schedule_webhook_batch(job_id, events)
+                metrics.end_chunk(chunk.processed)
+                if checkpoint and (handoff or reporter.db_due()):
+                    with metrics.stage("progress"):
+                        _publish_shard_progress(db, job_id)
+
+                if cancel:
+                    return _cancel_shard(db, shard, counters, metrics)
+                if handoff:
+                    return self.replace(import_csv_shard.si(job_id, filepath, shard_index).set(**_task_options(filepath, priority)))
+
+        _save_job_counters(shard, counters)
+        shard.current_offset = shard.end_offset
+        shard.errors = counters.errors
+        shard.checkpoint = None
+        shard.metrics = metrics.as_dict()
+        shard.status = JobStatus.COMPLETED
+        shard.completed_at = datetime.utcnow()
         db.commit()
-        
-        # Final progress update
-        publish_progress(
-            job_id,
-            "completed",
-            total_rows,
-            created_count,
-            updated_count,
-            failed_count,
-            total_rows,
-            100,
-            error_list
-        )
-        
-        return {
-            "job_id": job_id,
-            "total": total_rows,
-            "created": created_count,
-            "updated": updated_count,
-            "failed": failed_count,
-        }
-    
+        return {"shard": shard_index, "status": shard.status}
+
+    except SoftTimeLimitExceeded:
+        db.rollback()
+        priority = db.query(Job.priority).filter(Job.job_id == job_id).scalar()
+        return self.replace(import_csv_shard.si(job_id, filepath, shard_index).set(**_task_options(filepath, priority)))
+
+    except Ignore:
+        raise
+
     except Exception as e:
-        job.status = JobStatus.FAILED
-        job.error_message = f"Unexpected error: {str(e)}"
-        job.completed_at = datetime.utcnow()
-        db.commit()
+        db.rollback()
+        if shard is not None:
+            shard.status = JobStatus.FAILED
+            shard.error_message = str(e)
+            shard.completed_at = datetime.utcnow()
+            db.commit()
+        return {"shard": shard_index, "error": str(e)}
+
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.finalize_import")
+def finalize_import(self, shard_results, job_id: str):
+    """
+    Chord callback combining all shards of a parallel import into the Job.
+
+    Sums the shard counters and stage timings, merges their error samples in
+    row order and publishes a single final event for the job. The job is
+    cancelled if any shard stopped on a cancel request.
+
+    Args:
+        shard_results: Return values of the `import_csv_shard` tasks (unused;
+            the JobShard rows are the source of truth)
+        job_id: UUID of the Job record
+    """
+    db = SessionLocal()
+    job = None
+
+    try:
+        job = db.query(Job).filter(Job.job_id == job_id).first()
+        if not job:
+            return {"error": f"Job {job_id} not found"}
+
+        shards = db.query(JobShard).filter(JobShard.job_id == job_id).order_by(JobShard.shard_index).all()
+        counters = ImportCounters()
+        metrics = ImportMetrics()
+        for shard in shards:
+            metrics.merge(ImportMetrics(shard.metrics))
+            counters.processed += shard.processed_rows or 0
+            counters.created += shard.created_rows or 0
+            counters.updated += shard.updated_rows or 0
+            counters.failed += shard.failed_rows or 0
+            counters.duplicates += shard.duplicate_rows or 0
+            counters.unchanged += shard.unchanged_rows or 0
+            counters.errors.extend(shard.errors or [])
+        # Each shard kept its own first errors, so the earliest of them are the job's first errors
+        counters.errors.sort(key=lambda error: error["row"])
+        del counters.errors[ERROR_SAMPLE_SIZE:]
+
+        if any(shard.status == JobStatus.CANCELLED for shard in shards):
+            return _cancel_job(db, job, counters, metrics)
+
+        failed = [shard for shard in shards if shard.status != JobStatus.COMPLETED]
+        if failed:
+            job.status = JobStatus.FAILED
+            job.error_message = "; ".join(
+                f"Shard {shard.shard_index} failed: {shard.error_message or shard.status}" for shard in failed
+            )
+            job.completed_at = datetime.utcnow()
+            job.total_rows = counters.processed
+            _save_job_counters(job, counters)
+            job.errors = counters.errors
+            job.metrics = metrics.as_dict()
+            job.current_step = "failed"
+            db.commit()
+            dedup_index_path(job.filename).unlink(missing_ok=True)
+            return {"job_id": job_id, "error": job.error_message}
+
+        return _complete_job(db, job, counters, metrics)
+
+    except Exception as e:
+        db.rollback()
+        if job is not None:
+            job.status = JobStatus.FAILED
+            job.error_message = f"Unexpected error: {str(e)}"
+            job.completed_at = datetime.utcnow()
+            db.commit()
+            dedup_index_path(job.filename).unlink(missing_ok=True)
         return {"error": str(e)}
-    
+
     finally:
         db.close()
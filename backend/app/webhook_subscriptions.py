@@ -0,0 +1,132 @@
+"""In-process cache of webhook subscriptions.
+
+Product writes look subscribers up here instead of querying the `webhooks`
+table. The cache is indexed by event type and reloaded when:
+- the `/webhooks` routes change a webhook (`notify_changed()`), which
+  invalidates this process directly and every other API process and worker
+  through a Redis pub/sub message, or
+- it is older than `webhook_cache_ttl` seconds, as a fallback for missed
+  notifications (e.g. while Redis was unreachable).
+"""
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Webhook
+from app.redis_client import redis_client
+
+settings = get_settings()
+
+INVALIDATION_CHANNEL = "webhooks:changed"
+
+
+class Subscription(NamedTuple):
+    """The parts of an enabled webhook needed to fan out events."""
+    id: int
+    event_types: frozenset
+    batch_size: int
+
+
+class SubscriptionCache:
+    """Event-type index of enabled webhooks, shared by all threads of a process."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        # `(subscriptions, by_event, loaded_at)`, replaced as a whole so the
+        # listener thread's `invalidate()` can never be seen half done
+        self._snapshot = None
+        self._listener_pid = None
+
+    @staticmethod
+    def _expired(snapshot) -> bool:
+        ttl = settings.webhook_cache_ttl
+        return snapshot is None or ttl <= 0 or time.monotonic() - snapshot[2] > ttl
+
+    def _load(self) -> tuple:
+        db = self._session_factory()
+        try:
+            webhooks = db.query(Webhook).filter(Webhook.enabled == True).order_by(Webhook.id).all()
+        finally:
+            db.close()
+
+        subscriptions = [
+            Subscription(wh.id, frozenset(wh.event_types or []), wh.batch_size or 0)
+            for wh in webhooks
+        ]
+        by_event = {}
+        for subscription in subscriptions:
+            for event_type in subscription.event_types:
+                by_event.setdefault(event_type, []).append(subscription)
+
+        self._snapshot = (subscriptions, by_event, time.monotonic())
+        return self._snapshot
+
+    def _ensure_fresh(self) -> tuple:
+        """The current snapshot, reloaded first if it is missing or expired."""
+        self._ensure_listener()
+        snapshot = self._snapshot
+        if not self._expired(snapshot):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if self._expired(snapshot):
+                snapshot = self._load()
+            return snapshot
+
+    def all(self) -> list:
+        """Every enabled webhook."""
+        return self._ensure_fresh()[0]
+
+    def subscribers(self, event_type: str) -> list:
+        """Enabled webhooks subscribed to `event_type`."""
+        return self._ensure_fresh()[1].get(event_type, [])
+
+    def invalidate(self):
+        """Drop the cached subscriptions; the next lookup reloads them."""
+        with self._lock:
+            self._snapshot = None
+
+    def notify_changed(self):
+        """Invalidate this process and broadcast the change to the others."""
+        self.invalidate()
+        if not redis_client:
+            return
+        try:
+            redis_client.publish(INVALIDATION_CHANNEL, "changed")
+        except Exception:
+            pass
+
+    def _ensure_listener(self):
+        # Threads don't survive a fork (e.g. Celery prefork workers), so track the pid
+        if not redis_client or settings.webhook_cache_ttl <= 0 or self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            thread = threading.Thread(target=self._listen, name="webhook-subscription-listener", daemon=True)
+            thread.start()
+
+    def _listen(self):
+        """Invalidate on every change notification, reconnecting with backoff."""
+        backoff = 1
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Changes may have been missed while disconnected
+                self.invalidate()
+                backoff = 1
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate()
+            except Exception:
+                time.sleep(backoff)
+                backoff = min(60, backoff * 2)
+
+
+subscription_cache = SubscriptionCache()
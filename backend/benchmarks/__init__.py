@@ -0,0 +1 @@
+"""Benchmarks for the import pipeline; run the modules with `python -m benchmarks.<name>`."""
@@ -0,0 +1,69 @@
+"""Compare CSV parsing and validation throughput of the import parsers.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parsers --rows 500000
+
+Each parser turns the same synthetic catalog into validated chunks. Speed
+is measured on a plain run and peak memory on a second run under
+`tracemalloc`, which slows Python code down.
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import app.database  # noqa: F401  (registers the models before app.importer imports them)
+from app.importer import ArrowParser, CsvParser, CsvReader, iter_chunks, validate_chunk
+from app.importer.parsers import pa
+from benchmarks.catalog import generate_catalog
+
+
+def dict_reader(reader, chunk_size):
+    """The pre-`FieldDecoder` path: DictReader rows validated one dict at a time."""
+    for chunk in iter_chunks(reader.rows(), chunk_size):
+        yield validate_chunk(chunk, offset=reader.bytes_read)
+
+
+def run(path, parse, chunk_size: int) -> int:
+    processed = 0
+    with CsvReader(path) as reader:
+        for chunk in parse(reader, chunk_size):
+            processed += chunk.processed
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    engines = {
+        "dictreader": dict_reader,
+        "csv": lambda reader, chunk_size: CsvParser(reader).chunks(chunk_size=chunk_size),
+    }
+    if pa is not None:
+        engines["arrow"] = lambda reader, chunk_size: ArrowParser(reader).chunks(chunk_size=chunk_size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generate_catalog(Path(tmp) / "catalog.csv", args.rows, duplicate_ratio=0.1, description_length=40, error_rate=0.01)
+        size_mb = path.stat().st_size / 1024 / 1024
+        print(f"{args.rows} rows, {size_mb:.1f} MB, chunk size {args.chunk_size}")
+        print(f"{'parser':<12}{'rows/s':>12}{'MB/s':>10}{'peak MB':>10}")
+
+        for name, parse in engines.items():
+            started = time.perf_counter()
+            processed = run(path, parse, args.chunk_size)
+            elapsed = time.perf_counter() - started
+
+            tracemalloc.start()
+            run(path, parse, args.chunk_size)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(f"{name:<12}{processed / elapsed:>12,.0f}{size_mb / elapsed:>10.1f}{peak / 1024 / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Deterministic synthetic product catalogs for benchmarks."""
+import csv
+import random
+
+WORDS = ("fast", "small", "durable", "red", "blue", "steel", "compact", "wireless", "premium", "classic")
+KINDS = ("Widget", "Gadget", "Gizmo", "Doohickey")
+
+
+def _description(rng, length: int) -> str:
+    """Words adding up to roughly `length` characters (half to one and a half times it)."""
+    if length <= 0:
+        return ""
+    target = rng.randint(length // 2, length + length // 2)
+    words = []
+    size = 0
+    while size < target:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def generate_catalog(
+    path,
+    rows: int,
+    duplicate_ratio: float = 0.0,
+    description_length: int = 60,
+    error_rate: float = 0.0,
+    seed: int = 0,
+):
+    """Write a product CSV with `rows` data rows; the same arguments give the same file.
+
+    About `duplicate_ratio` of the rows repeat the SKU of an earlier row (in
+    a different letter case half of the time, with new values), and about
+    `error_rate` of them miss their sku or name.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("sku", "name", "description"))
+        unique = 0
+        for i in range(rows):
+            if unique and rng.random() < duplicate_ratio:
+                sku = f"SKU-{rng.randrange(unique):08d}"
+                if rng.random() < 0.5:
+                    sku = sku.lower()
+            else:
+                sku = f"SKU-{unique:08d}"
+                unique += 1
+            name = f"Product {i} {rng.choice(KINDS)}"
+            if rng.random() < error_rate:
+                if rng.random() < 0.5:
+                    sku = ""
+                else:
+                    name = ""
+            writer.writerow((sku, name, _description(rng, description_length)))
+    return path
@@ -41,13 +41,27 @@ def runserver():
     return result.returncode
 
 
-def run_worker():
-    """Start the Celery worker."""
+def run_worker(pool=None):
+    """Start the Celery worker.
+
+    `interactive`, `bulk` and `webhooks` start a worker for just that queue
+    with its configured concurrency; without a pool the worker consumes every
+    queue.
+    """
+    queues = {
+        "interactive": (settings.import_queue, settings.import_concurrency),
+        "bulk": (settings.import_bulk_queue, settings.import_bulk_concurrency),
+        "webhooks": (settings.webhook_queue, settings.webhook_concurrency),
+    }
+    command = ["celery", "-A", "app.celery_app", "worker", "--loglevel=info"]
+    if pool:
+        if pool not in queues:
+            print(f"Unknown worker pool: {pool} (expected interactive, bulk or webhooks)")
+            return 1
+        queue, concurrency = queues[pool]
+        command += ["-Q", queue, "-c", str(concurrency), "-n", f"{pool}@%h"]
     print("Starting Celery worker...")
-    result = subprocess.run(
-        ["celery", "-A", "app.celery_app", "worker", "--loglevel=info"],
-        cwd="backend",
-    )
+    result = subprocess.run(command, cwd="backend")
     return result.returncode
 
 
@@ -68,7 +82,7 @@ Usage:
   python manage.py runserver     - Start development server
   python manage.py migrate       - Run database migrations
   python manage.py makemigrations <message> - Create a migration
-  python manage.py worker        - Start Celery worker
+  python manage.py worker [interactive|bulk|webhooks] - Start Celery worker (all queues, or one of them)
   python manage.py test          - Run tests
         """)
         sys.exit(1)
@@ -83,7 +97,7 @@ Usage:
         message = " ".join(sys.argv[2:]) if len(sys.argv) > 2 else ""
         sys.exit(create_migration(message))
     elif command == "worker":
-        sys.exit(run_worker())
+        sys.exit(run_worker(sys.argv[2] if len(sys.argv) > 2 else None))
     elif command == "test":
         sys.exit(run_tests())
     else:
@@ -0,0 +1,50 @@
+"""Add job_shards table for parallel byte-range imports
+
+Revision ID: 002_job_shards
+Revises: 001_initial_schema
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002_job_shards'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create job_shards table."""
+    op.create_table(
+        'job_shards',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(36), nullable=False),
+        sa.Column('shard_index', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('start_offset', sa.BigInteger(), nullable=False),
+        sa.Column('end_offset', sa.BigInteger(), nullable=False),
+        sa.Column('current_offset', sa.BigInteger(), nullable=False),
+        sa.Column('first_row_num', sa.Integer(), nullable=False),
+        sa.Column('processed_rows', sa.Integer(), nullable=True),
+        sa.Column('created_rows', sa.Integer(), nullable=True),
+        sa.Column('updated_rows', sa.Integer(), nullable=True),
+        sa.Column('failed_rows', sa.Integer(), nullable=True),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('celery_task_id', sa.String(100), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'shard_index', name='uq_job_shards_job_id_shard_index'),
+    )
+    op.create_index('ix_job_shards_id', 'job_shards', ['id'], unique=False)
+    op.create_index('ix_job_shards_job_id', 'job_shards', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop job_shards table."""
+    op.drop_table('job_shards')
@@ -0,0 +1,28 @@
+"""Add checkpoint columns to jobs and job_shards for resumable imports
+
+Revision ID: 003_import_checkpoints
+Revises: 002_job_shards
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_import_checkpoints'
+down_revision = '002_job_shards'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add checkpoint columns."""
+    op.add_column('jobs', sa.Column('checkpoint', sa.JSON(), nullable=True))
+    op.add_column('job_shards', sa.Column('checkpoint', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop checkpoint columns."""
+    op.drop_column('job_shards', 'checkpoint')
+    op.drop_column('jobs', 'checkpoint')
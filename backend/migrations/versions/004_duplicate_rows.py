@@ -0,0 +1,28 @@
+"""Add duplicate_rows counters to jobs and job_shards
+
+Revision ID: 004_duplicate_rows
+Revises: 003_import_checkpoints
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004_duplicate_rows'
+down_revision = '003_import_checkpoints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add duplicate_rows columns."""
+    op.add_column('jobs', sa.Column('duplicate_rows', sa.Integer(), nullable=True))
+    op.add_column('job_shards', sa.Column('duplicate_rows', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop duplicate_rows columns."""
+    op.drop_column('job_shards', 'duplicate_rows')
+    op.drop_column('jobs', 'duplicate_rows')
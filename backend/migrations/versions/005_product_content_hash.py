@@ -0,0 +1,34 @@
+"""Add products.content_hash and unchanged_rows counters
+
+Revision ID: 005_product_content_hash
+Revises: 004_duplicate_rows
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_product_content_hash'
+down_revision = '004_duplicate_rows'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add content hash and unchanged counters.
+
+    Existing products start with a NULL hash, so the next import rewrites
+    them once and fills it in.
+    """
+    op.add_column('products', sa.Column('content_hash', sa.String(32), nullable=True))
+    op.add_column('jobs', sa.Column('unchanged_rows', sa.Integer(), nullable=True))
+    op.add_column('job_shards', sa.Column('unchanged_rows', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop content hash and unchanged counters."""
+    op.drop_column('job_shards', 'unchanged_rows')
+    op.drop_column('jobs', 'unchanged_rows')
+    op.drop_column('products', 'content_hash')
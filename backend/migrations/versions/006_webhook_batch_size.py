@@ -0,0 +1,26 @@
+"""Add webhooks.batch_size for batched import deliveries
+
+Revision ID: 006_webhook_batch_size
+Revises: 005_product_content_hash
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006_webhook_batch_size'
+down_revision = '005_product_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add batch_size column; existing webhooks keep per-product events."""
+    op.add_column('webhooks', sa.Column('batch_size', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Drop batch_size column."""
+    op.drop_column('webhooks', 'batch_size')
@@ -0,0 +1,37 @@
+"""Add job_errors table for per-row import errors
+
+Revision ID: 007_job_errors
+Revises: 006_webhook_batch_size
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_job_errors'
+down_revision = '006_webhook_batch_size'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create job_errors table."""
+    op.create_table(
+        'job_errors',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('job_id', sa.String(36), nullable=False),
+        sa.Column('row_num', sa.Integer(), nullable=False),
+        sa.Column('sku', sa.String(255), nullable=True),
+        sa.Column('error', sa.Text(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'row_num', name='uq_job_errors_job_id_row_num'),
+    )
+
+
+def downgrade() -> None:
+    """Drop job_errors table."""
+    op.drop_table('job_errors')
@@ -0,0 +1,26 @@
+"""Add jobs.dry_run for validation-only imports
+
+Revision ID: 008_job_dry_run
+Revises: 007_job_errors
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_job_dry_run'
+down_revision = '007_job_errors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add dry_run column."""
+    op.add_column('jobs', sa.Column('dry_run', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    """Drop dry_run column."""
+    op.drop_column('jobs', 'dry_run')
@@ -0,0 +1,28 @@
+"""Add metrics to jobs and job_shards for per-stage import timings
+
+Revision ID: 009_import_metrics
+Revises: 008_job_dry_run
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_import_metrics'
+down_revision = '008_job_dry_run'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add metrics columns."""
+    op.add_column('jobs', sa.Column('metrics', sa.JSON(), nullable=True))
+    op.add_column('job_shards', sa.Column('metrics', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop metrics columns."""
+    op.drop_column('job_shards', 'metrics')
+    op.drop_column('jobs', 'metrics')
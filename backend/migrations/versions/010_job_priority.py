@@ -0,0 +1,26 @@
+"""Add jobs.priority for ordering imports within a queue
+
+Revision ID: 010_job_priority
+Revises: 009_import_metrics
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010_job_priority'
+down_revision = '009_import_metrics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add priority column."""
+    op.add_column('jobs', sa.Column('priority', sa.Integer(), nullable=False, server_default='5'))
+
+
+def downgrade() -> None:
+    """Drop priority column."""
+    op.drop_column('jobs', 'priority')
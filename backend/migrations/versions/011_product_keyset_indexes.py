@@ -0,0 +1,27 @@
+"""Add (name, id) and (updated_at, id) indexes for keyset pagination of products
+
+Revision ID: 011_product_keyset_indexes
+Revises: 010_job_priority
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '011_product_keyset_indexes'
+down_revision = '010_job_priority'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create keyset indexes."""
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'])
+    op.create_index('ix_products_updated_at_id', 'products', ['updated_at', 'id'])
+
+
+def downgrade() -> None:
+    """Drop keyset indexes."""
+    op.drop_index('ix_products_updated_at_id', table_name='products')
+    op.drop_index('ix_products_name_id', table_name='products')
@@ -0,0 +1,32 @@
+"""Add row_counts table with a maintained products count
+
+Revision ID: 012_row_counts
+Revises: 011_product_keyset_indexes
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_row_counts'
+down_revision = '011_product_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create row_counts table seeded with the current products count."""
+    op.create_table(
+        'row_counts',
+        sa.Column('table_name', sa.String(64), nullable=False),
+        sa.Column('row_count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    op.execute("INSERT INTO row_counts (table_name, row_count) SELECT 'products', COUNT(*) FROM products")
+
+
+def downgrade() -> None:
+    """Drop row_counts table."""
+    op.drop_table('row_counts')
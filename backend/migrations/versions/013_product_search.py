@@ -0,0 +1,73 @@
+"""Add product search indexes: tsvector and pg_trgm on Postgres, FTS5 on SQLite
+
+Revision ID: 013_product_search
+Revises: 012_row_counts
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '013_product_search'
+down_revision = '012_row_counts'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(sku, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Create search indexes for the current database."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(f"ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+        op.execute("CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)")
+        op.execute("CREATE INDEX ix_products_sku_trgm ON products USING gin (sku gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_products_name_trgm ON products USING gin (name gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_products_description_trgm ON products USING gin (description gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE products_fts USING fts5("
+            "sku, name, description, content='products', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN "
+            "INSERT INTO products_fts (rowid, sku, name, description) VALUES (new.id, new.sku, new.name, new.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN "
+            "INSERT INTO products_fts (products_fts, rowid, sku, name, description) "
+            "VALUES ('delete', old.id, old.sku, old.name, old.description); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_update AFTER UPDATE OF sku, name, description ON products BEGIN "
+            "INSERT INTO products_fts (products_fts, rowid, sku, name, description) "
+            "VALUES ('delete', old.id, old.sku, old.name, old.description); "
+            "INSERT INTO products_fts (rowid, sku, name, description) VALUES (new.id, new.sku, new.name, new.description); "
+            "END"
+        )
+        op.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Drop search indexes."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_description_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_products_name_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_products_sku_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+        op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS products_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_insert")
+        op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,38 @@
+"""Add row_count_deltas table for append-only count changes
+
+Revision ID: 014_row_count_deltas
+Revises: 013_product_search
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014_row_count_deltas'
+down_revision = '013_product_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create row_count_deltas table."""
+    op.create_table(
+        'row_count_deltas',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('table_name', sa.String(64), nullable=False),
+        sa.Column('delta', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_row_count_deltas_table_name', 'row_count_deltas', ['table_name'])
+
+
+def downgrade() -> None:
+    """Fold pending deltas into row_counts and drop row_count_deltas table."""
+    op.execute(
+        "UPDATE row_counts SET row_count = row_count + "
+        "(SELECT COALESCE(SUM(delta), 0) FROM row_count_deltas WHERE row_count_deltas.table_name = row_counts.table_name)"
+    )
+    op.drop_index('ix_row_count_deltas_table_name', table_name='row_count_deltas')
+    op.drop_table('row_count_deltas')
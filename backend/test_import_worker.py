@@ -66,12 +66,14 @@ print(f"Processed rows: {job.processed_rows}")
 print(f"Created rows: {job.created_rows}")
 print(f"Updated rows: {job.updated_rows}")
 print(f"Failed rows: {job.failed_rows}")
+print(f"Duplicate rows: {job.duplicate_rows}")
 print(f"Progress: {job.progress_percentage}%")
 
 assert job.status == JobStatus.COMPLETED, "Job should be completed"
 assert job.processed_rows == 6, f"Expected 6 processed rows, got {job.processed_rows}"
 assert job.created_rows == 3, f"Expected 3 created (PROD-001, PROD-002, PROD-004), got {job.created_rows}"
-assert job.updated_rows == 1, f"Expected 1 updated (prod-001 -> PROD-001), got {job.updated_rows}"
+assert job.updated_rows == 0, f"Expected 0 updated, got {job.updated_rows}"
+assert job.duplicate_rows == 1, f"Expected 1 duplicate (PROD-001 superseded by prod-001), got {job.duplicate_rows}"
 assert job.failed_rows == 2, f"Expected 2 failed (missing sku/name), got {job.failed_rows}"
 assert job.progress_percentage == 100, "Progress should be 100%"
 print("[PASS] Job stats correct")
@@ -88,7 +90,7 @@ assert len(products) == 3, f"Expected 3 products, got {len(products)}"
 # Verify PROD-001 was updated (not duplicated)
 prod_001 = db.query(Product).filter(Product.sku_norm == "prod-001").first()
 assert prod_001 is not None, "PROD-001 should exist"
-assert prod_001.name == "Product 1 Updated", "PROD-001 should be updated to latest name"
+assert prod_001.name == "Product 1 Updated", "PROD-001 should be written with its latest name"
 print("[PASS] Deduplication (case-insensitive SKU update) works correctly")
 
 # Verify errors recorded
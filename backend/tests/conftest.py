@@ -0,0 +1,31 @@
+"""Shared pytest configuration.
+
+Tests run against a throwaway SQLite database so they never touch the
+development `product_importer.db`.
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="product_importer_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+os.environ.setdefault("DEBUG", "False")
+
+import pytest  # noqa: E402
+
+from app.database import Base, engine, SessionLocal  # noqa: E402
+from app.product_cache import product_cache  # noqa: E402
+from app.product_totals import filtered_count_cache  # noqa: E402
+from app.webhook_subscriptions import subscription_cache  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Fresh tables and a session for each test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    subscription_cache.invalidate()
+    filtered_count_cache.clear()
+    product_cache.clear()
+    session = SessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,24 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal, async_database_url
+from app.models import Product
+
+
+def test_async_database_url_swaps_driver():
+    assert str(async_database_url("sqlite:///./app.db")) == "sqlite+aiosqlite:///./app.db"
+    assert str(async_database_url("postgresql://u@db/products")) == "postgresql+asyncpg://u@db/products"
+    assert str(async_database_url("postgresql+psycopg2://u@db/products")) == "postgresql+asyncpg://u@db/products"
+
+
+def test_async_savepoint_release_keeps_transaction_open(db):
+    async def write_then_roll_back():
+        async with AsyncSessionLocal() as session:
+            async with session.begin_nested():
+                session.add(Product(sku="A-1", sku_norm="a-1", name="A"))
+            await session.rollback()
+        async with AsyncSessionLocal() as session:
+            return await session.scalar(select(func.count(Product.id)))
+
+    assert asyncio.run(write_then_roll_back()) == 0
@@ -0,0 +1,17 @@
+import csv
+
+from benchmarks.catalog import generate_catalog
+
+
+def test_generate_catalog_is_deterministic(tmp_path):
+    first = generate_catalog(tmp_path / "a.csv", 2000, duplicate_ratio=0.2, description_length=30, error_rate=0.05, seed=7)
+    second = generate_catalog(tmp_path / "b.csv", 2000, duplicate_ratio=0.2, description_length=30, error_rate=0.05, seed=7)
+    assert first.read_bytes() == second.read_bytes()
+
+    with open(first, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2000
+    invalid = [row for row in rows if not row["sku"] or not row["name"]]
+    skus = [row["sku"].lower() for row in rows if row["sku"]]
+    assert 50 < len(invalid) < 150
+    assert 300 < len(skus) - len(set(skus)) < 500
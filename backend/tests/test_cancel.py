@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.routers.jobs as jobs_router
+import app.tasks as tasks
+from app.config import get_settings
+from app.main import app
+from app.models import Job, JobError, JobStatus, Product
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def cancel_on_chunk(monkeypatch, chunk: int, mode: str):
+    """Report a cancel request from the `chunk`th check on."""
+    checks = []
+
+    def cancel_requested(job_id):
+        checks.append(job_id)
+        # the first check is the one before the import starts
+        return mode if len(checks) > chunk else None
+
+    monkeypatch.setattr(tasks, "cancel_requested", cancel_requested)
+
+
+@pytest.fixture
+def catalog(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 3)
+    monkeypatch.setattr(get_settings(), "import_parser", "csv")
+    rows = [{"sku": f"SKU-{i}", "name": "" if i == 4 else f"Name {i}", "description": ""} for i in range(12)]
+    path = write_csv(tmp_path / "catalog.csv", rows)
+    return create_job(db, path), path
+
+
+@pytest.mark.parametrize("mode, imported, failed", [("commit", 5, 1), ("rollback", 3, 0)])
+def test_cancel_stops_at_chunk_boundary(db, catalog, monkeypatch, mode, imported, failed):
+    job_id, path = catalog
+    cancel_on_chunk(monkeypatch, 2, mode)
+
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result["status"] == JobStatus.CANCELLED
+    db.expire_all()
+    job = db.query(Job).filter(Job.job_id == job_id).one()
+    assert job.status == JobStatus.CANCELLED
+    assert job.current_step == "cancelled"
+    assert (job.created_rows, job.failed_rows) == (imported, failed)
+    assert db.query(Product).count() == imported
+    assert db.query(JobError).filter(JobError.job_id == job_id).count() == failed
+
+
+def test_cancel_pending_job(db, catalog, monkeypatch):
+    job_id, path = catalog
+    flags = []
+    monkeypatch.setattr(jobs_router, "request_cancel", lambda job_id, rollback: flags.append(job_id) or True)
+    client = TestClient(app)
+
+    response = client.post(f"/jobs/{job_id}/cancel")
+
+    assert response.status_code == 202
+    assert response.json()["status"] == JobStatus.CANCELLED
+    assert flags == [job_id]
+    assert import_csv(job_id=job_id, filepath=str(path))["status"] == JobStatus.CANCELLED
+    assert db.query(Product).count() == 0
+    assert client.post(f"/jobs/{job_id}/cancel").status_code == 409
@@ -0,0 +1,84 @@
+import gzip
+import zipfile
+
+import pytest
+
+from app.config import get_settings
+from app.importer import CompressionError, CsvReader, check_upload, detect_compression, get_parser
+from app.models import Job, JobStatus, Product
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+ROWS = [{"sku": f"SKU-{i}", "name": f"Name {i}" if i % 7 else "", "description": f"line\nbreak {i}"} for i in range(40)]
+
+
+def compress(plain, compression):
+    data = plain.read_bytes()
+    if compression == "gzip":
+        path = plain.with_name(plain.name + ".gz")
+        path.write_bytes(gzip.compress(data))
+    elif compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        path = plain.with_name(plain.name + ".zst")
+        # two frames, as produced by concatenating compressed exports
+        compressor = zstandard.ZstdCompressor()
+        path.write_bytes(compressor.compress(data[:500]) + compressor.compress(data[500:]))
+    else:
+        path = plain.with_suffix(".zip")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("catalog.csv", data)
+    return path
+
+
+@pytest.mark.parametrize("parser", ["csv", "arrow"])
+@pytest.mark.parametrize("compression", ["gzip", "zstd", "zip"])
+def test_compressed_upload_imports_like_plain(db, tmp_path, monkeypatch, compression, parser):
+    if parser == "arrow":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 6)
+    monkeypatch.setattr(get_settings(), "import_parser", parser)
+    path = compress(write_csv(tmp_path / "catalog.csv", ROWS), compression)
+    assert detect_compression(path) == compression
+
+    job_id = create_job(db, path)
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result["created"] == 34
+    assert result["failed"] == 6
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert job.progress_percentage == 100
+    assert db.query(Product).filter(Product.sku == "SKU-39").one().description == "line\nbreak 39"
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd", "zip"])
+def test_compressed_reader_resumes_from_offset(tmp_path, compression):
+    path = compress(write_csv(tmp_path / "catalog.csv", ROWS), compression)
+
+    with CsvReader(path) as reader:
+        chunks = list(get_parser(reader, "csv").chunks(chunk_size=10))
+        assert reader.percentage == 100
+    offset = chunks[1].offset
+    row_num = chunks[2].rows[0].row_num if chunks[2].rows else chunks[2].errors[0][0]
+
+    with CsvReader(path) as reader:
+        resumed = list(get_parser(reader, "csv").chunks(offset, None, row_num, 10))
+    assert resumed == chunks[2:]
+
+
+def test_check_upload_rejects_bad_archives(tmp_path):
+    archive_path = tmp_path / "two.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("a.csv", "sku,name\n")
+        archive.writestr("b.csv", "sku,name\n")
+    with pytest.raises(CompressionError, match="exactly one file"):
+        check_upload(archive_path)
+
+    truncated = tmp_path / "truncated.csv.gz"
+    truncated.write_bytes(gzip.compress(b"sku,name\n" * 1000)[:20])
+    with pytest.raises(CompressionError):
+        check_upload(truncated)
+
+    plain = write_csv(tmp_path / "plain.csv", ROWS)
+    check_upload(plain)
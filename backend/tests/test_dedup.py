@@ -0,0 +1,63 @@
+from app import tasks
+from app.config import get_settings
+from app.importer import dedup
+from app.importer.dedup import dedup_index_path, find_superseded_rows, load_dedup_index
+from app.models import Job, JobStatus
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def test_rows_too_long_to_write_do_not_supersede(tmp_path):
+    path = write_csv(tmp_path / "catalog.csv", [
+        {"sku": "SKU-1", "name": "Lamp", "description": ""},
+        {"sku": "SKU-2", "name": "Desk", "description": ""},
+        {"sku": "sku-1", "name": "x" * 501, "description": ""},
+        {"sku": "sku-2", "name": "Standing desk", "description": ""},
+    ])
+
+    superseded = find_superseded_rows(path)
+
+    assert 2 not in superseded
+    assert 3 in superseded
+    assert len(superseded) == 1
+
+
+def test_dedup_index_uses_configured_parser(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "import_parser", "csv")
+    engines = []
+    real_get_parser = dedup.get_parser
+    monkeypatch.setattr(dedup, "get_parser", lambda reader, engine: engines.append(engine) or real_get_parser(reader, engine))
+    path = write_csv(tmp_path / "catalog.csv", [{"sku": "SKU-1", "name": "Lamp", "description": ""}])
+
+    load_dedup_index(path)
+
+    assert engines == ["csv"]
+
+
+def test_saving_the_index_leaves_only_the_sidecar(tmp_path):
+    path = write_csv(tmp_path / "catalog.csv", [
+        {"sku": "SKU-1", "name": "Lamp", "description": ""},
+        {"sku": "sku-1", "name": "Desk lamp", "description": ""},
+    ])
+
+    superseded = load_dedup_index(path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["catalog.csv", "catalog.csv.dedup"]
+    assert 2 in dedup.SupersededRows.load(dedup_index_path(path))
+    assert len(superseded) == 1
+
+
+def test_failed_import_removes_the_index(db, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(tasks, "_import_chunk", fail)
+    path = write_csv(tmp_path / "catalog.csv", [{"sku": "SKU-1", "name": "Lamp", "description": ""}])
+    job_id = create_job(db, path)
+
+    import_csv(job_id=job_id, filepath=str(path))
+
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.FAILED
+    assert not dedup_index_path(path).exists()
@@ -0,0 +1,49 @@
+import uuid
+
+import app.tasks as tasks
+from app.models import Job, JobError, JobStatus, Product, Webhook
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def create_dry_run_job(db, path):
+    job = Job(job_id=str(uuid.uuid4()), status=JobStatus.PENDING, filename=str(path), dry_run=True)
+    db.add(job)
+    db.commit()
+    return job.job_id
+
+
+def test_dry_run_reports_changes_without_writing(db, tmp_path, monkeypatch):
+    db.add(Webhook(url="http://hooks", event_types=["product.created", "product.updated"], batch_size=100))
+    db.commit()
+    sent = []
+    monkeypatch.setattr(tasks, "_send_deliveries", sent.append)
+
+    existing = write_csv(tmp_path / "existing.csv", [
+        {"sku": "SKU-1", "name": "Name 1", "description": "Same"},
+        {"sku": "SKU-2", "name": "Name 2", "description": "Old"},
+    ])
+    import_csv(job_id=create_job(db, existing), filepath=str(existing))
+    sent.clear()
+    before = {(p.sku, p.name, p.description, p.updated_at) for p in db.query(Product)}
+
+    path = write_csv(tmp_path / "catalog.csv", [
+        {"sku": "sku-1", "name": "Name 1", "description": "Same"},
+        {"sku": "SKU-2", "name": "Name 2", "description": "New"},
+        {"sku": "SKU-3", "name": "Name 3", "description": ""},
+        {"sku": "SKU-3", "name": "Name 3 again", "description": ""},
+        {"sku": "SKU-4", "name": "", "description": ""},
+        {"sku": "SKU-5", "name": "x" * 501, "description": ""},
+    ])
+    job_id = create_dry_run_job(db, path)
+    import_csv(job_id=job_id, filepath=str(path))
+
+    db.expire_all()
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert (job.processed_rows, job.created_rows, job.updated_rows, job.unchanged_rows) == (6, 1, 1, 1)
+    assert (job.duplicate_rows, job.failed_rows) == (1, 2)
+    assert [e.row_num for e in db.query(JobError).filter(JobError.job_id == job_id).order_by(JobError.row_num)] == [6, 7]
+    assert {(p.sku, p.name, p.description, p.updated_at) for p in db.query(Product)} == before
+    assert sent == []
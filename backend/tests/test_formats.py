@@ -0,0 +1,104 @@
+import datetime
+import gzip
+import json
+
+import pytest
+
+from app.config import get_settings
+from app.importer import accepted_suffixes, detect_format, get_parser, open_reader
+from app.models import Job, JobError, JobStatus, Product
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job
+
+
+def write_ndjson(path, lines):
+    data = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n"
+    if path.suffix == ".gz":
+        path.write_bytes(gzip.compress(data.encode()))
+    else:
+        path.write_text(data, encoding="utf-8")
+    return path
+
+
+def write_parquet(path, rows, row_group_size):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    pq.write_table(pa.Table.from_pylist(rows), path, row_group_size=row_group_size)
+    return path
+
+
+@pytest.mark.parametrize("filename", ["products.ndjson", "products.jsonl.gz", "products.txt"])
+def test_ndjson_import(db, tmp_path, filename):
+    path = write_ndjson(tmp_path / filename, [
+        {"sku": "N-1", "name": "One", "description": "  first  "},
+        "",
+        {"sku": 2, "name": "Two", "extra": [1, 2]},
+        "{not json",
+        ["not", "an", "object"],
+        {"sku": "N-3", "name": "  "},
+        {"sku": "n-1", "name": "One again"},
+    ])
+    assert detect_format(path) == "ndjson"
+
+    job_id = create_job(db, path)
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result["created"] == 2
+    assert result["duplicates"] == 1
+    assert result["failed"] == 3
+    assert db.query(Product).filter(Product.sku_norm == "n-1").one().name == "One again"
+    assert db.query(Product).filter(Product.sku == "2").one().description is None
+
+    errors = db.query(JobError).order_by(JobError.row_num).all()
+    assert [(e.row_num, e.error.split(":")[0]) for e in errors] == [
+        (3, "Invalid JSON"),
+        (4, "Expected a JSON object"),
+        (5, "Missing sku or name"),
+    ]
+    assert errors[2].data == {"sku": "N-3", "name": "  "}
+
+
+def test_parquet_import_by_row_group(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 4)
+    rows = [
+        {"sku": f"P-{i}", "name": None if i == 7 else f"Name {i}", "description": "", "seen": datetime.date(2024, 1, 1)}
+        for i in range(25)
+    ]
+    path = write_parquet(tmp_path / "products.parquet", rows, row_group_size=10)
+    assert detect_format(path) == "parquet"
+
+    with open_reader(path) as reader:
+        chunks = list(get_parser(reader).chunks(chunk_size=4))
+        assert reader.percentage == 100
+    assert [chunk.offset for chunk in chunks if chunk.offset is not None] == [1, 2, 3]
+    with open_reader(path) as reader:
+        resumed = list(get_parser(reader).chunks(2, None, 21, 4))
+    assert [row.sku for chunk in resumed for row in chunk.rows] == [f"P-{i}" for i in range(20, 25)]
+
+    job_id = create_job(db, path)
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result["created"] == 24
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert job.errors == [{"row": 8, "error": "Missing sku or name"}]
+    assert db.query(JobError).one().data == {"sku": "P-7", "name": None, "description": "", "seen": "2024-01-01"}
+    assert db.query(Product).filter(Product.sku == "P-0").one().description is None
+
+
+def test_parquet_requires_product_columns(db, tmp_path):
+    path = write_parquet(tmp_path / "products.parquet", [{"code": "X"}], row_group_size=10)
+    job_id = create_job(db, path)
+
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert "must have columns" in result["error"]
+    assert db.query(Job).filter(Job.job_id == job_id).first().status == JobStatus.FAILED
+
+
+def test_accepted_suffixes():
+    suffixes = accepted_suffixes()
+    for suffix in (".csv", ".csv.gz", ".ndjson.zst", ".jsonl", ".parquet", ".zip"):
+        assert suffix in suffixes
+    assert ".parquet.gz" not in suffixes
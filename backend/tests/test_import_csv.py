@@ -0,0 +1,165 @@
+import csv
+import uuid
+
+from app.config import get_settings
+from app.models import Job, JobStatus, Product
+from app.importer import CsvReader, dedup_index_path
+from app.tasks import import_csv
+
+
+def write_csv(path, rows, fieldnames=("sku", "name", "description")):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def create_job(db, path):
+    job = Job(job_id=str(uuid.uuid4()), status=JobStatus.PENDING, filename=str(path))
+    db.add(job)
+    db.commit()
+    return job.job_id
+
+
+def test_import_creates_and_updates(db, tmp_path):
+    path = write_csv(tmp_path / "products.csv", [
+        {"sku": "PROD-001", "name": "Product 1", "description": "First product"},
+        {"sku": "PROD-002", "name": "Product 2", "description": "Second product"},
+        {"sku": "prod-001", "name": "Product 1 Updated", "description": "Updated"},
+        {"sku": "", "name": "Invalid Product", "description": "Missing SKU"},
+        {"sku": "PROD-003", "name": "", "description": "Missing Name"},
+        {"sku": "PROD-004", "name": "Product 4", "description": None},
+    ])
+    job_id = create_job(db, path)
+
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result["created"] == 3
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert job.total_rows == 6
+    assert job.processed_rows == 6
+    assert job.created_rows == 3
+    assert job.updated_rows == 0
+    assert job.duplicate_rows == 1
+    assert job.failed_rows == 2
+    assert job.progress_percentage == 100
+    assert [e["row"] for e in job.errors] == [5, 6]
+
+    assert db.query(Product).count() == 3
+    prod = db.query(Product).filter(Product.sku_norm == "prod-001").first()
+    assert prod.name == "Product 1 Updated"
+
+
+def test_import_streams_in_chunks(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 7)
+    rows = [{"sku": f"SKU-{i}", "name": f"Name {i}", "description": ""} for i in range(50)]
+    path = write_csv(tmp_path / "products.csv", rows)
+    job_id = create_job(db, path)
+
+    import_csv(job_id=job_id, filepath=str(path))
+
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert job.created_rows == 50
+    assert db.query(Product).count() == 50
+
+
+def test_import_rejects_missing_columns(db, tmp_path):
+    path = write_csv(tmp_path / "bad.csv", [{"sku": "A", "title": "x"}], fieldnames=("sku", "title"))
+    job_id = create_job(db, path)
+
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert "error" in result
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.FAILED
+    assert "CSV parsing error" in job.error_message
+
+
+def test_reader_reports_byte_progress(tmp_path):
+    path = tmp_path / "quoted.csv"
+    path.write_text('sku,name,description\nA,Alpha,"multi\nline"\nB,Beta,plain\n', encoding="utf-8")
+
+    with CsvReader(path) as reader:
+        seen = []
+        for row_num, row in reader.rows():
+            seen.append((row_num, row["sku"], reader.percentage))
+
+    assert [s[:2] for s in seen] == [(2, "A"), (3, "B")]
+    assert seen[0][2] < 100
+    assert seen[-1][2] == 100
+
+
+def test_reimport_updates_existing_products(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 2)
+    first = write_csv(tmp_path / "first.csv", [
+        {"sku": "A-1", "name": "Alpha", "description": "one"},
+        {"sku": "B-1", "name": "Beta", "description": "two"},
+    ])
+    import_csv(job_id=create_job(db, first), filepath=str(first))
+    original = db.query(Product).filter(Product.sku_norm == "a-1").one()
+
+    second = write_csv(tmp_path / "second.csv", [
+        {"sku": "a-1", "name": "Alpha v2", "description": ""},
+        {"sku": "C-1", "name": "Gamma", "description": "three"},
+        {"sku": "A-1", "name": "Alpha v3", "description": "final"},
+    ])
+    job_id = create_job(db, second)
+    import_csv(job_id=job_id, filepath=str(second))
+
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert (job.created_rows, job.updated_rows, job.duplicate_rows) == (1, 1, 1)
+    db.expire_all()
+    product = db.query(Product).filter(Product.sku_norm == "a-1").one()
+    assert product.id == original.id
+    assert product.sku == "A-1"
+    assert product.name == "Alpha v3"
+    assert product.created_at == original.created_at
+    assert db.query(Product).count() == 3
+
+
+def test_duplicates_across_chunks_are_written_once(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 2)
+    path = write_csv(tmp_path / "dupes.csv", [
+        {"sku": "A-1", "name": "First", "description": ""},
+        {"sku": "B-1", "name": "Beta", "description": ""},
+        {"sku": "C-1", "name": "Gamma", "description": ""},
+        {"sku": "a-1", "name": "Second", "description": ""},
+        {"sku": "A-1", "name": "", "description": "invalid final row"},
+    ])
+    job_id = create_job(db, path)
+
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result["duplicates"] == 1
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert (job.created_rows, job.updated_rows, job.duplicate_rows, job.failed_rows) == (3, 0, 1, 1)
+    product = db.query(Product).filter(Product.sku_norm == "a-1").one()
+    assert product.name == "Second"
+    assert product.sku == "a-1"
+    assert not dedup_index_path(path).exists()
+
+
+def test_unchanged_products_are_not_rewritten(db, tmp_path):
+    rows = [
+        {"sku": "A-1", "name": "Alpha", "description": "one"},
+        {"sku": "B-1", "name": "Beta", "description": ""},
+    ]
+    first = write_csv(tmp_path / "first.csv", rows)
+    import_csv(job_id=create_job(db, first), filepath=str(first))
+    before = {p.sku_norm: p.updated_at for p in db.query(Product).all()}
+
+    rows[1]["description"] = "now described"
+    second = write_csv(tmp_path / "second.csv", rows)
+    job_id = create_job(db, second)
+    result = import_csv(job_id=job_id, filepath=str(second))
+
+    assert result["unchanged"] == 1
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert (job.created_rows, job.updated_rows, job.unchanged_rows) == (0, 1, 1)
+    db.expire_all()
+    after = {p.sku_norm: p.updated_at for p in db.query(Product).all()}
+    assert after["a-1"] == before["a-1"]
+    assert after["b-1"] > before["b-1"]
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.importer import ImportMetrics
+from app.main import app
+from app.models import Job
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def test_import_records_stage_metrics(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 4)
+    monkeypatch.setattr(get_settings(), "import_parser", "csv")
+    path = write_csv(tmp_path / "products.csv", [
+        {"sku": f"SKU-{i}", "name": f"Name {i}", "description": ""} for i in range(10)
+    ])
+    job_id = create_job(db, path)
+    import_csv(job_id=job_id, filepath=str(path))
+
+    db.expire_all()
+    metrics = db.query(Job).filter(Job.job_id == job_id).one().metrics
+    assert metrics["rows"] == 10
+    assert metrics["chunk_count"] == 3
+    assert [chunk["rows"] for chunk in metrics["chunks"]] == [4, 4, 2]
+    assert all(chunk["statements"] > 0 for chunk in metrics["chunks"])
+    assert metrics["statements"] >= sum(chunk["statements"] for chunk in metrics["chunks"])
+    # one parse call per chunk plus the one that finds the end of the file
+    assert metrics["stages"]["parse"]["calls"] == 4
+    assert {"dedup", "write", "store_errors", "commit", "webhooks", "progress"} <= set(metrics["stages"])
+
+    response = TestClient(app).get(f"/jobs/{job_id}/metrics")
+    assert response.status_code == 200
+    assert response.json()["metrics"]["rows"] == 10
+
+
+def test_metrics_resume_and_merge():
+    metrics = ImportMetrics()
+    with metrics.stage("write"):
+        pass
+    metrics.rows = 5
+    restored = ImportMetrics(metrics.as_dict())
+    restored.merge(ImportMetrics(metrics.as_dict()))
+    assert restored.rows == 10
+    assert restored.stages["write"]["calls"] == 2
+    assert restored.as_dict(chunks=False)["stages"]["write"]["wall_s"] == pytest.approx(2 * metrics.stages["write"]["wall_s"], abs=1e-3)
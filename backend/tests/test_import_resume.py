@@ -0,0 +1,84 @@
+import pytest
+
+import app.tasks as tasks
+from app.config import get_settings
+from app.models import Job, JobStatus, Product
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+class WorkerKilled(BaseException):
+    """Stands in for a worker dying mid-import."""
+
+
+def catalog(tmp_path, count=10):
+    rows = [{"sku": f"SKU-{i}", "name": f"Name {i}", "description": ""} for i in range(count)]
+    rows[4]["name"] = ""
+    return write_csv(tmp_path / "catalog.csv", rows)
+
+
+def test_killed_import_resumes_from_checkpoint(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 3)
+    monkeypatch.setattr(get_settings(), "progress_db_interval_ms", 60000)  # checkpoints don't wait for it
+    monkeypatch.setattr(get_settings(), "import_parser", "csv")  # every chunk can be resumed from
+    path = catalog(tmp_path)
+    job_id = create_job(db, path)
+
+    real_import_chunk = tasks._import_chunk
+    calls = []
+
+    def dying_import_chunk(*args):
+        calls.append(1)
+        if len(calls) == 3:
+            raise WorkerKilled()
+        return real_import_chunk(*args)
+
+    monkeypatch.setattr(tasks, "_import_chunk", dying_import_chunk)
+    with pytest.raises(WorkerKilled):
+        import_csv(job_id=job_id, filepath=str(path))
+
+    db.expire_all()
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.PROCESSING
+    assert job.checkpoint["row_num"] == 8
+    assert job.checkpoint["processed"] == 6
+    assert db.query(Product).count() == 5
+    db.rollback()  # end the read transaction so the resumed task can write
+
+    monkeypatch.setattr(tasks, "_import_chunk", real_import_chunk)
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result["total"] == 10
+    db.expire_all()
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert (job.processed_rows, job.created_rows, job.failed_rows) == (10, 9, 1)
+    assert job.errors == [{"row": 6, "error": "Missing sku or name"}]
+    assert job.checkpoint is None
+    assert db.query(Product).count() == 9
+
+
+def test_import_hands_off_to_continuation(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 4)
+    monkeypatch.setattr(tasks, "_continuation_due", lambda started: True)
+    path = catalog(tmp_path)
+    job_id = create_job(db, path)
+
+    result = import_csv.apply(args=[job_id, str(path)]).get()
+
+    assert result["total"] == 10
+    db.expire_all()
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert (job.created_rows, job.failed_rows) == (9, 1)
+
+
+def test_completed_job_is_not_reimported(db, tmp_path):
+    path = catalog(tmp_path)
+    job_id = create_job(db, path)
+    import_csv(job_id=job_id, filepath=str(path))
+
+    result = import_csv(job_id=job_id, filepath=str(path))
+
+    assert result == {"job_id": job_id, "status": JobStatus.COMPLETED}
@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.routers.uploads as uploads
+from app.config import get_settings
+from app.main import app
+from app.models import Job
+
+
+@pytest.fixture
+def sent(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+    calls = []
+    monkeypatch.setattr(uploads.celery_app, "send_task", lambda name, **kwargs: calls.append((name, kwargs)))
+    return calls
+
+
+@pytest.mark.parametrize("threshold, queue", [(1024, "imports"), (10, "imports_bulk")])
+def test_upload_routes_by_size_and_priority(db, sent, monkeypatch, threshold, queue):
+    monkeypatch.setattr(get_settings(), "import_bulk_threshold", threshold)
+    client = TestClient(app)
+
+    response = client.post(
+        "/uploads?priority=7",
+        files={"file": ("products.csv", b"sku,name\nA,Widget\n", "text/csv")},
+    )
+
+    assert response.status_code == 201
+    job = db.query(Job).filter(Job.job_id == response.json()["job_id"]).one()
+    assert job.priority == 7
+    [(name, options)] = sent
+    assert name == "app.tasks.import_csv"
+    assert options["queue"] == queue
+    # the Redis broker consumes lower numbers first
+    assert options["priority"] == 2
+
+
+def test_upload_rejects_out_of_range_priority(db, sent):
+    response = TestClient(app).post(
+        "/uploads?priority=10",
+        files={"file": ("products.csv", b"sku,name\nA,Widget\n", "text/csv")},
+    )
+    assert response.status_code == 422
+    assert sent == []
+
+
+def test_finalize_and_webhooks_use_consumed_queues(db, tmp_path, monkeypatch):
+    from app import tasks
+    from app.celery_app import celery_app
+    from app.importer import plan_shards
+    from tests.test_import_csv import create_job, write_csv
+
+    path = write_csv(tmp_path / "catalog.csv", [{"sku": f"SKU-{i}", "name": "Widget", "description": ""} for i in range(20)])
+    job = db.query(Job).filter(Job.job_id == create_job(db, path)).one()
+    chords = []
+    monkeypatch.setattr(tasks, "chord", lambda header: lambda body: chords.append((list(header), body)))
+
+    tasks._dispatch_shards(db, job, str(path), plan_shards(path, 2))
+
+    [(header, body)] = chords
+    assert {shard.options["queue"] for shard in header} == {body.options["queue"]} == {"imports"}
+    route = celery_app.amqp.router.route({}, "app.tasks.deliver_webhook")
+    assert route["queue"].name == "webhooks"
@@ -0,0 +1,81 @@
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.importer.pipeline as pipeline
+from app.config import get_settings
+from app.main import app
+from app.models import Job, JobError
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def failed_import(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "csv_chunk_size", 4)
+    monkeypatch.setattr(pipeline, "ERROR_SAMPLE_SIZE", 3)
+    rows = [{"sku": f"SKU-{i}", "name": "" if i % 2 else f"Name {i}", "description": f"Desc {i}"} for i in range(20)]
+    path = write_csv(tmp_path / "products.csv", rows)
+    job_id = create_job(db, path)
+    import_csv(job_id=job_id, filepath=str(path))
+    return job_id
+
+
+def test_errors_spill_to_table_with_capped_sample(db, failed_import):
+    job = db.query(Job).filter(Job.job_id == failed_import).first()
+    assert job.failed_rows == 10
+    assert [e["row"] for e in job.errors] == [3, 5, 7]
+
+    stored = db.query(JobError).filter(JobError.job_id == failed_import).order_by(JobError.row_num).all()
+    assert [e.row_num for e in stored] == list(range(3, 22, 2))
+    assert stored[0].data == {"sku": "SKU-1", "name": "", "description": "Desc 1"}
+
+
+def test_errors_endpoint_paginates_by_row(client, failed_import):
+    rows, after = [], None
+    while True:
+        params = {"limit": 4}
+        if after is not None:
+            params["after"] = after
+        page = client.get(f"/jobs/{failed_import}/errors", params=params).json()
+        rows.extend(item["row_num"] for item in page["items"])
+        after = page["next_after"]
+        if after is None:
+            break
+    assert rows == list(range(3, 22, 2))
+
+    assert client.get("/jobs/missing/errors").status_code == 404
+
+
+def test_download_streams_failed_rows_as_csv(client, failed_import):
+    response = client.get(f"/jobs/{failed_import}/errors/download")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(records) == 10
+    assert records[0] == {"row": "3", "error": "Missing sku or name", "sku": "SKU-1", "name": "", "description": "Desc 1"}
+
+
+def test_download_header_covers_columns_of_every_error(client, db, tmp_path):
+    job_id = create_job(db, write_csv(tmp_path / "products.csv", []))
+    db.add_all([
+        JobError(job_id=job_id, row_num=2, sku="SKU-1", error="Write failed", data={"sku": "SKU-1", "name": "Lamp", "description": ""}),
+        JobError(job_id=job_id, row_num=3, sku="SKU-2", error="Missing sku or name", data={"sku": "SKU-2", "name": "", "description": "", "colour": "red"}),
+    ])
+    db.commit()
+
+    response = client.get(f"/jobs/{job_id}/errors/download")
+
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(records[0]) == ["row", "error", "sku", "name", "description", "colour"]
+    assert records[0]["colour"] == ""
+    assert records[1]["colour"] == "red"
@@ -0,0 +1,83 @@
+import pytest
+
+from app.importer import ArrowParser, CsvParser, CsvReader, iter_chunks, validate_chunk
+
+
+def parse(parser_class, path, chunk_size=3, **kwargs):
+    with CsvReader(path) as reader:
+        parser = parser_class(reader, **kwargs)
+        return list(parser.chunks(chunk_size=chunk_size))
+
+
+def flatten(chunks):
+    rows = [row for chunk in chunks for row in chunk.rows]
+    errors = [error for chunk in chunks for error in chunk.errors]
+    return rows, errors, sum(chunk.processed for chunk in chunks)
+
+
+TRICKY_CSV = (
+    'sku,name,description\n'
+    'A-1,  Widget ,"multi\nline"\n'
+    '\n'
+    ' İx-2 ,Gadget,\n'
+    ',No sku,x\n'
+    'B-3,"quoted, name",  \n'
+    'C-4,,missing name\n'
+    'Ünï-5,Ünïcode,desc\n'
+)
+
+
+def dict_reader_chunks(path, chunk_size=3):
+    with CsvReader(path) as reader:
+        return [validate_chunk(chunk) for chunk in iter_chunks(reader.rows(), chunk_size)]
+
+
+def test_positional_decoder_matches_dict_reader(tmp_path):
+    path = tmp_path / "products.csv"
+    path.write_text(TRICKY_CSV + "D-6\n   \nE-7,Extra,e,1,2\n", encoding="utf-8")
+
+    assert flatten(parse(CsvParser, path)) == flatten(dict_reader_chunks(path))
+
+
+def test_positional_decoder_uses_last_duplicate_column(tmp_path):
+    path = tmp_path / "products.csv"
+    path.write_text("name,sku,name\nfirst,S-1,second\n", encoding="utf-8")
+
+    rows, _, _ = flatten(parse(CsvParser, path))
+    assert rows[0].name == "second"
+    assert flatten(parse(CsvParser, path)) == flatten(dict_reader_chunks(path))
+
+
+@pytest.mark.parametrize("block_size", [8, 1024 * 1024])
+def test_arrow_parser_matches_csv_parser(tmp_path, block_size):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "products.csv"
+    path.write_text(TRICKY_CSV, encoding="utf-8")
+
+    expected = flatten(parse(CsvParser, path))
+    assert flatten(parse(ArrowParser, path, block_size=block_size)) == expected
+    assert expected[1][0] == (4, "Missing sku or name", {"sku": "", "name": "No sku", "description": "x"})
+
+
+def test_arrow_parser_falls_back_on_ragged_rows(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "products.csv"
+    path.write_text("sku,name,description\nA,Alpha\nB,Beta,b,extra\nC,Gamma,c\n", encoding="utf-8")
+
+    assert flatten(parse(ArrowParser, path)) == flatten(parse(CsvParser, path))
+
+
+def test_arrow_checkpoints_only_at_block_ends(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "products.csv"
+    path.write_text("sku,name\n" + "".join(f"S{i},N{i}\n" for i in range(10)), encoding="utf-8")
+
+    chunks = parse(ArrowParser, path, chunk_size=2, block_size=24)
+    offsets = [chunk.offset for chunk in chunks if chunk.offset is not None]
+    assert offsets == sorted(offsets) and offsets[-1] == path.stat().st_size
+
+    # resuming from any checkpoint yields exactly the remaining rows
+    _, _, processed_before = flatten(chunks[:[c.offset for c in chunks].index(offsets[0]) + 1])
+    with CsvReader(path) as reader:
+        rest = list(ArrowParser(reader, block_size=24).chunks(offsets[0], None, 2 + processed_before, 2))
+    assert [row.sku for row in flatten(rest)[0]] == [f"S{i}" for i in range(processed_before, 10)]
@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.product_cache import ProductCache, product_cache
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def test_lookups_are_cached_until_a_write(db):
+    client = TestClient(app)
+    created = client.post("/products", json={"sku": "SKU-1", "name": "Lamp"}).json()
+
+    assert client.get(f"/products/{created['id']}").json()["name"] == "Lamp"
+    assert client.get(f"/products/{created['id']}").json()["name"] == "Lamp"
+    stats = client.get("/products/cache/stats").json()
+    assert (stats["local_hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    client.put(f"/products/{created['id']}", json={"name": "Desk lamp"})
+    assert client.get(f"/products/{created['id']}").json()["name"] == "Desk lamp"
+
+    client.delete(f"/products/{created['id']}")
+    assert client.get(f"/products/{created['id']}").status_code == 404
+    assert client.get("/products/cache/stats").json()["misses"] == 3
+
+
+def test_import_chunks_invalidate_updated_products(db, tmp_path):
+    client = TestClient(app)
+    path = write_csv(tmp_path / "catalog.csv", [{"sku": "SKU-1", "name": "Lamp", "description": ""}])
+    import_csv(job_id=create_job(db, path), filepath=str(path))
+    product_id = client.get("/products").json()["items"][0]["id"]
+    assert client.get(f"/products/{product_id}").json()["name"] == "Lamp"
+
+    path = write_csv(tmp_path / "update.csv", [{"sku": "sku-1", "name": "Desk lamp", "description": ""}])
+    import_csv(job_id=create_job(db, path), filepath=str(path))
+    assert client.get(f"/products/{product_id}").json()["name"] == "Desk lamp"
+    assert product_cache.stats()["misses"] == 2
+
+
+def test_reads_racing_an_invalidation_are_not_cached(db):
+    cache = ProductCache(redis=None)
+    generation = cache.generation
+    cache.invalidate([1])
+    cache.put({"id": 1, "name": "stale"}, generation)
+    assert cache.get_local(1) is None
+
+    cache.put({"id": 1, "name": "fresh"}, cache.generation)
+    assert cache.get_local(1) == {"id": 1, "name": "fresh"}
@@ -0,0 +1,68 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import Product
+
+
+@pytest.fixture
+def client(db):
+    names = ["Gadget", "Widget", "Gadget", "Anvil", "Widget", "Gizmo", "Gadget"]
+    db.add_all([
+        Product(sku=f"SKU-{i}", sku_norm=f"sku-{i}", name=name) for i, name in enumerate(names)
+    ])
+    db.commit()
+    return TestClient(app)
+
+
+def walk(client, sort, limit=2):
+    ids, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/products", params=params).json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort", ["id", "-id", "sku", "name", "-name", "updated_at"])
+def test_cursor_pages_match_offset_order(client, sort):
+    everything = client.get("/products", params={"sort": sort, "limit": 100}).json()
+    assert everything["next_cursor"] is None
+    assert walk(client, sort) == [item["id"] for item in everything["items"]]
+
+
+def test_name_sort_breaks_ties_by_id(client):
+    items = client.get("/products", params={"sort": "-name", "limit": 100}).json()["items"]
+    assert [(item["name"], item["id"]) for item in items] == sorted(
+        ((item["name"], item["id"]) for item in items), reverse=True
+    )
+
+
+def test_bad_cursors_are_rejected(client):
+    cursor = client.get("/products", params={"limit": 2}).json()["next_cursor"]
+    assert client.get("/products", params={"cursor": cursor, "sort": "name"}).status_code == 400
+    assert client.get("/products", params={"cursor": cursor, "offset": 2}).status_code == 400
+    assert client.get("/products", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.parametrize("sort,value,last_id", [
+    ("id", "3", 3),
+    ("id", True, 3),
+    ("name", 5, 3),
+    ("sku", None, 3),
+    ("name", "Gadget", "3"),
+    ("name", "Gadget", 3.5),
+    ("updated_at", 0, 3),
+    ("updated_at", "yesterday", 3),
+])
+def test_cursors_with_mistyped_values_are_rejected(client, sort, value, last_id):
+    raw = json.dumps([sort, value, last_id]).encode()
+    cursor = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    assert client.get("/products", params={"cursor": cursor, "sort": sort}).status_code == 400
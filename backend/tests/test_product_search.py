@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def search(client, q, **params):
+    return [item["sku"] for item in client.get("/products", params={"q": q, "limit": 100, **params}).json()["items"]]
+
+
+def test_search_follows_imports_and_edits(db, tmp_path):
+    client = TestClient(app)
+    path = write_csv(tmp_path / "catalog.csv", [
+        {"sku": "LAMP-1", "name": "Desk lamp", "description": "Brushed steel"},
+        {"sku": "LAMP-2", "name": "Floor lamp", "description": "Steel base"},
+        {"sku": "CHAIR-1", "name": "Office chair", "description": "Mesh back"},
+    ])
+    import_csv(job_id=create_job(db, path), filepath=str(path))
+
+    assert sorted(search(client, "lamp")) == ["LAMP-1", "LAMP-2"]
+    assert search(client, "ste lam") == ["LAMP-1", "LAMP-2"]  # prefixes, every word
+    assert search(client, "chair-1") == ["CHAIR-1"]
+
+    # re-import changes a name through the bulk upsert
+    path = write_csv(tmp_path / "update.csv", [{"sku": "lamp-2", "name": "Floor light", "description": "Steel base"}])
+    import_csv(job_id=create_job(db, path), filepath=str(path))
+    assert search(client, "light") == ["LAMP-2"]
+    assert search(client, "floor lamp", sort="id") == ["LAMP-2"]  # lamp now only matches its sku
+
+    product = client.post("/products", json={"sku": "LAMP-3", "name": "Reading lamp"}).json()
+    client.put(f"/products/{product['id']}", json={"name": "Reading lantern"})
+    assert search(client, "lantern") == ["LAMP-3"]
+    client.delete(f"/products/{product['id']}")
+    assert search(client, "lantern") == []
+
+
+def test_search_ranks_and_pages(db):
+    client = TestClient(app)
+    for sku, name, description in [
+        ("A-1", "Plain box", "Holds a steel hinge"),
+        ("A-2", "Steel box", None),
+        ("STEEL-3", "Box", None),
+    ]:
+        client.post("/products", json={"sku": sku, "name": name, "description": description})
+
+    assert search(client, "steel") == ["STEEL-3", "A-2", "A-1"]
+    assert search(client, "steel", sort="id") == ["A-1", "A-2", "STEEL-3"]
+    page = client.get("/products", params={"q": "steel", "limit": 1, "offset": 1}).json()
+    assert (page["total"], [item["sku"] for item in page["items"]]) == (3, ["A-2"])
+    assert client.get("/products", params={"sort": "relevance"}).status_code == 400
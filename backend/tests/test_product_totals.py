@@ -0,0 +1,121 @@
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base, async_database_url
+from app.main import app
+from app import product_totals
+from app.models import Product, RowCount, RowCountDelta
+from app.product_totals import adjust_product_count, compact_product_count, estimate_count, explain_statement, product_count
+from app.search import apply_search
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def listed_total(client, **params):
+    return client.get("/products", params=params).json()["total"]
+
+
+def test_unfiltered_total_is_maintained(db, tmp_path):
+    client = TestClient(app)
+    assert listed_total(client) == 0  # seeds the counter
+
+    path = write_csv(tmp_path / "catalog.csv", [
+        {"sku": f"SKU-{i}", "name": f"Name {i}", "description": ""} for i in range(5)
+    ])
+    import_csv(job_id=create_job(db, path), filepath=str(path))
+    import_csv(job_id=create_job(db, path), filepath=str(path))  # all unchanged
+    created = client.post("/products", json={"sku": "NEW-1", "name": "New"}).json()
+    client.delete(f"/products/{created['id']}")
+    client.delete(f"/products/{client.get('/products').json()['items'][0]['id']}")
+
+    db.expire_all()
+    # the imports were compacted when they completed; the API writes are pending deltas
+    assert db.query(RowCount.row_count).filter(RowCount.table_name == "products").scalar() == 5
+    assert sorted(d for (d,) in db.query(RowCountDelta.delta)) == [-1, -1, 1]
+    assert listed_total(client) == db.query(Product).count() == 4
+
+    compact_product_count(db)
+    assert db.query(RowCount.row_count).filter(RowCount.table_name == "products").scalar() == 4
+    assert db.query(RowCountDelta).count() == 0
+    assert product_count(db) == 4
+
+
+def test_count_read_compacts_many_deltas(db, monkeypatch):
+    monkeypatch.setattr(product_totals, "COMPACT_THRESHOLD", 2)
+    assert product_count(db) == 0  # seeds the counter
+    for i in range(3):
+        db.add(Product(sku=f"SKU-{i}", sku_norm=f"sku-{i}", name="Widget"))
+        adjust_product_count(db, 1)
+    db.commit()
+
+    assert product_count(db) == 3
+    assert db.query(RowCountDelta).count() == 0
+    assert product_count(db) == 3
+
+
+def test_filtered_totals_are_cached(db):
+    db.add_all([Product(sku=f"SKU-{i}", sku_norm=f"sku-{i}", name="Widget" if i % 2 else "Gadget") for i in range(6)])
+    db.commit()
+    client = TestClient(app)
+
+    assert listed_total(client, name="widget") == 3
+    db.add(Product(sku="SKU-X", sku_norm="sku-x", name="Widget"))
+    db.commit()
+    # same normalized filter, still within the TTL
+    assert listed_total(client, name="WIDGET") == 3
+    assert listed_total(client, name="gadget") == 3
+
+
+def test_total_can_be_skipped_or_estimated(db):
+    db.add(Product(sku="SKU-1", sku_norm="sku-1", name="Widget"))
+    db.commit()
+    client = TestClient(app)
+
+    skipped = client.get("/products", params={"include_total": "false"}).json()
+    assert skipped["total"] is None
+    assert len(skipped["items"]) == 1
+    # SQLite has no planner estimate; the exact count is used
+    estimated = client.get("/products", params={"include_total": "estimate", "name": "wid"}).json()
+    assert (estimated["total"], estimated["total_estimated"]) == (1, False)
+
+
+@pytest.mark.parametrize("driver", ["psycopg2", "asyncpg"])
+def test_explain_binds_parameters_in_driver_paramstyle(driver):
+    dialect = make_url(f"postgresql+{driver}://").get_dialect()()
+    statement, _ = apply_search(select(Product).filter(Product.name.ilike("%wid%")), "postgresql", ["lamp"])
+
+    sql, params = explain_statement(dialect, statement)
+
+    if driver == "asyncpg":
+        assert "$1" in sql and "$3" in sql
+        assert params == ("%wid%", "simple", "lamp:*")
+    else:
+        assert "%(name_1)s" in sql
+        assert params == {"name_1": "%wid%", "to_tsquery_1": "simple", "to_tsquery_2": "lamp:*"}
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL is not set")
+def test_estimate_on_postgres_async_session():
+    """Needs a disposable Postgres database; its tables are dropped."""
+    async def estimate():
+        engine = create_async_engine(async_database_url(os.environ["TEST_POSTGRES_URL"]))
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add_all([Product(sku=f"L-{i}", sku_norm=f"l-{i}", name="Desk lamp") for i in range(20)])
+            await session.commit()
+            await session.execute(text("ANALYZE products"))
+            statement, _ = apply_search(select(Product).filter(Product.name.ilike("%lamp%")), "postgresql", ["desk"])
+            count = await session.run_sync(estimate_count, statement)
+        await engine.dispose()
+        return count
+
+    assert asyncio.run(estimate()) > 0
@@ -0,0 +1,48 @@
+import app.importer.progress as progress
+from app.config import get_settings
+from app.importer import ImportCounters, ProgressReporter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reporter_coalesces_by_time(monkeypatch):
+    monkeypatch.setattr(get_settings(), "progress_interval_ms", 500)
+    monkeypatch.setattr(get_settings(), "progress_db_interval_ms", 5000)
+    published = []
+    monkeypatch.setattr(progress, "publish_progress", lambda job_id, step, processed, *args, **kwargs: published.append(processed))
+
+    clock = FakeClock()
+    reporter = ProgressReporter("job-1", clock=clock)
+    counters = ImportCounters()
+
+    db_writes = 0
+    for _ in range(100):  # 100 chunks, 250ms apart
+        counters.processed += 10
+        if reporter.db_due():
+            db_writes += 1
+        reporter.report("importing", counters, 0)
+        clock.now += 0.25
+
+    # the first publish goes out immediately, then one per 500ms
+    assert published == list(range(10, 1001, 20))
+    # database writes wait a full interval, then one per 5s
+    assert db_writes == 4
+
+    assert reporter.report("completed", counters, 100, force=True)
+    assert published[-1] == 1000
+
+
+def test_zero_interval_reports_every_call(monkeypatch):
+    monkeypatch.setattr(get_settings(), "progress_interval_ms", 0)
+    monkeypatch.setattr(get_settings(), "progress_db_interval_ms", 0)
+    monkeypatch.setattr(progress, "publish_progress", lambda *args, **kwargs: None)
+
+    reporter = ProgressReporter("job-1", clock=FakeClock())
+    assert all(reporter.db_due() for _ in range(3))
+    assert all(reporter.report("importing", ImportCounters(), 0) for _ in range(3))
@@ -0,0 +1,123 @@
+import csv
+import io
+import random
+
+import pytest
+
+from app.config import get_settings
+from app.celery_app import celery_app
+from app.models import Job, JobShard, JobStatus, Product
+from app.importer import CsvReader, find_record_boundaries, plan_shards
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job
+
+
+def make_csv(path, count, seed=0):
+    rnd = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["sku", "name", "description"])
+    for i in range(count):
+        description = rnd.choice(["plain", 'has "quotes"', "multi\nline", 'x\n"y"\nz', ""])
+        writer.writerow([f"SKU-{i}", f"Name {i}", description])
+    path.write_text(buffer.getvalue(), encoding="utf-8", newline="")
+    return path
+
+
+def read_all(path, shards):
+    rows = []
+    for shard in shards:
+        with CsvReader(path) as reader:
+            rows.extend(reader.rows(shard.start, shard.end, shard.first_row_num))
+    return rows
+
+
+@pytest.mark.parametrize("shard_count", [1, 2, 3, 7, 50])
+def test_shards_cover_file_exactly(tmp_path, shard_count):
+    path = make_csv(tmp_path / "catalog.csv", 40)
+    with CsvReader(path) as reader:
+        expected = list(reader.rows())
+
+    shards = plan_shards(path, shard_count)
+
+    assert 1 <= len(shards) <= shard_count
+    assert read_all(path, shards) == expected
+
+
+def test_boundaries_ignore_quoted_newlines(tmp_path):
+    path = make_csv(tmp_path / "catalog.csv", 30, seed=3)
+    data = path.read_bytes()
+    start = data.index(b"\n") + 1
+    targets = list(range(start, len(data), 17))
+
+    small_blocks = find_record_boundaries(path, start, targets, block_size=5)
+
+    assert small_blocks == find_record_boundaries(path, start, targets)
+    for offset, _ in small_blocks:
+        # every boundary is preceded by an even number of quotes
+        assert data[:offset].count(b'"') % 2 == 0
+        assert data[offset - 1:offset] == b"\n"
+
+
+def test_sharded_import_aggregates_into_job(db, tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "import_shard_size", 200)
+    monkeypatch.setattr(settings, "import_max_shards", 4)
+    monkeypatch.setattr(settings, "csv_chunk_size", 5)
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+
+    path = make_csv(tmp_path / "catalog.csv", 60)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        f.write(",missing sku,\n")
+    job_id = create_job(db, path)
+
+    result = import_csv.delay(job_id, str(path)).get()
+
+    assert result["shards"] == 4
+    db.expire_all()
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert (job.processed_rows, job.created_rows, job.failed_rows) == (61, 60, 1)
+    assert job.errors == [{"row": 62, "error": "Missing sku or name"}]
+    assert db.query(JobShard).filter(JobShard.job_id == job_id).count() == 4
+    assert db.query(Product).count() == 60
+
+
+def test_shards_number_rows_past_blank_lines(tmp_path):
+    path = tmp_path / "catalog.csv"
+    lines = ["sku,name,description", "", "", "\r"]
+    for i in range(40):
+        lines.append(f"SKU-{i},Name {i},")
+        if i % 7 == 0:
+            lines.append("")
+    path.write_bytes("\n".join(lines + [""]).encode())
+    with CsvReader(path) as reader:
+        expected = list(reader.rows())
+
+    for shard_count in (2, 3, 7):
+        assert read_all(path, plan_shards(path, shard_count)) == expected
+        assert find_record_boundaries(path, 0, range(0, 400, 9), block_size=3) == find_record_boundaries(path, 0, range(0, 400, 9))
+
+
+def test_sharded_import_with_blank_lines_dedupes_by_row(db, tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "import_shard_size", 200)
+    monkeypatch.setattr(settings, "import_max_shards", 4)
+    monkeypatch.setattr(settings, "csv_chunk_size", 5)
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+
+    path = tmp_path / "catalog.csv"
+    lines = ["sku,name,description", "", "", ""] + [f"SKU-{i},Name {i}," for i in range(40)] + ["SKU-39,Last,", ""]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    job_id = create_job(db, path)
+
+    result = import_csv.delay(job_id, str(path)).get()
+
+    assert result["shards"] > 1
+    db.expire_all()
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    assert job.status == JobStatus.COMPLETED
+    assert (job.created_rows, job.duplicate_rows) == (40, 1)
+    assert {p.sku for p in db.query(Product)} == {f"SKU-{i}" for i in range(40)}
+    assert db.query(Product).filter(Product.sku == "SKU-39").one().name == "Last"
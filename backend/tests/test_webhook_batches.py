@@ -0,0 +1,54 @@
+import app.tasks as tasks
+from app.models import Webhook
+from app.tasks import import_csv
+
+from tests.test_import_csv import create_job, write_csv
+
+
+def test_import_sends_one_batch_per_chunk_per_subscriber(db, tmp_path, monkeypatch):
+    db.add_all([
+        Webhook(url="http://batched", event_types=["product.created"], batch_size=2),
+        Webhook(url="http://single", event_types=["product.updated"], batch_size=0),
+        Webhook(url="http://everything", event_types=["products.batch_upserted"], batch_size=100),
+        Webhook(url="http://off", event_types=["product.created"], enabled=False),
+    ])
+    db.commit()
+    batched, single, everything, _ = db.query(Webhook).order_by(Webhook.id).all()
+    sent = []
+    monkeypatch.setattr(tasks, "_send_deliveries", sent.append)
+
+    path = write_csv(tmp_path / "catalog.csv", [
+        {"sku": f"SKU-{i}", "name": f"Name {i}", "description": ""} for i in range(3)
+    ])
+    job_id = create_job(db, path)
+    import_csv(job_id=job_id, filepath=str(path))
+
+    assert len(sent) == 1
+    deliveries = sent[0]
+    by_webhook = {}
+    for webhook_id, event_type, payload in deliveries:
+        by_webhook.setdefault(webhook_id, []).append((event_type, payload))
+
+    assert single.id not in by_webhook  # nothing was updated
+    assert [len(p["items"]) for _, p in by_webhook[batched.id]] == [2, 1]
+    assert {e for e, _ in by_webhook[batched.id]} == {"products.batch_upserted"}
+    assert by_webhook[batched.id][0][1]["job_id"] == job_id
+    assert by_webhook[batched.id][0][1]["items"][0]["event"] == "product.created"
+    assert [len(p["items"]) for _, p in by_webhook[everything.id]] == [3]
+
+
+def test_batching_is_opt_in(db, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    created = TestClient(app).post("/webhooks", json={"url": "http://existing", "event_types": ["product.created"]}).json()
+    assert created["batch_size"] == 0
+    sent = []
+    monkeypatch.setattr(tasks, "_send_deliveries", sent.append)
+
+    path = write_csv(tmp_path / "catalog.csv", [
+        {"sku": f"SKU-{i}", "name": f"Name {i}", "description": ""} for i in range(3)
+    ])
+    import_csv(job_id=create_job(db, path), filepath=str(path))
+
+    assert [event_type for _, event_type, _ in sent[0]] == ["product.created"] * 3
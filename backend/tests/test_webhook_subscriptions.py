@@ -0,0 +1,65 @@
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Webhook
+from app.webhook_subscriptions import SubscriptionCache
+
+
+class CountingSessions:
+    def __init__(self):
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return SessionLocal()
+
+
+def test_cache_serves_lookups_without_queries(db):
+    db.add_all([
+        Webhook(url="http://a", event_types=["product.created", "product.updated"]),
+        Webhook(url="http://b", event_types=["product.deleted"]),
+        Webhook(url="http://c", event_types=["product.created"], enabled=False),
+    ])
+    db.commit()
+    sessions = CountingSessions()
+    cache = SubscriptionCache(sessions)
+
+    assert [s.id for s in cache.subscribers("product.created")] == [1]
+    assert [s.id for s in cache.subscribers("product.deleted")] == [2]
+    assert cache.subscribers("product.unknown") == []
+    assert len(cache.all()) == 2
+    assert sessions.opened == 1
+
+
+def test_notify_changed_and_ttl_reload(db, monkeypatch):
+    sessions = CountingSessions()
+    cache = SubscriptionCache(sessions)
+    assert cache.subscribers("product.created") == []
+
+    db.add(Webhook(url="http://a", event_types=["product.created"]))
+    db.commit()
+    assert cache.subscribers("product.created") == []
+
+    cache.notify_changed()
+    assert len(cache.subscribers("product.created")) == 1
+    assert sessions.opened == 2
+
+    monkeypatch.setattr(get_settings(), "webhook_cache_ttl", 0)
+    cache.subscribers("product.created")
+    assert sessions.opened == 3
+
+
+def test_invalidation_right_after_refresh_keeps_lookup_consistent(db, monkeypatch):
+    db.add(Webhook(url="http://a", event_types=["product.created"]))
+    db.commit()
+    cache = SubscriptionCache(CountingSessions())
+    ensure_fresh = cache._ensure_fresh
+
+    def invalidated_by_listener():
+        # the listener thread invalidates between the refresh and the read
+        snapshot = ensure_fresh()
+        cache.invalidate()
+        return snapshot
+
+    monkeypatch.setattr(cache, "_ensure_fresh", invalidated_by_listener)
+    assert [s.id for s in cache.subscribers("product.created")] == [1]
+    assert len(cache.all()) == 1
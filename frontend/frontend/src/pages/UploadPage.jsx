@@ -23,7 +23,7 @@ export default function UploadPage() {
       <form onSubmit={onSubmit}>
         <input
           type="file"
-          accept=".csv"
+          accept=".csv,.ndjson,.jsonl,.parquet,.gz,.zst,.zip"
           onChange={(e) => setFile(e.target.files[0])}
         />
         <button type="submit">Upload</button>